@@ -1,4 +1,17 @@
-from playchess.driver import play
+from typing import Optional
+
+from playchess.config import MAX_SEARCH_DEPTH, OPENING_BOOK_PATH
+
+
+def play(player1: str = "human", player2: str = "bot", ai: str = "minmax_pruned", depth: int = 2,
+         book: Optional[str] = OPENING_BOOK_PATH):
+    """
+    Plays a game in a pygame window, pygame is only imported once a game is played. pygame comes with the gui extra,
+    without it ImportError is raised.
+    """
+
+    from playchess.driver import play as play_in_window
+    play_in_window(player1, player2, ai, depth, book=book)
 
 
 class PlayChess:
@@ -24,6 +37,11 @@ class PlayChess:
 
         play(player1="human", player2="bot", ai="minmax_pruned", depth=depth)
 
+    @staticmethod
+    def play_iterative_bot(max_depth: int = MAX_SEARCH_DEPTH):
+        """Play against a bot that searches deeper and deeper until its time to move runs out."""
+        play(player1="human", player2="bot", ai="iterative", depth=max_depth)
+
     @staticmethod
     def play_random_bot():
         """Play against a bot that makes random moves."""
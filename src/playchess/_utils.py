@@ -1,14 +1,42 @@
+from typing import Dict
+
 import pygame
-from playchess.config import BOARD_WIDTH, BOARD_HEIGHT, END_GAME_FONT_COLOUR, END_GAME_FONT_SIZE
+from playchess.config import (BOARD_WIDTH, BOARD_HEIGHT, END_GAME_FONT_COLOUR, END_GAME_FONT_SIZE, MOVE_LOG_PANEL_WIDTH,
+                              MOVE_LOG_PANEL_BACKGROUND_COLOUR, MOVE_LOG_FONT_COLOUR, MOVE_LOG_FONT_SIZE, THINKING_TEXT)
+
+
+_FONTS: Dict[int, pygame.font.Font] = {}
+
+
+def get_font(size: int) -> pygame.font.Font:
+    """Gets the default font in a size, it is only created the first time."""
+
+    if size not in _FONTS:
+        _FONTS[size] = pygame.font.Font(pygame.font.get_default_font(), size)
 
+    return _FONTS[size]
 
-def draw_game_over_text(screen: pygame.surface.Surface, text: str) -> None:
-    """Draws text onto a pygame screen."""
 
-    font = pygame.font.Font(pygame.font.get_default_font(), END_GAME_FONT_SIZE)
+def draw_game_over_text(screen: pygame.surface.Surface, text: str) -> pygame.Rect:
+    """Draws text onto a pygame screen, returns the rect drawn on."""
+
+    font = get_font(END_GAME_FONT_SIZE)
     text_obj = font.render(text, False, pygame.Color(END_GAME_FONT_COLOUR))
 
     text_loc_width = BOARD_WIDTH / 2 - text_obj.get_width() / 2
     text_loc_height = BOARD_HEIGHT / 2 - text_obj.get_height() / 2
     text_loc = pygame.Rect(0, 0, BOARD_WIDTH, BOARD_HEIGHT).move(text_loc_width, text_loc_height)
+    return screen.blit(text_obj, text_loc)
+
+
+def draw_thinking_text(screen: pygame.surface.Surface) -> pygame.Rect:
+    """Draws the thinking text at the bottom of the move log panel, returns the rect drawn on."""
+
+    font = get_font(MOVE_LOG_FONT_SIZE)
+    text_obj = font.render(THINKING_TEXT, True, pygame.Color(MOVE_LOG_FONT_COLOUR),
+                           pygame.Color(MOVE_LOG_PANEL_BACKGROUND_COLOUR))
+
+    text_loc = pygame.Rect(BOARD_WIDTH, BOARD_HEIGHT - text_obj.get_height(), MOVE_LOG_PANEL_WIDTH, text_obj.get_height())
+    pygame.draw.rect(screen, pygame.Color(MOVE_LOG_PANEL_BACKGROUND_COLOUR), text_loc)
     screen.blit(text_obj, text_loc)
+    return text_loc
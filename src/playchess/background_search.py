@@ -0,0 +1,63 @@
+import threading
+from copy import deepcopy
+from typing import Callable, List, Optional
+
+from playchess.game import Game
+from playchess.move import Move
+from playchess.move_finder import MoveFinder
+
+
+class BackgroundSearch:
+    """
+    Class represents a move search running in a background thread, so the game window stays responsive.
+
+    The search runs on its own copy of the game, the game being played can be drawn and changed meanwhile. The
+    result is only handed out for the exact game and position the search was started on, a search of a game that
+    has since been reset or had moves undone never makes a move. on_done is called from the search thread once the
+    search has finished, e.g. to wake up a thread waiting for events.
+    """
+
+    def __init__(self, game: Game, create_move_finder: Callable[[Game, List[Move]], MoveFinder[Move]],
+                 on_done: Optional[Callable[[], None]] = None):
+        self._game = game
+        self._on_done = on_done
+        self._position_key = game.position_key
+        self._num_moves_made = game.num_moves_made
+
+        search_game = deepcopy(game)
+        self._move_finder = create_move_finder(search_game, search_game.get_valid_moves())
+        self._move: Optional[Move] = None
+        self._done = threading.Event()
+
+        self._thread = threading.Thread(target=self._search, daemon=True)
+        self._thread.start()
+
+    def _search(self) -> None:
+        try:
+            self._move = self._move_finder.find_move()
+        finally:
+            self._done.set()
+            if self._on_done is not None:
+                self._on_done()
+
+    def is_done(self) -> bool:
+        """Whether the search has finished."""
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        """Stops the search, as soon as the move finder allows."""
+        self._move_finder.stop()
+
+    def is_stale(self, game: Game) -> bool:
+        """Whether the game is no longer in the position the search was started on."""
+
+        return game is not self._game or game.position_key != self._position_key or \
+            game.num_moves_made != self._num_moves_made
+
+    def result(self, game: Game, valid_moves: List[Move]) -> Optional[Move]:
+        """Gets the valid move of the game that was found, None while searching or if the game has changed."""
+
+        if not self.is_done() or self.is_stale(game) or self._move is None:
+            return None
+
+        return next((move for move in valid_moves if move == self._move), None)
@@ -0,0 +1,88 @@
+"""
+Vectorised scoring of many positions at once.
+
+Boards are packed into an (N, 64) int8 array of piece codes in row major order (row * 8 + col), which is scored
+in one pass with the scorer tables as NumPy arrays. This needs NumPy, which is installed with the batch extra.
+"""
+
+
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from playchess.board import Board, BOARD_SQUARES
+from playchess.position import Position
+from playchess.scorer import MATERIAL_SCORES, SQUARE_SCORES, CHECKMATE_ABS_SCORE, STALEMATE_SCORE
+
+
+# The scorer tables indexed by piece code and by piece code and square
+MATERIAL_SCORE_ARRAY: npt.NDArray[np.int64] = np.array(MATERIAL_SCORES, dtype=np.int64)
+SQUARE_SCORE_ARRAY: npt.NDArray[np.int64] = np.array(SQUARE_SCORES, dtype=np.int64)
+
+_SQUARE_INDICES = np.arange(64)
+_BOARD_SQUARE_INDICES = np.array(BOARD_SQUARES, dtype=np.intp)
+
+
+def pack_board(board: Board) -> npt.NDArray[np.int8]:
+    """Packs the piece codes of a board into a (64,) int8 array."""
+    return np.frombuffer(board.squares, dtype=np.int8)[_BOARD_SQUARE_INDICES]
+
+
+def pack_boards(boards: Iterable[Board]) -> npt.NDArray[np.int8]:
+    """Packs the piece codes of boards into an (N, 64) int8 array."""
+
+    packed = [pack_board(board) for board in boards]
+    if not packed:
+        return np.zeros((0, 64), dtype=np.int8)
+
+    return np.stack(packed)
+
+
+def pack_positions(positions: Iterable[Position[Any]]) -> Tuple[npt.NDArray[np.int8], npt.NDArray[np.bool_],
+                                                                npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    """
+    Packs positions into arrays for find_batch_scores.
+
+    Returns the (N, 64) boards and the (N,) white to move, check mate and stale mate flags.
+    """
+
+    positions = list(positions)
+    boards = np.zeros((len(positions), 64), dtype=np.int8)
+    for index, position in enumerate(positions):
+        for row_num, col_num, piece_ in position.piece_squares():
+            boards[index, row_num * 8 + col_num] = piece_.code
+
+    white_to_move = np.array([position.turn.is_white() for position in positions], dtype=np.bool_)
+    check_mates = np.array([position.check_mate for position in positions], dtype=np.bool_)
+    stale_mates = np.array([position.stale_mate for position in positions], dtype=np.bool_)
+
+    return boards, white_to_move, check_mates, stale_mates
+
+
+def find_batch_scores(boards: npt.NDArray[np.int8], use_positional_scoring: bool = True,
+                      white_to_move: Optional[npt.NDArray[np.bool_]] = None,
+                      check_mates: Optional[npt.NDArray[np.bool_]] = None,
+                      stale_mates: Optional[npt.NDArray[np.bool_]] = None) -> npt.NDArray[np.float64]:
+    """
+    Finds the scores of N packed boards, the same as find_game_score does for one position.
+
+    The flags are (N,) boolean arrays, positions are taken to be neither check mate nor stale mate if they are
+    not given. The side to move is only needed with the check mate flags.
+    """
+
+    codes = boards.astype(np.intp)
+    scores: npt.NDArray[np.float64] = MATERIAL_SCORE_ARRAY[codes].sum(axis=1).astype(np.float64)
+
+    if use_positional_scoring:
+        scores += SQUARE_SCORE_ARRAY[codes, _SQUARE_INDICES].sum(axis=1) * 0.1
+
+    if stale_mates is not None:
+        scores[stale_mates] = STALEMATE_SCORE
+
+    if check_mates is not None:
+        if white_to_move is None:
+            raise ValueError("white_to_move is needed to score check mates")
+        scores[check_mates] = np.where(white_to_move[check_mates], -CHECKMATE_ABS_SCORE, CHECKMATE_ABS_SCORE)
+
+    return scores
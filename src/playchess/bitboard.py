@@ -0,0 +1,657 @@
+"""
+Bitboard based chess position, an alternative move generation engine to Game.
+
+Squares are numbered in row major order like the board matrix, square = row * 8 + col, so a8 is 0 and h1 is 63.
+Moves are packed into ints: from square | to square << 6 | promotion piece type << 12 | flag << 15.
+"""
+
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from playchess._castling_rights import CastlingRights
+from playchess.board import Board, BOARD_SQUARES
+from playchess.piece import Piece, CODE_PIECES, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK
+from playchess.position import Position
+from playchess.scorer import MATERIAL_SCORES, SQUARE_SCORES, count_scores
+from playchess.turn import Turn
+from playchess.zobrist import PIECE_SQUARE_KEYS, BLACK_TO_MOVE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS
+
+if TYPE_CHECKING:
+    from playchess.game import Game
+
+
+FULL_BOARD = (1 << 64) - 1
+COLOURS = WHITE | BLACK     # XOR a colour with this to get the other colour
+
+# Move flags
+FLAG_NONE = 0
+FLAG_DOUBLE_PUSH = 1
+FLAG_EN_PASSANT = 2
+FLAG_CASTLE = 3
+
+PROMOTION_TYPES: Tuple[int, ...] = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+# Castling rights bits
+WHITE_KING_SIDE = 1
+WHITE_QUEEN_SIDE = 2
+BLACK_KING_SIDE = 4
+BLACK_QUEEN_SIDE = 8
+ALL_CASTLING_RIGHTS = WHITE_KING_SIDE | WHITE_QUEEN_SIDE | BLACK_KING_SIDE | BLACK_QUEEN_SIDE
+
+# Castling rights kept when a piece moves from or to a square (king and rook home squares clear rights)
+CASTLING_MASKS: List[int] = [ALL_CASTLING_RIGHTS] * 64
+CASTLING_MASKS[0] ^= BLACK_QUEEN_SIDE
+CASTLING_MASKS[7] ^= BLACK_KING_SIDE
+CASTLING_MASKS[4] ^= BLACK_KING_SIDE | BLACK_QUEEN_SIDE
+CASTLING_MASKS[56] ^= WHITE_QUEEN_SIDE
+CASTLING_MASKS[63] ^= WHITE_KING_SIDE
+CASTLING_MASKS[60] ^= WHITE_KING_SIDE | WHITE_QUEEN_SIDE
+
+# King destination square -> (rook from square, rook to square)
+CASTLING_ROOK_SQUARES: Dict[int, Tuple[int, int]] = {62: (63, 61), 58: (56, 59), 6: (7, 5), 2: (0, 3)}
+
+SQUARE_NAMES: Tuple[str, ...] = tuple("abcdefgh"[sq % 8] + str(8 - sq // 8) for sq in range(64))
+
+ROOK_DELTAS = ((-1, 0), (0, -1), (1, 0), (0, 1))
+BISHOP_DELTAS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def _leaper_attacks(deltas: Tuple[Tuple[int, int], ...]) -> List[int]:
+    """Builds the attack table of a leaping piece for every square."""
+
+    table: List[int] = []
+    for square in range(64):
+        row, col = divmod(square, 8)
+        attacks = 0
+        for d_row, d_col in deltas:
+            to_row, to_col = row + d_row, col + d_col
+            if 0 <= to_row < 8 and 0 <= to_col < 8:
+                attacks |= 1 << (to_row * 8 + to_col)
+        table.append(attacks)
+
+    return table
+
+
+def _ray_attacks(square: int, occupancy: int, deltas: Tuple[Tuple[int, int], ...]) -> int:
+    """Slides from a square along the given rays up to and including the first blocker."""
+
+    attacks = 0
+    row, col = divmod(square, 8)
+    for d_row, d_col in deltas:
+        to_row, to_col = row + d_row, col + d_col
+        while 0 <= to_row < 8 and 0 <= to_col < 8:
+            bit = 1 << (to_row * 8 + to_col)
+            attacks |= bit
+            if occupancy & bit:
+                break
+            to_row, to_col = to_row + d_row, to_col + d_col
+
+    return attacks
+
+
+def _relevant_occupancy_mask(square: int, deltas: Tuple[Tuple[int, int], ...]) -> int:
+    """Squares whose occupancy can change a slider's attacks (the rays without their last square)."""
+
+    mask = 0
+    row, col = divmod(square, 8)
+    for d_row, d_col in deltas:
+        to_row, to_col = row + d_row, col + d_col
+        while 0 <= to_row + d_row < 8 and 0 <= to_col + d_col < 8:
+            mask |= 1 << (to_row * 8 + to_col)
+            to_row, to_col = to_row + d_row, to_col + d_col
+
+    return mask
+
+
+def _slider_attack_tables(deltas: Tuple[Tuple[int, int], ...]) -> Tuple[List[int], List[Dict[int, int]]]:
+    """
+    Builds the magic style lookup tables of a slider.
+
+    Every subset of the relevant occupancy mask of a square maps to its attacks. The masked occupancy is used as
+    the dictionary key directly, so the dictionary plays the part of the perfect hash a magic multiplier provides.
+    """
+
+    masks: List[int] = []
+    tables: List[Dict[int, int]] = []
+    for square in range(64):
+        mask = _relevant_occupancy_mask(square, deltas)
+        table: Dict[int, int] = {}
+        subset = 0
+        while True:     # Carry-Rippler enumeration of all subsets of the mask
+            table[subset] = _ray_attacks(square, subset, deltas)
+            subset = (subset - mask) & mask
+            if not subset:
+                break
+        masks.append(mask)
+        tables.append(table)
+
+    return masks, tables
+
+
+def _between_table() -> List[List[int]]:
+    """Builds the squares strictly between two aligned squares (empty if not aligned)."""
+
+    table = [[0] * 64 for _ in range(64)]
+    for square in range(64):
+        row, col = divmod(square, 8)
+        for d_row, d_col in ROOK_DELTAS + BISHOP_DELTAS:
+            between = 0
+            to_row, to_col = row + d_row, col + d_col
+            while 0 <= to_row < 8 and 0 <= to_col < 8:
+                table[square][to_row * 8 + to_col] = between
+                between |= 1 << (to_row * 8 + to_col)
+                to_row, to_col = to_row + d_row, to_col + d_col
+
+    return table
+
+
+def _line_table() -> List[List[int]]:
+    """Builds the full board line through two aligned squares (empty if not aligned)."""
+
+    table = [[0] * 64 for _ in range(64)]
+    for square in range(64):
+        for d_row, d_col in ((-1, 0), (0, -1), (-1, -1), (-1, 1)):
+            line = _ray_attacks(square, 0, ((d_row, d_col), (-d_row, -d_col))) | 1 << square
+            others = line ^ 1 << square
+            while others:
+                other = others & -others
+                others ^= other
+                table[square][other.bit_length() - 1] = line
+
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks(((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)))
+KING_ATTACKS = _leaper_attacks(((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)))
+
+# Squares attacked by a pawn of a colour standing on a square (indexed by colour code)
+PAWN_ATTACKS: Dict[int, List[int]] = {WHITE: _leaper_attacks(((-1, -1), (-1, 1))),
+                                      BLACK: _leaper_attacks(((1, -1), (1, 1)))}
+
+ROOK_MASKS, ROOK_TABLES = _slider_attack_tables(ROOK_DELTAS)
+BISHOP_MASKS, BISHOP_TABLES = _slider_attack_tables(BISHOP_DELTAS)
+
+BETWEEN = _between_table()
+LINE = _line_table()
+
+WHITE_DOUBLE_PUSH_ROW = 0xFF << 40     # Row a white pawn reaches after a single push from its start row
+BLACK_DOUBLE_PUSH_ROW = 0xFF << 16
+
+
+def rook_attacks(square: int, occupancy: int) -> int:
+    """Gets the squares a rook on a square attacks given the board occupancy."""
+    return ROOK_TABLES[square][occupancy & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square: int, occupancy: int) -> int:
+    """Gets the squares a bishop on a square attacks given the board occupancy."""
+    return BISHOP_TABLES[square][occupancy & BISHOP_MASKS[square]]
+
+
+def encode_move(from_square: int, to_square: int, promotion: int = EMPTY, flag: int = FLAG_NONE) -> int:
+    """Packs a move into an int."""
+    return from_square | to_square << 6 | promotion << 12 | flag << 15
+
+
+def move_squares(move: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Gets the (row, col) from and to squares of a move."""
+    return divmod(move & 63, 8), divmod(move >> 6 & 63, 8)
+
+
+def move_name(move: int) -> str:
+    """Gets the coordinate name of a move, e.g. e2e4 or e7e8q."""
+
+    name = SQUARE_NAMES[move & 63] + SQUARE_NAMES[move >> 6 & 63]
+    promotion = move >> 12 & 7
+    if promotion:
+        name += " pnbrqk"[promotion]
+
+    return name
+
+
+class BitboardPosition(Position[int]):
+    """
+    Class to represent a chess position with bitboards.
+
+    Keeps one 64 bit integer per piece code, occupancy masks per colour and a square list for piece lookups.
+    """
+
+    def __init__(self, chess_board: Optional[Board] = None):
+        self.bitboards: List[int] = [0] * ((BLACK | KING) + 1)    # Indexed by piece code
+        self.occupancy: List[int] = [0] * (BLACK + 1)           # Indexed by colour code
+        self.squares: List[int] = [EMPTY] * 64
+        self.turn: Turn = Turn.WHITE
+        self.colour: int = WHITE
+        self.castling: int = ALL_CASTLING_RIGHTS
+        self.en_passant_square: Optional[int] = None
+        self.check_mate: bool = False
+        self.stale_mate: bool = False
+        self.move_log: List[int] = []
+        # Captured, castling, en-passant, key and scores
+        self._history: List[Tuple[int, int, Optional[int], int, int, int]] = []
+
+        board_squares = (chess_board or Board()).squares
+        for square, mailbox_square in enumerate(BOARD_SQUARES):
+            code = board_squares[mailbox_square]
+            if code:
+                self._put_piece(square, code)
+
+        self.position_key: int = self._compute_position_key()
+        self.material_score, self.positional_score = count_scores(self)
+
+    @classmethod
+    def from_game(cls, game: "Game") -> "BitboardPosition":
+        """Creates a bitboard position from the current position of a game."""
+
+        position = cls(game.chess_board)
+        position.turn = game.turn
+        position.colour = WHITE if game.turn.is_white() else BLACK
+        position.castling = (WHITE_KING_SIDE * game.castling_rights.white_king_side |
+                             WHITE_QUEEN_SIDE * game.castling_rights.white_queen_side |
+                             BLACK_KING_SIDE * game.castling_rights.black_king_side |
+                             BLACK_QUEEN_SIDE * game.castling_rights.black_queen_side)
+        if game.en_passant_to_square is not None:
+            position.en_passant_square = game.en_passant_to_square[0] * 8 + game.en_passant_to_square[1]
+        position.position_key = position._compute_position_key()
+
+        return position
+
+    def pack(self) -> bytes:
+        """
+        Packs the position into 67 bytes to send it to other processes: the 64 square piece codes, the colour to
+        move, the castling rights bits and the en-passant square (64 if there is none). The move history is left out.
+        """
+
+        en_passant_square = 64 if self.en_passant_square is None else self.en_passant_square
+        return bytes(self.squares) + bytes((self.colour, self.castling, en_passant_square))
+
+    @classmethod
+    def unpack(cls, state: bytes) -> "BitboardPosition":
+        """Creates a position from the bytes of BitboardPosition.pack."""
+
+        chess_board = Board()
+        for square in range(64):
+            chess_board.squares[BOARD_SQUARES[square]] = state[square]
+
+        position = cls(chess_board)
+        position.colour, position.castling = state[64], state[65]
+        position.turn = Turn.WHITE if position.colour == WHITE else Turn.BLACK
+        position.en_passant_square = None if state[66] == 64 else state[66]
+        position.position_key = position._compute_position_key()
+
+        return position
+
+    def _compute_position_key(self) -> int:
+        """Computes the Zobrist key of the position from scratch."""
+
+        key = 0
+        for square, code in enumerate(self.squares):
+            key ^= PIECE_SQUARE_KEYS[code][square]
+
+        if self.colour == BLACK:
+            key ^= BLACK_TO_MOVE_KEY
+
+        return key ^ CASTLING_KEYS[self.castling] ^ self._get_en_passant_key()
+
+    def _get_en_passant_key(self) -> int:
+        """Gets the en-passant part of the position key, only set if a pawn to move can capture en-passant."""
+
+        en_passant_square = self.en_passant_square
+        if en_passant_square is not None and \
+                PAWN_ATTACKS[self.colour ^ COLOURS][en_passant_square] & self.bitboards[self.colour | PAWN]:
+            return EN_PASSANT_KEYS[en_passant_square % 8]
+
+        return 0
+
+    def _put_piece(self, square: int, code: int) -> None:
+        """Places a piece code on an empty square."""
+
+        self.bitboards[code] |= 1 << square
+        self.occupancy[code & COLOURS] |= 1 << square
+        self.squares[square] = code
+
+    @property
+    def castling_rights(self) -> CastlingRights:
+        """Castling rights of the position."""
+
+        return CastlingRights(bool(self.castling & WHITE_KING_SIDE), bool(self.castling & WHITE_QUEEN_SIDE),
+                              bool(self.castling & BLACK_KING_SIDE), bool(self.castling & BLACK_QUEEN_SIDE))
+
+    def piece_squares(self) -> Iterator[Tuple[int, int, Piece]]:
+        """Yields the row, column and piece of every occupied square."""
+
+        for square, code in enumerate(self.squares):
+            if code:
+                yield square // 8, square % 8, CODE_PIECES[code]
+
+    def move_details(self, move: int) -> Tuple[int, int, int, int, int]:
+        """Gets the squares and the moved, captured and promoted to piece codes of a move."""
+
+        from_square, to_square = move & 63, move >> 6 & 63
+        promotion, flag = move >> 12 & 7, move >> 15
+        piece = self.squares[from_square]
+        captured = (self.colour ^ COLOURS) | PAWN if flag == FLAG_EN_PASSANT else self.squares[to_square]
+
+        return from_square, to_square, piece, captured, self.colour | promotion if promotion else EMPTY
+
+    def attackers(self, square: int, colour: int, occupancy: int) -> int:
+        """Gets the pieces of a colour attacking a square given the board occupancy."""
+
+        bitboards = self.bitboards
+        return (KNIGHT_ATTACKS[square] & bitboards[colour | KNIGHT] |
+                KING_ATTACKS[square] & bitboards[colour | KING] |
+                PAWN_ATTACKS[colour ^ COLOURS][square] & bitboards[colour | PAWN] |
+                bishop_attacks(square, occupancy) & (bitboards[colour | BISHOP] | bitboards[colour | QUEEN]) |
+                rook_attacks(square, occupancy) & (bitboards[colour | ROOK] | bitboards[colour | QUEEN]))
+
+    def is_square_attacked(self, square: int, colour: int, occupancy: int, removed: int = 0) -> bool:
+        """Checks if a square is attacked by a colour, ignoring attackers on the removed squares."""
+
+        bitboards = self.bitboards
+        keep = ~removed
+        if KNIGHT_ATTACKS[square] & bitboards[colour | KNIGHT] & keep:
+            return True
+        if PAWN_ATTACKS[colour ^ COLOURS][square] & bitboards[colour | PAWN] & keep:
+            return True
+        if KING_ATTACKS[square] & bitboards[colour | KING]:
+            return True
+        diagonal = (bitboards[colour | BISHOP] | bitboards[colour | QUEEN]) & keep
+        if diagonal and bishop_attacks(square, occupancy) & diagonal:
+            return True
+        straight = (bitboards[colour | ROOK] | bitboards[colour | QUEEN]) & keep
+        return bool(straight and rook_attacks(square, occupancy) & straight)
+
+    def is_king_checked(self) -> bool:
+        """Checks if the king of the side to move is under check."""
+
+        king_square = self.bitboards[self.colour | KING].bit_length() - 1
+        return self.is_square_attacked(king_square, self.colour ^ COLOURS, self.occupancy[WHITE] | self.occupancy[BLACK])
+
+    def _pinned_pieces(self, king_square: int, us: int, them: int, occupancy: int) -> int:
+        """Gets the pieces of the side to move that are pinned to their king."""
+
+        bitboards = self.bitboards
+        queens = bitboards[them | QUEEN]
+        snipers = (ROOK_TABLES[king_square][0] & (bitboards[them | ROOK] | queens) |
+                   BISHOP_TABLES[king_square][0] & (bitboards[them | BISHOP] | queens))
+        pinned = 0
+        while snipers:
+            sniper = snipers & -snipers
+            snipers ^= sniper
+            blockers = BETWEEN[king_square][sniper.bit_length() - 1] & occupancy
+            if blockers and not blockers & (blockers - 1) and blockers & self.occupancy[us]:
+                pinned |= blockers
+
+        return pinned
+
+    def _is_en_passant_legal(self, move: int, king_square: int, them: int, occupancy: int) -> bool:
+        """Checks that an en-passant capture does not leave the king in check."""
+
+        from_square, to_square = move & 63, move >> 6 & 63
+        captured = 1 << (to_square + 8 if self.colour == WHITE else to_square - 8)
+        occupancy_after = (occupancy ^ (1 << from_square) ^ captured) | (1 << to_square)
+
+        return not self.is_square_attacked(king_square, them, occupancy_after, captured)
+
+    def get_valid_moves(self) -> List[int]:
+        """Generates all the valid moves in a position."""
+
+        moves: List[int] = []
+        bitboards = self.bitboards
+        us = self.colour
+        them = us ^ COLOURS
+        own = self.occupancy[us]
+        occupancy = own | self.occupancy[them]
+        empty = ~occupancy & FULL_BOARD
+
+        king_square = bitboards[us | KING].bit_length() - 1
+        checkers = self.attackers(king_square, them, occupancy)
+        pinned = self._pinned_pieces(king_square, us, them, occupancy)
+
+        # King moves (the king is lifted off the board so it cannot hide behind itself from a slider)
+        occupancy_without_king = occupancy ^ (1 << king_square)
+        targets = KING_ATTACKS[king_square] & ~own
+        while targets:
+            target = targets & -targets
+            targets ^= target
+            to_square = target.bit_length() - 1
+            if not self.is_square_attacked(to_square, them, occupancy_without_king, target):
+                moves.append(king_square | to_square << 6)
+
+        if checkers & (checkers - 1):   # Double check, only the king can move
+            self._update_game_over(moves, checkers)
+            return moves
+
+        # Non king moves must capture the checker or block the check
+        check_mask = FULL_BOARD
+        if checkers:
+            check_mask = checkers | BETWEEN[king_square][checkers.bit_length() - 1]
+
+        self._add_pawn_moves(moves, us, them, empty, check_mask, pinned, king_square)
+        self._add_piece_moves(moves, us, own, occupancy, check_mask, pinned, king_square)
+
+        if self.en_passant_square is not None:
+            capturers = PAWN_ATTACKS[them][self.en_passant_square] & bitboards[us | PAWN]
+            while capturers:
+                capturer = capturers & -capturers
+                capturers ^= capturer
+                move = encode_move(capturer.bit_length() - 1, self.en_passant_square, flag=FLAG_EN_PASSANT)
+                if self._is_en_passant_legal(move, king_square, them, occupancy):
+                    moves.append(move)
+
+        if not checkers:
+            self._add_castling_moves(moves, us, them, occupancy)
+
+        self._update_game_over(moves, checkers)
+        return moves
+
+    def _update_game_over(self, moves: List[int], checkers: int) -> None:
+        """Sets the check mate and stale mate flags after generating moves."""
+
+        self.check_mate = not moves and bool(checkers)
+        self.stale_mate = not moves and not checkers
+
+    @staticmethod
+    def _add_pawn_move(moves: List[int], from_square: int, to_square: int, flag: int = FLAG_NONE) -> None:
+        """Adds a pawn move, expanded into all promotions on the last row."""
+
+        if to_square < 8 or to_square >= 56:
+            for promotion in PROMOTION_TYPES:
+                moves.append(from_square | to_square << 6 | promotion << 12)
+        else:
+            moves.append(from_square | to_square << 6 | flag << 15)
+
+    def _add_pawn_moves(self, moves: List[int], us: int, them: int, empty: int, check_mask: int, pinned: int,
+                        king_square: int) -> None:
+        """Adds the pawn pushes and captures, set wise for all pawns at once."""
+
+        pawns = self.bitboards[us | PAWN]
+        enemies = self.occupancy[them] & check_mask
+
+        if us == WHITE:
+            single = pawns >> 8 & empty
+            double = (single & WHITE_DOUBLE_PUSH_ROW) >> 8 & empty & check_mask
+            push, left, right = 8, 9, 7
+            captures_left = (pawns & ~0x0101010101010101) >> 9 & enemies
+            captures_right = (pawns & ~0x8080808080808080) >> 7 & enemies
+        else:
+            single = pawns << 8 & empty
+            double = (single & BLACK_DOUBLE_PUSH_ROW) << 8 & empty & check_mask
+            push, left, right = -8, -9, -7
+            captures_left = (pawns & ~0x8080808080808080) << 9 & enemies
+            captures_right = (pawns & ~0x0101010101010101) << 7 & enemies
+        single &= check_mask
+
+        for targets, offset, flag in ((single, push, FLAG_NONE), (double, 2 * push, FLAG_DOUBLE_PUSH),
+                                      (captures_left, left, FLAG_NONE), (captures_right, right, FLAG_NONE)):
+            while targets:
+                target = targets & -targets
+                targets ^= target
+                to_square = target.bit_length() - 1
+                from_square = to_square + offset
+                if pinned >> from_square & 1 and not target & LINE[king_square][from_square]:
+                    continue
+                self._add_pawn_move(moves, from_square, to_square, flag)
+
+    def _add_piece_moves(self, moves: List[int], us: int, own: int, occupancy: int, check_mask: int, pinned: int,
+                         king_square: int) -> None:
+        """Adds the knight, bishop, rook and queen moves."""
+
+        bitboards = self.bitboards
+        allowed = ~own & check_mask
+        queens = bitboards[us | QUEEN]
+
+        for piece_type, pieces in ((KNIGHT, bitboards[us | KNIGHT]), (BISHOP, bitboards[us | BISHOP] | queens),
+                                   (ROOK, bitboards[us | ROOK] | queens)):
+            while pieces:
+                piece = pieces & -pieces
+                pieces ^= piece
+                from_square = piece.bit_length() - 1
+
+                if piece_type == KNIGHT:
+                    if piece & pinned:  # A pinned knight can never move
+                        continue
+                    targets = KNIGHT_ATTACKS[from_square] & allowed
+                elif piece_type == BISHOP:
+                    targets = BISHOP_TABLES[from_square][occupancy & BISHOP_MASKS[from_square]] & allowed
+                else:
+                    targets = ROOK_TABLES[from_square][occupancy & ROOK_MASKS[from_square]] & allowed
+
+                if piece & pinned:
+                    targets &= LINE[king_square][from_square]
+
+                while targets:
+                    target = targets & -targets
+                    targets ^= target
+                    moves.append(from_square | (target.bit_length() - 1) << 6)
+
+    def _add_castling_moves(self, moves: List[int], us: int, them: int, occupancy: int) -> None:
+        """Adds the castling moves, the king must not pass through or land on an attacked square."""
+
+        if us == WHITE:
+            king_side, queen_side, king_square = WHITE_KING_SIDE, WHITE_QUEEN_SIDE, 60
+        else:
+            king_side, queen_side, king_square = BLACK_KING_SIDE, BLACK_QUEEN_SIDE, 4
+        rooks = self.bitboards[us | ROOK]
+
+        if self.castling & king_side and rooks >> (king_square + 3) & 1 and \
+                not occupancy & (0b11 << (king_square + 1)) and \
+                not self.is_square_attacked(king_square + 1, them, occupancy) and \
+                not self.is_square_attacked(king_square + 2, them, occupancy):
+            moves.append(encode_move(king_square, king_square + 2, flag=FLAG_CASTLE))
+
+        if self.castling & queen_side and rooks >> (king_square - 4) & 1 and \
+                not occupancy & (0b111 << (king_square - 3)) and \
+                not self.is_square_attacked(king_square - 1, them, occupancy) and \
+                not self.is_square_attacked(king_square - 2, them, occupancy):
+            moves.append(encode_move(king_square, king_square - 2, flag=FLAG_CASTLE))
+
+    def make_move(self, move: int) -> None:
+        """Makes a chess move."""
+
+        from_square, to_square = move & 63, move >> 6 & 63
+        promotion, flag = move >> 12 & 7, move >> 15
+        bitboards, occupancy, squares = self.bitboards, self.occupancy, self.squares
+        us = self.colour
+        them = us ^ COLOURS
+
+        piece = squares[from_square]
+        captured = squares[to_square]
+        self._history.append((captured, self.castling, self.en_passant_square, self.position_key,
+                              self.material_score, self.positional_score))
+        position_key = self.position_key ^ self._get_en_passant_key() ^ CASTLING_KEYS[self.castling] ^ \
+            PIECE_SQUARE_KEYS[piece][from_square] ^ PIECE_SQUARE_KEYS[captured][to_square]
+        material_score = self.material_score - MATERIAL_SCORES[captured]
+        positional_score = self.positional_score - SQUARE_SCORES[piece][from_square] - SQUARE_SCORES[captured][to_square]
+
+        from_to = 1 << from_square | 1 << to_square
+        bitboards[piece] ^= from_to
+        occupancy[us] ^= from_to
+        squares[from_square] = EMPTY
+        squares[to_square] = piece
+
+        if captured:
+            bitboards[captured] ^= 1 << to_square
+            occupancy[them] ^= 1 << to_square
+
+        if flag == FLAG_EN_PASSANT:
+            captured_square = to_square + 8 if us == WHITE else to_square - 8
+            bitboards[them | PAWN] ^= 1 << captured_square
+            occupancy[them] ^= 1 << captured_square
+            squares[captured_square] = EMPTY
+            position_key ^= PIECE_SQUARE_KEYS[them | PAWN][captured_square]
+            material_score -= MATERIAL_SCORES[them | PAWN]
+            positional_score -= SQUARE_SCORES[them | PAWN][captured_square]
+
+        elif flag == FLAG_CASTLE:
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_square]
+            rook_from_to = 1 << rook_from | 1 << rook_to
+            bitboards[us | ROOK] ^= rook_from_to
+            occupancy[us] ^= rook_from_to
+            squares[rook_from] = EMPTY
+            squares[rook_to] = us | ROOK
+            position_key ^= PIECE_SQUARE_KEYS[us | ROOK][rook_from] ^ PIECE_SQUARE_KEYS[us | ROOK][rook_to]
+            positional_score += SQUARE_SCORES[us | ROOK][rook_to] - SQUARE_SCORES[us | ROOK][rook_from]
+
+        if promotion:
+            bitboards[piece] ^= 1 << to_square
+            bitboards[us | promotion] ^= 1 << to_square
+            squares[to_square] = us | promotion
+            material_score += MATERIAL_SCORES[us | promotion] - MATERIAL_SCORES[piece]
+
+        self.castling &= CASTLING_MASKS[from_square] & CASTLING_MASKS[to_square]
+        self.en_passant_square = (from_square + to_square) // 2 if flag == FLAG_DOUBLE_PUSH else None
+        self.colour = them
+        self.turn = Turn.WHITE if them == WHITE else Turn.BLACK
+        self.move_log.append(move)
+        self.position_key = position_key ^ PIECE_SQUARE_KEYS[squares[to_square]][to_square] ^ BLACK_TO_MOVE_KEY ^ \
+            CASTLING_KEYS[self.castling] ^ self._get_en_passant_key()
+        self.material_score = material_score
+        self.positional_score = positional_score + SQUARE_SCORES[squares[to_square]][to_square]
+
+    def undo_move(self) -> None:
+        """Undo a last made move."""
+
+        if not self.move_log:
+            return
+
+        move = self.move_log.pop()
+        captured, self.castling, self.en_passant_square, self.position_key, self.material_score, \
+            self.positional_score = self._history.pop()
+        from_square, to_square = move & 63, move >> 6 & 63
+        promotion, flag = move >> 12 & 7, move >> 15
+        bitboards, occupancy, squares = self.bitboards, self.occupancy, self.squares
+        them = self.colour
+        us = them ^ COLOURS
+        self.colour = us
+        self.turn = Turn.WHITE if us == WHITE else Turn.BLACK
+
+        piece = squares[to_square]
+        if promotion:
+            bitboards[piece] ^= 1 << to_square
+            piece = us | PAWN
+            bitboards[piece] ^= 1 << to_square
+
+        from_to = 1 << from_square | 1 << to_square
+        bitboards[piece] ^= from_to
+        occupancy[us] ^= from_to
+        squares[from_square] = piece
+        squares[to_square] = captured
+
+        if captured:
+            bitboards[captured] ^= 1 << to_square
+            occupancy[them] ^= 1 << to_square
+
+        if flag == FLAG_EN_PASSANT:
+            captured_square = to_square + 8 if us == WHITE else to_square - 8
+            bitboards[them | PAWN] ^= 1 << captured_square
+            occupancy[them] ^= 1 << captured_square
+            squares[captured_square] = them | PAWN
+
+        elif flag == FLAG_CASTLE:
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_square]
+            rook_from_to = 1 << rook_from | 1 << rook_to
+            bitboards[us | ROOK] ^= rook_from_to
+            occupancy[us] ^= rook_from_to
+            squares[rook_to] = EMPTY
+            squares[rook_from] = us | ROOK
@@ -1,8 +1,71 @@
 import copy
+from array import array
 from pprint import pprint
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator
 
-from playchess.piece import Piece
+from playchess.piece import (Piece, PIECE_CODES, CODE_PIECES, CODE_FEN_LETTERS, FEN_LETTER_CODES, EMPTY, OFFBOARD,
+                             TYPE_MASK, WHITE, BLACK, KING)
+
+
+# The board is stored as a 10x12 mailbox: the 8x8 board surrounded by a border of OFFBOARD sentinel squares
+# (two rows above and below so knight jumps never leave the array). Row 0 / col 0 of the board is mailbox index 21.
+MAILBOX_SIZE = 120
+MAILBOX_WIDTH = 10
+
+# Mailbox offsets of the directions pieces can move in
+NORTH = -MAILBOX_WIDTH
+SOUTH = MAILBOX_WIDTH
+EAST = 1
+WEST = -1
+ROOK_DIRECTIONS: Tuple[int, ...] = (NORTH, WEST, SOUTH, EAST)     # Up, Left, Down, Right
+BISHOP_DIRECTIONS: Tuple[int, ...] = (NORTH + WEST, NORTH + EAST, SOUTH + WEST, SOUTH + EAST)     # Diagonals
+QUEEN_DIRECTIONS: Tuple[int, ...] = BISHOP_DIRECTIONS + ROOK_DIRECTIONS
+WHITE_PAWN_CAPTURES: Tuple[int, ...] = (NORTH + WEST, NORTH + EAST)     # Captures left, Captures right
+BLACK_PAWN_CAPTURES: Tuple[int, ...] = (SOUTH + EAST, SOUTH + WEST)     # Captures left, Captures right
+KNIGHT_OFFSETS: Tuple[int, ...] = (-21, -19, -12, -8, 8, 12, 19, 21)
+KING_OFFSETS: Tuple[int, ...] = (-11, -10, -9, -1, 1, 9, 10, 11)
+
+
+def mailbox_index(row: int, col: int) -> int:
+    """Gets the mailbox index of a given row and column."""
+    return 21 + row * MAILBOX_WIDTH + col
+
+
+# Mailbox indices of the 64 board squares in row major order and the reverse mapping to (row, col)
+BOARD_SQUARES: Tuple[int, ...] = tuple(mailbox_index(row, col) for row in range(8) for col in range(8))
+SQUARE_ROW_COL: Dict[int, Tuple[int, int]] = {mailbox_index(row, col): (row, col)
+                                              for row in range(8) for col in range(8)}
+
+# Chess notation names of the (row, col) squares
+SQUARE_NAMES: Dict[Tuple[int, int], str] = {(row, col): "abcdefgh"[col] + str(8 - row)
+                                            for row in range(8) for col in range(8)}
+
+
+class _BoardRow:
+    """Compatibility view of one row of the mailbox, supports `board[row][col]` access with pieces."""
+
+    __slots__ = ("_squares", "_start")
+
+    def __init__(self, squares: "array[int]", row: int):
+        self._squares = squares
+        self._start = mailbox_index(row, 0)
+
+    def __getitem__(self, col: int) -> Piece:
+        if not 0 <= col < 8:
+            raise IndexError("board column out of range")
+        return CODE_PIECES[self._squares[self._start + col]]
+
+    def __setitem__(self, col: int, piece: Piece) -> None:
+        if not 0 <= col < 8:
+            raise IndexError("board column out of range")
+        self._squares[self._start + col] = PIECE_CODES[piece]
+
+    def __len__(self) -> int:
+        return 8
+
+    def __iter__(self) -> Iterator[Piece]:
+        for col in range(8):
+            yield CODE_PIECES[self._squares[self._start + col]]
 
 
 class Board:
@@ -11,7 +74,7 @@ class Board:
     """
 
     def __init__(self):
-        self.board: List[List[Piece]] = self._get_fresh_board_()
+        self.squares: "array[int]" = array("b", _FRESH_SQUARES)
 
         # Mappings between notation and board matrix positions
         self.ranks_to_rows: Dict[str, int] = {"1": 7, "2": 6, "3": 5, "4": 4, "5": 3, "6": 2, "7": 1, "8": 0}
@@ -21,12 +84,32 @@ class Board:
         self.white_king_location: Tuple[int, int] = (7, 4)
         self.black_king_location: Tuple[int, int] = (0, 4)
 
+    @property
+    def board(self) -> List[_BoardRow]:
+        """Board matrix view of the mailbox."""
+        return [_BoardRow(self.squares, row) for row in range(8)]
+
+    @board.setter
+    def board(self, board: List[List[Piece]]) -> None:
+        self.squares = self._to_mailbox(board)
+
     def print(self) -> None:
         """Prints the board matrix."""
 
         for row in self.board:
             pprint([piece.value for piece in row])
 
+    @staticmethod
+    def _to_mailbox(board: List[List[Piece]]) -> "array[int]":
+        """Encodes a board matrix into a mailbox of piece codes."""
+
+        squares = array("b", [OFFBOARD] * MAILBOX_SIZE)
+        for row_no, row in enumerate(board):
+            for col_no, piece in enumerate(row):
+                squares[mailbox_index(row_no, col_no)] = PIECE_CODES[piece]
+
+        return squares
+
     @staticmethod
     def _get_fresh_board_() -> List[List[Piece]]:
         """Gets a fresh board to start a chess game."""
@@ -49,32 +132,105 @@ class Board:
         """Gets square name in chess notation for a given row and column."""
         return self.cols_to_files[col] + self.rows_to_ranks[row]
 
-    def __getitem__(self, item: int):
-        return self.board[item]
+    def __getitem__(self, item: int) -> _BoardRow:
+        if not 0 <= item < 8:
+            raise IndexError("board row out of range")
+        return _BoardRow(self.squares, item)
+
+    def get_piece(self, row: int, col: int) -> Piece:
+        """Gets the piece on a given square."""
+
+        return CODE_PIECES[self.squares[21 + row * MAILBOX_WIDTH + col]]
 
     def is_empty_square(self, row: int, col: int) -> bool:
         """Checks if a given square is empty."""
 
-        return True if self.board[row][col].is_none() else False
+        return self.squares[21 + row * MAILBOX_WIDTH + col] == EMPTY
 
     def clear_square(self, row: int, col: int) -> None:
         """Empties a square."""
 
-        self.board[row][col] = Piece.NONE
+        self.squares[21 + row * MAILBOX_WIDTH + col] = EMPTY
 
     def update_square(self, row: int, col: int, piece: Piece) -> None:
         """Updates a square to a given piece."""
 
-        self.board[row][col] = piece
-
-    def __iter__(self):
-        for row in self.board:
-            yield row
+        self.squares[21 + row * MAILBOX_WIDTH + col] = PIECE_CODES[piece]
+
+    def __iter__(self) -> Iterator[_BoardRow]:
+        for row in range(8):
+            yield _BoardRow(self.squares, row)
+
+    @classmethod
+    def from_fen(cls, placement: str) -> "Board":
+        """Creates a board from the piece placement field of a FEN string, e.g. rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR."""
+
+        ranks = placement.split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"FEN piece placement must have 8 ranks: {placement}")
+
+        chess_board = cls()
+        squares = array("b", [OFFBOARD] * MAILBOX_SIZE)
+        king_locations = {}
+        for row, rank in enumerate(ranks):
+            col = 0
+            for letter in rank:
+                if letter.isdigit():
+                    for _ in range(int(letter)):
+                        if col < 8:
+                            squares[21 + row * MAILBOX_WIDTH + col] = EMPTY
+                        col += 1
+                    continue
+
+                code = FEN_LETTER_CODES.get(letter)
+                if code is None:
+                    raise ValueError(f"Unknown piece {letter!r} in FEN piece placement: {placement}")
+                if col < 8:
+                    squares[21 + row * MAILBOX_WIDTH + col] = code
+                    if code & TYPE_MASK == KING:
+                        if code in king_locations:
+                            raise ValueError(f"FEN piece placement must have one king of each colour: {placement}")
+                        king_locations[code] = (row, col)
+                col += 1
+
+            if col != 8:
+                raise ValueError(f"FEN rank {8 - row} must have 8 squares: {placement}")
+
+        if WHITE | KING not in king_locations or BLACK | KING not in king_locations:
+            raise ValueError(f"FEN piece placement must have one king of each colour: {placement}")
+
+        chess_board.squares = squares
+        chess_board.white_king_location = king_locations[WHITE | KING]
+        chess_board.black_king_location = king_locations[BLACK | KING]
+
+        return chess_board
+
+    def to_fen(self) -> str:
+        """Gets the piece placement field of a FEN string of the board."""
+
+        ranks = []
+        for row in range(8):
+            rank = ""
+            empty = 0
+            for square in range(21 + row * MAILBOX_WIDTH, 29 + row * MAILBOX_WIDTH):
+                code = self.squares[square]
+                if code == EMPTY:
+                    empty += 1
+                    continue
+
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += CODE_FEN_LETTERS[code]
+
+            ranks.append(rank + str(empty) if empty else rank)
+
+        return "/".join(ranks)
 
     def reset(self):
         """Resets the board."""
 
-        self.board = self._get_fresh_board_()
+        self.squares = array("b", _FRESH_SQUARES)
         self.white_king_location = (7, 4)
         self.black_king_location = (0, 4)
 
@@ -84,6 +240,10 @@ class Board:
         return copy.deepcopy(self)
 
 
+# Mailbox of a fresh board, copied by new boards instead of being encoded every time
+_FRESH_SQUARES = Board._to_mailbox(Board._get_fresh_board_())
+
+
 def main():
     b = Board()
     b.print()
@@ -3,6 +3,9 @@ Configuration settings for playchess.
 """
 
 
+from typing import Optional
+
+
 BOARD_WIDTH = BOARD_HEIGHT = 512     # Width and Height of the chess board
 
 DIMENSIONS = 8  # Chess board is 8x8
@@ -11,6 +14,10 @@ SQUARE_SIZE = BOARD_HEIGHT // DIMENSIONS  # Size of each square
 
 MAX_FPS = 15    # For Animations
 
+EVENT_DRIVEN_REDRAW = True  # Sleeps until an event comes while nothing changes, instead of polling at MAX_FPS
+
+SHOW_FRAME_TIMES = False    # Prints how long frames took to draw, the frames drawn and idle CPU usage when the game window is closed
+
 BACKGROUND_COLOUR = "white"     # Background color of the board
 
 LIGHT_SQUARE_COLOUR = "white"   # Colour of light squares
@@ -35,6 +42,8 @@ WHITE_WINS_TEXT = "White wins by Checkmate!"
 
 STALEMATE_TEXT = "Stalemate!"
 
+THINKING_TEXT = "Thinking..."       # Shown in the move log panel while a bot searches its move
+
 MOVE_LOG_PANEL_WIDTH = 250
 
 MOVE_LOG_PANEL_HEIGHT = BOARD_HEIGHT
@@ -44,3 +53,15 @@ MOVE_LOG_PANEL_BACKGROUND_COLOUR = "black"
 MOVE_LOG_FONT_SIZE = 12
 
 MOVE_LOG_FONT_COLOUR = "white"
+
+TRANSPOSITION_TABLE_SIZE_MB = 16    # Memory budget of a move finder's transposition table
+
+SEARCH_TIME_LIMIT = 3.0     # Seconds an iterative deepening move finder searches a move for
+
+MAX_SEARCH_DEPTH = 32       # Deepest iteration of an iterative deepening move finder
+
+MAX_QUIESCENCE_DEPTH = 8    # Most captures and promotions searched past the depth of a negamax move finder
+
+PARALLEL_SEARCH_WORKERS = 4     # Processes a parallel move finder searches with
+
+OPENING_BOOK_PATH: Optional[str] = None    # Opening book file bots play their opening moves from, built by playchess.opening_book
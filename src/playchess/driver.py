@@ -1,27 +1,42 @@
-from typing import List, Tuple, Union
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
 
-import pygame
-from playchess._utils import draw_game_over_text
+try:
+    import pygame
+except ImportError as error:
+    raise ImportError("Playing in a window needs pygame, install it with: pip install playchess[gui]") from error
+
+from playchess._utils import draw_game_over_text, draw_thinking_text
+from playchess.background_search import BackgroundSearch
 from playchess.board import Board
-from playchess.config import (BOARD_WIDTH, BOARD_HEIGHT, BACKGROUND_COLOUR, SQUARE_SIZE, MAX_FPS,
-                              BLACK_WINS_TEXT, WHITE_WINS_TEXT, STALEMATE_TEXT, MOVE_LOG_PANEL_WIDTH)
+from playchess.config import (BOARD_WIDTH, BOARD_HEIGHT, BACKGROUND_COLOUR, SQUARE_SIZE, MAX_FPS, SHOW_FRAME_TIMES,
+                              EVENT_DRIVEN_REDRAW, OPENING_BOOK_PATH, BLACK_WINS_TEXT, WHITE_WINS_TEXT, STALEMATE_TEXT, MOVE_LOG_PANEL_WIDTH)
 from playchess.game import Game
+from playchess.gui import GameRenderer, LoopStats
 from playchess.move import Move
-from playchess.move_finder import (RandomMoveFinder, MaterialMoveFinder, MinMaxMoveFinder, PrunedMinMaxMoveFinder)
+from playchess.move_finder import AI_MOVE_FINDERS, create_move_finder
+from playchess.transposition_table import TranspositionTable
 
 
-AI_MOVE_FINDERS = {"random": RandomMoveFinder,
-                   "material": MaterialMoveFinder,
-                   "minmax": MinMaxMoveFinder,
-                   "minmax_pruned": PrunedMinMaxMoveFinder}
+SEARCH_DONE_EVENT = pygame.USEREVENT    # Posted by a bot's background search once it has finished
 
 
-def play(player1: str = "human", player2: str = "bot", ai: str = "minmax_pruned", depth: int = 2):
+def play(player1: str = "human", player2: str = "bot", ai: str = "minmax_pruned", depth: int = 2,
+         event_driven: bool = EVENT_DRIVEN_REDRAW, book: Optional[str] = OPENING_BOOK_PATH):
     """
     Main driver to play the game.
+
+    Bots search their moves in a background thread, so the window keeps responding while they think. Undoing,
+    resetting or quitting cancels the search. Only the parts of the window that changed are drawn and updated. Bots
+    play from the opening book at the book path, if there is one, before they search. Each bot keeps its
+    transposition table from move to move until the game is reset.
+
+    Event driven, the loop sleeps in pygame.event.wait while a human is to move, a bot is searching or the game is
+    over, and wakes up on input or a finished search. Otherwise it polls for events at MAX_FPS.
     """
 
     pygame.init()
+    pygame.event.set_blocked(pygame.MOUSEMOTION)    # Nothing follows the mouse, moving it should not wake the loop
     screen = pygame.display.set_mode((BOARD_WIDTH + MOVE_LOG_PANEL_WIDTH, BOARD_HEIGHT))
     clock = pygame.time.Clock()
     screen.fill(pygame.Color(BACKGROUND_COLOUR))
@@ -32,21 +47,37 @@ def play(player1: str = "human", player2: str = "bot", ai: str = "minmax_pruned"
 
     valid_moves = game.get_valid_moves()
 
-    board_state_changed: bool = False
+    board_state_changed: bool = True     # So the first frame is drawn before the loop waits for events
     game_over: bool = False
 
     human_plays_white: bool = True if player1 == "human" else False
     human_plays_black: bool = True if player2 == "human" else False
 
-    game.draw(screen, selected_square, valid_moves)
+    ai_search: Optional[BackgroundSearch] = None
+    transposition_tables: Dict[bool, TranspositionTable[Move]] = {}     # Of the bots, by whether they play white
+
+    renderer = GameRenderer()
+    texts_shown: Tuple[bool, bool] = (False, False)     # Whether the game over and thinking texts are on the screen
+    loop_stats = LoopStats()
 
     while True:
         human_turn = (game.turn.is_white() and human_plays_white) or \
                      (not game.turn.is_white() and human_plays_black)
+        loop_stats.next_iteration(idle=human_turn or game_over)
+
+        # Nothing changes until an event comes: a human's input or a search finishing
+        waiting = human_turn or game_over or (ai_search is not None and not ai_search.is_done())
+        if event_driven and waiting and not board_state_changed and texts_shown == (game_over, ai_search is not None):
+            events = [pygame.event.wait()] + pygame.event.get()
+        else:
+            events = pygame.event.get()
 
-        for e in pygame.event.get():
+        for e in events:
             if e.type == pygame.QUIT:
-                quit(0)
+                _quit(ai_search, renderer, loop_stats)
+
+            elif e.type == pygame.WINDOWEXPOSED:    # the window was covered, draw all of it again
+                renderer.invalidate()
 
             elif e.type == pygame.MOUSEBUTTONDOWN:
                 if game_over or not human_turn:
@@ -77,59 +108,109 @@ def play(player1: str = "human", player2: str = "bot", ai: str = "minmax_pruned"
                     selected_square = None
                     move_making_clicks.clear()
 
+            elif e.type == pygame.MOUSEWHEEL:   # scroll the move log
+                renderer.move_log.scroll(-e.y)
+
             elif e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_u:     # click 'u' to undo move
+                    _cancel_search(ai_search)
+                    ai_search = None
                     game.undo_move()
                     board_state_changed = True
 
                 elif e.key == pygame.K_r:   # click 'r' to reset game
+                    _cancel_search(ai_search)
+                    ai_search = None
                     game = Game(Board())
+                    transposition_tables.clear()
                     valid_moves = game.get_valid_moves()
                     move_making_clicks = []
                     selected_square = None
                     board_state_changed = False
 
                 elif e.key == pygame.K_q:   # click 'q' to quit game
-                    quit(0)
+                    _quit(ai_search, renderer, loop_stats)
 
         if board_state_changed:
             valid_moves = game.get_valid_moves()
             board_state_changed = False
 
         game_over = True if game.check_mate or game.stale_mate else False
-        if game_over:
-            _display_game_over_text(screen, game)
 
-        clock.tick(MAX_FPS)
-        pygame.display.flip()
-        game.draw(screen, selected_square, valid_moves)
+        # The texts are drawn over the board and move log, so the renderer redraws everything once they come or go
+        if (game_over, ai_search is not None) != texts_shown:
+            texts_shown = (game_over, ai_search is not None)
+            renderer.invalidate()
+
+        dirty_rects = renderer.draw(screen, game, selected_square, valid_moves)
+        if dirty_rects:
+            if game_over:
+                dirty_rects.append(_display_game_over_text(screen, game))
+            if ai_search is not None:
+                dirty_rects.append(draw_thinking_text(screen))
+            pygame.display.update(dirty_rects)
+            loop_stats.frames_drawn += 1
 
-        # AI moves
+        if dirty_rects or not event_driven:
+            clock.tick(MAX_FPS)
+
+        # AI moves, searched in the background and made once found
         if not human_turn and not game_over:
-            ai_move_finder = AI_MOVE_FINDERS[ai]
-            if ai == "random":
-                ai_move = ai_move_finder(valid_moves).find_move()
-            elif ai == "material":
-                ai_move = ai_move_finder(game, valid_moves).find_move()
-            else:
-                ai_move = ai_move_finder(game, valid_moves, depth).find_move()
+            if ai_search is None:
+                if game.turn.is_white() not in transposition_tables:
+                    transposition_tables[game.turn.is_white()] = TranspositionTable()
+                ai_search = BackgroundSearch(game, partial(create_move_finder, ai, depth=depth, book=book,
+                                                           transposition_table=transposition_tables[game.turn.is_white()]),
+                                             on_done=_post_search_done if event_driven else None)
+
+            elif ai_search.is_done():
+                if not ai_search.is_stale(game):
+                    ai_move = ai_search.result(game, valid_moves)
+                    if ai_move is None:
+                        ai_move = AI_MOVE_FINDERS["random"](valid_moves).find_move()
+
+                    game.make_move(ai_move)
+                    board_state_changed = True
 
-            if ai_move is None:
-                ai_move = AI_MOVE_FINDERS["random"](valid_moves).find_move()
+                ai_search = None
 
-            game.make_move(ai_move)
-            board_state_changed = True
 
+def _post_search_done():
+    """Wakes up the game loop waiting for events, called from the search thread."""
 
-def _display_game_over_text(screen: pygame.surface.Surface, game_: Game):
-    """Display game over text using game state."""
+    try:
+        pygame.event.post(pygame.event.Event(SEARCH_DONE_EVENT))
+    except pygame.error:    # The window was closed while the search ran, nothing waits for it
+        pass
+
+
+def _cancel_search(ai_search: Optional[BackgroundSearch]):
+    """Cancels the search of a bot if one is running."""
+
+    if ai_search is not None:
+        ai_search.cancel()
+
+
+def _quit(ai_search: Optional[BackgroundSearch], renderer: GameRenderer, loop_stats: LoopStats):
+    """Cancels the search of a bot and quits."""
+
+    _cancel_search(ai_search)
+    loop_stats.stop()
+    if SHOW_FRAME_TIMES:
+        print(f"Frame times: {renderer.frame_timer}")
+        print(f"Game loop: {loop_stats}")
+    quit(0)
+
+
+def _display_game_over_text(screen: pygame.surface.Surface, game_: Game) -> pygame.Rect:
+    """Display game over text using game state, returns the rect drawn on."""
 
     if game_.check_mate and game_.turn.is_white():
-        draw_game_over_text(screen, BLACK_WINS_TEXT)
+        return draw_game_over_text(screen, BLACK_WINS_TEXT)
     elif game_.check_mate and not game_.turn.is_white():
-        draw_game_over_text(screen, WHITE_WINS_TEXT)
-    elif game_.stale_mate:
-        draw_game_over_text(screen, STALEMATE_TEXT)
+        return draw_game_over_text(screen, WHITE_WINS_TEXT)
+
+    return draw_game_over_text(screen, STALEMATE_TEXT)
 
 
 if __name__ == '__main__':
@@ -1,137 +1,179 @@
 from copy import copy
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
 
-import pygame
 from playchess._castling_rights import CastlingRights
-from playchess.board import Board
-from playchess.config import (SQUARE_SIZE, DIMENSIONS, LIGHT_SQUARE_COLOUR, DARK_SQUARE_COLOUR, SELECTED_SQUARE_COLOUR,
-                              SELECTED_SQUARE_ALPHA, MOVABLE_SQUARE_COLOUR, MOVABLE_SQUARE_ALPHA, BOARD_WIDTH,
-                              MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT, MOVE_LOG_PANEL_BACKGROUND_COLOUR,
-                              MOVE_LOG_FONT_COLOUR, MOVE_LOG_FONT_SIZE)
-from playchess.images import CHESS_PIECE_IMAGES
+from playchess.board import (Board, BOARD_SQUARES, SQUARE_ROW_COL, NORTH, SOUTH, EAST, ROOK_DIRECTIONS, BISHOP_DIRECTIONS,
+                             QUEEN_DIRECTIONS, KNIGHT_OFFSETS, KING_OFFSETS, WHITE_PAWN_CAPTURES, BLACK_PAWN_CAPTURES,
+                             mailbox_index)
 from playchess.move import Move
-from playchess.piece import Piece
+from playchess.position import Position
+from playchess.scorer import MATERIAL_SCORES, SQUARE_SCORES, count_scores
+from playchess.piece import Piece, CODE_PIECES, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, TYPE_MASK, WHITE, BLACK
 from playchess.turn import Turn
+from playchess.zobrist import (PIECE_SQUARE_KEYS, BLACK_TO_MOVE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS,
+                               castling_rights_bits)
 
+if TYPE_CHECKING:
+    import pygame
 
-class Game:
+
+# FEN castling right letters with the king's row, the rook's column and the colour that must be on those home squares
+CASTLING_HOME_SQUARES: Tuple[Tuple[str, int, int, int], ...] = (("K", 7, 7, WHITE), ("Q", 7, 0, WHITE),
+                                                                ("k", 0, 7, BLACK), ("q", 0, 0, BLACK))
+
+# Pieces a pawn can promote to
+WHITE_PROMOTIONS = (Piece.WHITE_QUEEN, Piece.WHITE_ROOK, Piece.WHITE_BISHOP, Piece.WHITE_KNIGHT)
+BLACK_PROMOTIONS = (Piece.BLACK_QUEEN, Piece.BLACK_ROOK, Piece.BLACK_BISHOP, Piece.BLACK_KNIGHT)
+
+
+class Game(Position[Move]):
     """
     Class to represent a chess game.
     """
 
-    def __init__(self, chess_board: Board):
+    def __init__(self, chess_board: Board, *, turn: Turn = Turn.WHITE, castling_rights: Optional[CastlingRights] = None,
+                 en_passant_to_square: Optional[Tuple[int, int]] = None, halfmove_clock: int = 0,
+                 fullmove_number: int = 1):
         self.chess_board = chess_board
         self.move_log: List[Move] = []
-        self.turn: Turn = Turn.WHITE
+        self.turn: Turn = turn
         self.check_mate: bool = False
         self.stale_mate: bool = False
-        self.en_passant_available: bool = True
-        self.en_passant_to_square: Optional[Tuple[int, int]] = None
-        self.castling_rights: CastlingRights = CastlingRights(True, True, True, True)
+        self.result: Optional[str] = None   # PGN result of an end not on the board, e.g. a resignation or a draw claim
+        self.en_passant_to_square: Optional[Tuple[int, int]] = en_passant_to_square
+        self.castling_rights: CastlingRights = castling_rights or CastlingRights(True, True, True, True)
         self.castling_rights_log: List[CastlingRights] = [copy(self.castling_rights)]
-        self.en_passant_to_square_log: List[Optional[Tuple[int, int]]] = [None]
+        self.en_passant_to_square_log: List[Optional[Tuple[int, int]]] = [en_passant_to_square]
+
+        # Move counters of the starting position, the counters of later positions are derived from the move log
+        self.start_halfmove_clock = halfmove_clock
+        self.start_fullmove_number = fullmove_number
+        self.start_turn = turn
+
+        # Zobrist key of the position, updated incrementally as moves are made
+        self.position_key: int = self._compute_position_key()
+        self.position_key_log: List[int] = [self.position_key]
+
+        # Material and positional scores, updated incrementally as moves are made
+        self.material_score, self.positional_score = count_scores(self)
+        self.score_log: List[Tuple[int, int]] = [(self.material_score, self.positional_score)]
 
     def __eq__(self, other):
-        return self.game_sequence == other.game_sequence
+        return isinstance(other, Game) and self.position_key == other.position_key
 
     def __hash__(self):
-        return hash(self.game_sequence)
+        return self.position_key
 
-    def _draw_board_pieces(self, screen: pygame.surface.Surface):
-        """Draws the chess pieces according to the board state."""
+    @classmethod
+    def from_fen(cls, fen: str) -> "Game":
+        """
+        Creates a game from a FEN string, e.g. rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1.
 
-        for row in range(DIMENSIONS):
-            for col in range(DIMENSIONS):
+        The move counters can be left out and default to 0 and 1, the other fields are required. Raises ValueError if
+        a field is malformed, e.g. castling rights without the king and rook on their home squares.
+        """
 
-                # Ignore empty squares
-                if self.chess_board.is_empty_square(row, col):
-                    continue
+        fields = fen.split()
+        if not 4 <= len(fields) <= 6:
+            raise ValueError(f"FEN must have 4 to 6 fields: {fen}")
 
-                piece = self.chess_board[row][col]
-                screen.blit(CHESS_PIECE_IMAGES[piece.value], pygame.Rect(col * SQUARE_SIZE,
-                                                                         row * SQUARE_SIZE,
-                                                                         SQUARE_SIZE, SQUARE_SIZE))
+        placement, turn, castling, en_passant = fields[:4]
+        chess_board = Board.from_fen(placement)
 
-    @staticmethod
-    def _draw_board(screen: pygame.surface.Surface):
-        """Draws the board on a pygame screen."""
+        if turn not in ("w", "b"):
+            raise ValueError(f"FEN side to move must be w or b: {fen}")
 
-        square_colours = [pygame.Color(LIGHT_SQUARE_COLOUR), pygame.Color(DARK_SQUARE_COLOUR)]
+        if castling != "-" and (not castling or set(castling) - set("KQkq")):
+            raise ValueError(f"FEN castling rights must be - or letters of KQkq: {fen}")
+        for letter, row, rook_col, colour in CASTLING_HOME_SQUARES:
+            if letter in castling and (chess_board.squares[mailbox_index(row, 4)] != colour | KING or
+                                       chess_board.squares[mailbox_index(row, rook_col)] != colour | ROOK):
+                raise ValueError(f"FEN castling right {letter} needs the king and rook on their home squares: {fen}")
+        castling_rights = CastlingRights("K" in castling, "Q" in castling, "k" in castling, "q" in castling)
 
-        for row in range(DIMENSIONS):
-            for col in range(DIMENSIONS):
-                # Light squares occur when row + column is an even number
-                colour_to_draw = square_colours[((row + col) % 2)]
-                pygame.draw.rect(screen, colour_to_draw, pygame.Rect(col * SQUARE_SIZE,
-                                                                     row * SQUARE_SIZE,
-                                                                     SQUARE_SIZE, SQUARE_SIZE))
+        en_passant_to_square = None
+        if en_passant != "-":
+            if len(en_passant) != 2 or en_passant[0] not in chess_board.files_to_cols or en_passant[1] not in "36":
+                raise ValueError(f"FEN en-passant square must be - or a square on rank 3 or 6: {fen}")
+            en_passant_to_square = (chess_board.ranks_to_rows[en_passant[1]], chess_board.files_to_cols[en_passant[0]])
 
-    def _draw_move_log(self, screen: pygame.surface.Surface):
-        """Draws the game sequence."""
+        try:
+            halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"FEN move counters must be numbers: {fen}") from None
 
-        move_log_rect = pygame.Rect(BOARD_WIDTH, 0, MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT)
-        pygame.draw.rect(screen, pygame.Color(MOVE_LOG_PANEL_BACKGROUND_COLOUR), move_log_rect)
-        font = pygame.font.Font(pygame.font.get_default_font(), MOVE_LOG_FONT_SIZE)
+        return cls(chess_board, turn=Turn.WHITE if turn == "w" else Turn.BLACK, castling_rights=castling_rights,
+                   en_passant_to_square=en_passant_to_square, halfmove_clock=halfmove_clock,
+                   fullmove_number=fullmove_number)
 
-        line_num = 0
-        col_num = 0
-        for move_num, move in enumerate(self.move_log):
+    def to_fen(self) -> str:
+        """Gets the FEN string of the current position."""
 
-            text_obj = font.render("{0}. {1}".format(move_num + 1, move.move_log_name),
-                                   True, pygame.Color(MOVE_LOG_FONT_COLOUR))
+        castling = "".join(letter for letter, has_right in zip("KQkq", (
+            self.castling_rights.white_king_side, self.castling_rights.white_queen_side,
+            self.castling_rights.black_king_side, self.castling_rights.black_queen_side)) if has_right) or "-"
 
-            if move_num > 0 and move_num % 3 == 0:
-                line_num += 1
-                col_num = 0
+        en_passant = "-"
+        if self.en_passant_to_square is not None:
+            en_passant = self.chess_board.get_square_name(*self.en_passant_to_square)
 
-            text_loc = move_log_rect.move(col_num * MOVE_LOG_PANEL_WIDTH // 3, line_num * (MOVE_LOG_FONT_SIZE + 5))
-            screen.blit(text_obj, text_loc)
-            col_num += 1
+        return f"{self.chess_board.to_fen()} {'w' if self.turn.is_white() else 'b'} {castling} {en_passant} " \
+               f"{self.halfmove_clock} {self.fullmove_number}"
 
-    def highlight_selected_square(self, screen: pygame.surface.Surface, square: Optional[Tuple[int, int]]):
-        """Highlights selected square."""
+    @property
+    def halfmove_clock(self) -> int:
+        """Number of moves since the last capture or pawn move, for the fifty move rule."""
+
+        for moves_since, move in enumerate(reversed(self.move_log)):
+            if move.piece_moved.is_pawn() or move.piece_captured:
+                return moves_since
 
-        if not square:
-            return
+        return self.start_halfmove_clock + len(self.move_log)
 
-        row, col = square
-        piece = self.chess_board[row][col]
+    @property
+    def fullmove_number(self) -> int:
+        """Number of the current full move, it starts at 1 and goes up after every black move."""
 
-        white_moving_white = piece.is_white() and self.turn.is_white()
-        black_moving_black = piece.is_black() and not self.turn.is_white()
-        if not (white_moving_white or black_moving_black):
-            return
+        moves_made = len(self.move_log) + (0 if self.start_turn.is_white() else 1)
+        return self.start_fullmove_number + moves_made // 2
 
-        _new_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-        _new_surface.set_alpha(SELECTED_SQUARE_ALPHA)
-        _new_surface.fill(pygame.Color(SELECTED_SQUARE_COLOUR))
-        screen.blit(_new_surface, (col * SQUARE_SIZE, row * SQUARE_SIZE))
+    def _compute_position_key(self) -> int:
+        """Computes the Zobrist key of the position from scratch."""
 
-    @staticmethod
-    def highlight_valid_moves(screen: pygame.surface.Surface, square: Optional[Tuple[int, int]],
-                              moves: List[Move]):
-        """Highlights valid moves of a piece from a given square."""
+        key = 0
+        for row, col, piece in self.piece_squares():
+            key ^= PIECE_SQUARE_KEYS[piece.code][row * 8 + col]
 
-        if not square:
-            return
+        if not self.turn.is_white():
+            key ^= BLACK_TO_MOVE_KEY
 
-        for move in moves:
-            if move.from_square != square:
-                continue
-            row, col = move.to_square
-            _new_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-            _new_surface.set_alpha(MOVABLE_SQUARE_ALPHA)
-            _new_surface.fill(pygame.Color(MOVABLE_SQUARE_COLOUR))
-            screen.blit(_new_surface, (col * SQUARE_SIZE, row * SQUARE_SIZE))
+        return key ^ CASTLING_KEYS[castling_rights_bits(self.castling_rights)] ^ self._get_en_passant_key()
 
-    def draw(self, screen: pygame.surface.Surface, square: Optional[Tuple[int, int]], val_moves: List[Move]):
-        """Draws the current state of the chess game on a pygame screen."""
+    def _get_en_passant_key(self) -> int:
+        """Gets the en-passant part of the position key, only set if a pawn to move can capture en-passant."""
+
+        if self.en_passant_to_square is None:
+            return 0
+
+        if self.turn.is_white():
+            pawn, capture_directions = WHITE | PAWN, BLACK_PAWN_CAPTURES
+        else:
+            pawn, capture_directions = BLACK | PAWN, WHITE_PAWN_CAPTURES
 
-        self._draw_board(screen)
-        self.highlight_selected_square(screen, square)
-        self.highlight_valid_moves(screen, square, val_moves)
-        self._draw_board_pieces(screen)
-        self._draw_move_log(screen)
+        squares = self.chess_board.squares
+        en_passant_square = mailbox_index(*self.en_passant_to_square)
+        for direction in capture_directions:
+            if squares[en_passant_square + direction] == pawn:
+                return EN_PASSANT_KEYS[self.en_passant_to_square[1]]
+
+        return 0
+
+    def draw(self, screen: "pygame.surface.Surface", square: Optional[Tuple[int, int]], val_moves: List[Move]):
+        """Draws the current state of the chess game on a pygame screen, pygame is only imported once a game is drawn."""
+
+        from playchess.gui import draw_game
+        draw_game(screen, self, square, val_moves)
 
     def moves_made(self, last_n: Optional[int] = None) -> List[Move]:
         """Shows moves made previously"""
@@ -146,6 +188,24 @@ class Game:
         """Shows the sequence of the game played."""
         return " -> ".join([move.name for move in self.move_log])
 
+    def piece_squares(self) -> Iterator[Tuple[int, int, Piece]]:
+        """Yields the row, column and piece of every occupied square."""
+
+        squares = self.chess_board.squares
+        for square in BOARD_SQUARES:
+            code = squares[square]
+            if code:
+                row, col = SQUARE_ROW_COL[square]
+                yield row, col, CODE_PIECES[code]
+
+    def move_details(self, move: Move) -> Tuple[int, int, int, int, int]:
+        """Gets the squares and the moved, captured and promoted to piece codes of a move."""
+
+        from_row, from_col = move.from_square
+        to_row, to_col = move.to_square
+        return (from_row * 8 + from_col, to_row * 8 + to_col, move.piece_moved.code, move.piece_captured.code,
+                move.promotion_piece.code)
+
     @property
     def num_moves_made(self) -> int:
         """Shows number of moves made."""
@@ -155,48 +215,65 @@ class Game:
     def make_move(self, move: Move):
         """Makes a chess move."""
 
-        self.chess_board.clear_square(move.from_row, move.from_col)
-        self.chess_board.update_square(move.to_row, move.to_col, move.piece_moved)
+        from_row, from_col = move.from_square
+        to_row, to_col = move.to_square
 
-        # pawn promotion
-        if move.is_white_pawn_promotion:
-            self.chess_board.update_square(move.to_row, move.to_col, Piece.WHITE_QUEEN)
-        elif move.is_black_pawn_promotion:
-            self.chess_board.update_square(move.to_row, move.to_col, Piece.BLACK_QUEEN)
+        # Take the en-passant and castling rights out of the position key, they are put back in once updated
+        position_key = self.position_key ^ self._get_en_passant_key() ^ \
+            CASTLING_KEYS[castling_rights_bits(self.castling_rights)]
+        position_key ^= PIECE_SQUARE_KEYS[move.piece_moved.code][from_row * 8 + from_col]
+        material_score = self.material_score
+        positional_score = self.positional_score - SQUARE_SCORES[move.piece_moved.code][from_row * 8 + from_col]
+        if move.piece_is_captured:
+            position_key ^= PIECE_SQUARE_KEYS[move.piece_captured.code][to_row * 8 + to_col]
+            material_score -= MATERIAL_SCORES[move.piece_captured.code]
+            positional_score -= SQUARE_SCORES[move.piece_captured.code][to_row * 8 + to_col]
 
-        # En-passant
-        if move.is_en_passant:
-            self.chess_board.clear_square(move.from_row, move.to_col)
-            self.en_passant_available = False
-            self.en_passant_to_square = None
+        self.chess_board.clear_square(from_row, from_col)
+        self.chess_board.update_square(to_row, to_col, move.piece_moved)
 
-        if self.en_passant_to_square is not None and self.en_passant_available and not move.is_en_passant:
-            self.en_passant_to_square = None
+        # pawn promotion
+        if move.promotion_piece is not Piece.NONE:
+            self.chess_board.update_square(to_row, to_col, move.promotion_piece)
 
-        # Update en-passant square
-        if move.piece_moved.is_pawn() and abs(move.from_row - move.to_row) == 2:
-            self.en_passant_to_square = ((move.from_row + move.to_row)//2, move.from_col)
+        placed_code = self.chess_board.squares[mailbox_index(to_row, to_col)]
+        position_key ^= PIECE_SQUARE_KEYS[placed_code][to_row * 8 + to_col]
+        material_score += MATERIAL_SCORES[placed_code] - MATERIAL_SCORES[move.piece_moved.code]
+        positional_score += SQUARE_SCORES[placed_code][to_row * 8 + to_col]
 
-        if not move.piece_moved.is_pawn():
+        # En-passant
+        if move.is_en_passant:
+            position_key ^= PIECE_SQUARE_KEYS[move.piece_captured.code][from_row * 8 + to_col]
+            material_score -= MATERIAL_SCORES[move.piece_captured.code]
+            positional_score -= SQUARE_SCORES[move.piece_captured.code][from_row * 8 + to_col]
+            self.chess_board.clear_square(from_row, to_col)
+
+        # Update en-passant square, only a 2 square pawn advance allows en-passant on the next move
+        if move.piece_moved.is_pawn() and abs(from_row - to_row) == 2:
+            self.en_passant_to_square = ((from_row + to_row)//2, from_col)
+        else:
             self.en_passant_to_square = None
 
         # Keep track of the king
         if move.piece_moved.is_white() and move.piece_moved.is_king():
-            self.chess_board.white_king_location = (move.to_row, move.to_col)
+            self.chess_board.white_king_location = (to_row, to_col)
         elif move.piece_moved.is_black() and move.piece_moved.is_king():
-            self.chess_board.black_king_location = (move.to_row, move.to_col)
+            self.chess_board.black_king_location = (to_row, to_col)
 
         # Handle castling
         if move.is_castle:
-            if move.to_col - move.from_col == 2:    # King side castle
-                self.chess_board.update_square(move.to_row, move.to_col - 1,
-                                               self.chess_board[move.to_row][move.to_col + 1])
-                self.chess_board.clear_square(move.to_row, move.to_col + 1)
-
+            if to_col - from_col == 2:    # King side castle
+                rook_from_col, rook_to_col = to_col + 1, to_col - 1
             else:   # Queen side castle
-                self.chess_board.update_square(move.to_row, move.to_col + 1,
-                                               self.chess_board[move.to_row][move.to_col - 2])
-                self.chess_board.clear_square(move.to_row, move.to_col - 2)
+                rook_from_col, rook_to_col = to_col - 2, to_col + 1
+
+            rook = self.chess_board.get_piece(to_row, rook_from_col)
+            self.chess_board.update_square(to_row, rook_to_col, rook)
+            self.chess_board.clear_square(to_row, rook_from_col)
+            position_key ^= PIECE_SQUARE_KEYS[rook.code][to_row * 8 + rook_from_col] ^ \
+                PIECE_SQUARE_KEYS[rook.code][to_row * 8 + rook_to_col]
+            positional_score += SQUARE_SCORES[rook.code][to_row * 8 + rook_to_col] - \
+                SQUARE_SCORES[rook.code][to_row * 8 + rook_from_col]
 
         self.en_passant_to_square_log.append(self.en_passant_to_square)
         self.move_log.append(move)
@@ -205,6 +282,13 @@ class Game:
         self._update_castling_rights(move)
         self.castling_rights_log.append(copy(self.castling_rights))
 
+        self.position_key = position_key ^ BLACK_TO_MOVE_KEY ^ self._get_en_passant_key() ^ \
+            CASTLING_KEYS[castling_rights_bits(self.castling_rights)]
+        self.position_key_log.append(self.position_key)
+
+        self.material_score, self.positional_score = material_score, positional_score
+        self.score_log.append((material_score, positional_score))
+
     def change_turn(self):
         """Changes the turns of the game."""
 
@@ -215,14 +299,16 @@ class Game:
 
         if len(self.move_log) > 0:
             move = self.move_log.pop()
-            self.chess_board.update_square(move.from_row, move.from_col, move.piece_moved)
+            from_row, from_col = move.from_square
+            to_row, to_col = move.to_square
+
+            self.chess_board.update_square(from_row, from_col, move.piece_moved)
 
             if move.is_en_passant:
-                self.chess_board.clear_square(move.to_row, move.to_col)
-                self.chess_board.update_square(move.from_row, move.to_col, move.piece_captured)
-                self.en_passant_available = True
+                self.chess_board.clear_square(to_row, to_col)
+                self.chess_board.update_square(from_row, to_col, move.piece_captured)
             else:
-                self.chess_board.update_square(move.to_row, move.to_col, move.piece_captured)
+                self.chess_board.update_square(to_row, to_col, move.piece_captured)
 
             # Update en-passant square
             self.en_passant_to_square_log.pop()
@@ -232,25 +318,31 @@ class Game:
 
             # Keep track of the king
             if move.piece_moved.is_white() and move.piece_moved.is_king():
-                self.chess_board.white_king_location = (move.from_row, move.from_col)
+                self.chess_board.white_king_location = (from_row, from_col)
             elif move.piece_moved.is_black() and move.piece_moved.is_king():
-                self.chess_board.black_king_location = (move.from_row, move.from_col)
+                self.chess_board.black_king_location = (from_row, from_col)
 
             if move.is_castle:
-                if move.to_col - move.from_col == 2:    # King side castle
-                    self.chess_board.update_square(move.to_row, move.to_col + 1,
-                                                   self.chess_board[move.to_row][move.to_col - 1])
-                    self.chess_board.clear_square(move.to_row, move.to_col - 1)
+                if to_col - from_col == 2:    # King side castle
+                    self.chess_board.update_square(to_row, to_col + 1,
+                                                   self.chess_board.get_piece(to_row, to_col - 1))
+                    self.chess_board.clear_square(to_row, to_col - 1)
 
                 else:   # Queen side castle
-                    self.chess_board.update_square(move.to_row, move.to_col - 2,
-                                                   self.chess_board[move.to_row][move.to_col + 1])
-                    self.chess_board.clear_square(move.to_row, move.to_col + 1)
+                    self.chess_board.update_square(to_row, to_col - 2,
+                                                   self.chess_board.get_piece(to_row, to_col + 1))
+                    self.chess_board.clear_square(to_row, to_col + 1)
 
             # Update castling rights
             self.castling_rights_log.pop()
             self.castling_rights = copy(self.castling_rights_log[-1])
 
+            self.position_key_log.pop()
+            self.position_key = self.position_key_log[-1]
+
+            self.score_log.pop()
+            self.material_score, self.positional_score = self.score_log[-1]
+
     def _update_castling_rights(self, move: Move):
         """Updates the castling rights for a given move."""
 
@@ -260,31 +352,43 @@ class Game:
         elif move.piece_moved.is_king() and move.piece_moved.is_black():
             self.castling_rights.black_king_side = False
             self.castling_rights.black_queen_side = False
-        elif move.piece_moved.is_white() and move.piece_moved.is_rook():
-            if move.from_row == 7 and move.from_col == 0:       # Queen side rook
-                self.castling_rights.white_queen_side = False
-            elif move.from_row == 7 and move.from_col == 7:     # King side rook
-                self.castling_rights.white_king_side = False
-        elif move.piece_moved.is_black() and move.piece_moved.is_rook():
-            if move.from_row == 0 and move.from_col == 0:       # Queen side rook
+
+        # A rook moving away from or captured on its starting square
+        for square in (move.from_square, move.to_square):
+            if square == (7, 0):        # White queen side rook
                 self.castling_rights.white_queen_side = False
-            elif move.from_row == 0 and move.from_col == 7:     # King side rook
+            elif square == (7, 7):      # White king side rook
                 self.castling_rights.white_king_side = False
+            elif square == (0, 0):      # Black queen side rook
+                self.castling_rights.black_queen_side = False
+            elif square == (0, 7):      # Black king side rook
+                self.castling_rights.black_king_side = False
 
     def get_valid_moves(self) -> List[Move]:
-        """Generates all the valid moves in a position."""
+        """
+        Generates all the valid moves in a position.
+
+        The checking pieces and the pinned pieces are found once per position and the possible moves are filtered
+        with them, without making the moves. Only en-passant captures, which can uncover a check along the row of
+        the king, are validated by making the move.
+        """
 
         valid_moves: List[Move] = []
 
         all_possible_moves = self._get_all_possible_moves()
 
-        # Castling moves
         if self.turn.is_white():
             king_row, king_col = self.chess_board.white_king_location
+            own_colour, opponent_colour = WHITE, BLACK
         else:
             king_row, king_col = self.chess_board.black_king_location
+            own_colour, opponent_colour = BLACK, WHITE
+
+        king_square = mailbox_index(king_row, king_col)
+        checkers = self._get_attackers(king_square, opponent_colour)
 
-        if not self.is_square_attacked(king_row, king_col):  # Cannot castle if checked
+        # Castling moves
+        if not checkers:  # Cannot castle if checked
 
             # King side castling
             _king_side_castle = (self.turn.is_white() and self.castling_rights.white_king_side) or \
@@ -298,24 +402,47 @@ class Game:
             if _queen_side_castle:
                 all_possible_moves.extend(self._get_queen_side_castling_moves(king_row, king_col))
 
-        # We need to keep track of this and reset it, as this value changes while generating valid moves
+        check_mask = self._get_check_mask(king_square, checkers)
+        pin_rays = self._get_pin_rays(king_square, own_colour, opponent_colour)
+
+        # We need to keep track of this and reset it, as this value changes while validating en-passant moves
         temp_en_passant_to_square = self.en_passant_to_square
 
-        # We check the validity of move by actually making the move.
         for move in all_possible_moves:
-            self.make_move(move)
+            from_square = mailbox_index(*move.from_square)
+            to_square = mailbox_index(*move.to_square)
 
-            # Make move function swaps turns, so we swap it back to see if making a move leaves the king checked
-            self.change_turn()
-            if not self.is_king_checked():
-                valid_moves.append(move)
+            # The king must not move onto an attacked square (castling squares are checked when generated)
+            if from_square == king_square:
+                if move.is_castle or not self._is_king_destination_attacked(king_square, to_square, opponent_colour):
+                    valid_moves.append(move)
+                continue
 
-            self.change_turn()
-            self.undo_move()
+            # We check the validity of en-passant by actually making the move.
+            if move.is_en_passant:
+                self.make_move(move)
+
+                # Make move function swaps turns, so we swap it back to see if making a move leaves the king checked
+                self.change_turn()
+                if not self.is_king_checked():
+                    valid_moves.append(move)
+
+                self.change_turn()
+                self.undo_move()
+                continue
 
-        if not valid_moves and self.is_king_checked():
+            # Other moves have to capture or block a checking piece and pinned pieces have to stay on their pin
+            if check_mask is not None and to_square not in check_mask:
+                continue
+            pin_ray = pin_rays.get(from_square)
+            if pin_ray is not None and to_square not in pin_ray:
+                continue
+
+            valid_moves.append(move)
+
+        if not valid_moves and checkers:
             self.check_mate = True
-        elif not valid_moves and not self.is_king_checked():
+        elif not valid_moves and not checkers:
             self.stale_mate = True
         else:
             # We need to do this if the check mate move is then undone
@@ -326,6 +453,79 @@ class Game:
 
         return valid_moves
 
+    def _get_check_mask(self, king_square: int, checkers: List[int]) -> Optional[Set[int]]:
+        """
+        Gets the mailbox squares a piece other than the king can move to, to get out of check.
+
+        This is the checking piece and the squares between it and the king, nothing in double check, or None if
+        the king is not checked.
+        """
+
+        if not checkers:
+            return None
+
+        if len(checkers) > 1:   # Only the king can move in double check
+            return set()
+
+        checker = checkers[0]
+        check_mask = {checker}
+
+        if self.chess_board.squares[checker] & TYPE_MASK in (BISHOP, ROOK, QUEEN):
+            king_row, king_col = SQUARE_ROW_COL[king_square]
+            checker_row, checker_col = SQUARE_ROW_COL[checker]
+            direction = NORTH * ((king_row > checker_row) - (king_row < checker_row)) + \
+                EAST * ((checker_col > king_col) - (checker_col < king_col))
+
+            square = king_square + direction
+            while square != checker:
+                check_mask.add(square)
+                square += direction
+
+        return check_mask
+
+    def _get_pin_rays(self, king_square: int, own_colour: int, opponent_colour: int) -> Dict[int, Set[int]]:
+        """Gets the pinned pieces of a colour, mapped to the mailbox squares they can move to along their pin."""
+
+        pin_rays: Dict[int, Set[int]] = {}
+        squares = self.chess_board.squares
+        queen = opponent_colour | QUEEN
+
+        for directions, slider in ((BISHOP_DIRECTIONS, opponent_colour | BISHOP),
+                                   (ROOK_DIRECTIONS, opponent_colour | ROOK)):
+            for direction in directions:
+                ray: List[int] = []
+                square = king_square + direction
+                while squares[square] == EMPTY:
+                    ray.append(square)
+                    square += direction
+
+                if not squares[square] & own_colour:
+                    continue
+
+                # A friendly piece is pinned if the next piece behind it is an enemy slider moving along this ray
+                pinned = square
+                square += direction
+                while squares[square] == EMPTY:
+                    ray.append(square)
+                    square += direction
+
+                if squares[square] == slider or squares[square] == queen:
+                    ray.append(square)
+                    pin_rays[pinned] = set(ray)
+
+        return pin_rays
+
+    def _is_king_destination_attacked(self, king_square: int, to_square: int, opponent_colour: int) -> bool:
+        """Checks if a square is attacked with the king lifted off its square, so it cannot hide behind itself."""
+
+        squares = self.chess_board.squares
+        king = squares[king_square]
+        squares[king_square] = EMPTY
+        attacked = bool(self._get_attackers(to_square, opponent_colour, first_only=True))
+        squares[king_square] = king
+
+        return attacked
+
     def is_king_checked(self):
         """Checks if the king of current player is under check."""
 
@@ -345,215 +545,178 @@ class Game:
     def is_square_attacked(self, row: int, col: int) -> bool:
         """Checks if a given square is under attack by opponents moves in the next turn."""
 
-        self.change_turn()
-        opponent_moves = self._get_all_possible_moves()
-        self.change_turn()
-
-        for move in opponent_moves:
-            if move.to_row == row and move.to_col == col:
-                return True
-
-        return False
-
-    def _get_all_possible_moves(self) -> List[Move]:
-        """Generate all currently possible moves without considering checks."""
-
-        possible_moves: List[Move] = []
-        for row_no, row in enumerate(self.chess_board):
-            for col_no, piece in enumerate(self.chess_board[row_no]):
-
-                # This condition also ensures that empty squares cannot be moved
-                white_moving_white = piece.is_white() and self.turn.is_white()
-                black_moving_black = piece.is_black() and not self.turn.is_white()
-                if not (white_moving_white or black_moving_black):
-                    continue
-
-                possible_moves.extend(self._get_all_piece_moves(row_no, col_no, piece))
-
-        return possible_moves
+        opponent_colour = BLACK if self.turn.is_white() else WHITE
+        return bool(self._get_attackers(mailbox_index(row, col), opponent_colour, first_only=True))
 
-    def _get_all_pawn_moves(self, row: int, col: int) -> List[Move]:
-        """Get all possible moves for a pawn on a given row and column."""
+    def attackers_of(self, square: Tuple[int, int], colour: Turn) -> List[Tuple[int, int]]:
+        """Gets the squares of all pieces of a colour attacking a given square."""
 
-        moves: List[Move] = []
+        attackers = self._get_attackers(mailbox_index(*square), WHITE if colour.is_white() else BLACK)
+        return [SQUARE_ROW_COL[attacker] for attacker in attackers]
 
-        # White Advances
-        if self.turn.is_white() and self.chess_board.is_empty_square(row - 1, col):  # 1 square advance
-            moves.append(Move((row, col), (row - 1, col), self.chess_board))
-            if row == 6 and self.chess_board.is_empty_square(row - 2, col):  # 2 square advance
-                moves.append(Move((row, col), (row - 2, col), self.chess_board))
-
-        # White Captures Left
-        if self.turn.is_white() and col - 1 >= 0 and self.chess_board[row - 1][col - 1].is_black():
-            moves.append(Move((row, col), (row - 1, col - 1), self.chess_board))
-
-        # White Captures Left (En-passant)
-        if self.turn.is_white() and col - 1 >= 0 and self.chess_board.is_empty_square(row - 1, col - 1) and \
-                (row - 1, col - 1) == self.en_passant_to_square and self.en_passant_available:
-            moves.append(Move((row, col), (row - 1, col - 1), self.chess_board, is_en_passant=True))
-
-        # White Captures Right
-        if self.turn.is_white() and col + 1 <= 7 and self.chess_board[row - 1][col + 1].is_black():
-            moves.append(Move((row, col), (row - 1, col + 1), self.chess_board))
-
-        # White Captures Right (En-passant)
-        if self.turn.is_white() and col + 1 <= 7 and self.chess_board.is_empty_square(row - 1, col + 1) and \
-                (row - 1, col + 1) == self.en_passant_to_square and self.en_passant_available:
-            moves.append(Move((row, col), (row - 1, col + 1), self.chess_board, is_en_passant=True))
-
-        # Black Advances
-        if not self.turn.is_white() and self.chess_board.is_empty_square(row + 1, col):  # 1 square advance
-            moves.append(Move((row, col), (row + 1, col), self.chess_board))
-            if row == 1 and self.chess_board.is_empty_square(row + 2, col):  # 2 square advance
-                moves.append(Move((row, col), (row + 2, col), self.chess_board))
-
-        # Black Captures Left
-        if not self.turn.is_white() and col + 1 <= 7 and self.chess_board[row + 1][col + 1].is_white():
-            moves.append(Move((row, col), (row + 1, col + 1), self.chess_board))
-
-        # Black Captures Left (En-passant)
-        if not self.turn.is_white() and col + 1 <= 7 and self.chess_board.is_empty_square(row + 1, col + 1) and \
-                (row + 1, col + 1) == self.en_passant_to_square and self.en_passant_available:
-            moves.append(Move((row, col), (row + 1, col + 1), self.chess_board, is_en_passant=True))
-
-        # Black Captures Right
-        if not self.turn.is_white() and col - 1 >= 0 and self.chess_board[row + 1][col - 1].is_white():
-            moves.append(Move((row, col), (row + 1, col - 1), self.chess_board))
-
-        # Black Captures Right (En-passant)
-        if not self.turn.is_white() and col - 1 >= 0 and self.chess_board.is_empty_square(row + 1, col - 1) and \
-                (row + 1, col - 1) == self.en_passant_to_square and self.en_passant_available:
-            moves.append(Move((row, col), (row + 1, col - 1), self.chess_board, is_en_passant=True))
+    def _get_attackers(self, square: int, colour: int, first_only: bool = False) -> List[int]:
+        """
+        Gets the mailbox squares of the pieces of a colour attacking a mailbox square.
 
-        return moves
+        Looks outward from the square along the leaper offsets and the slider rays up to the first blocker,
+        so no moves are generated. Stops at the first attacker found if first_only is set.
+        """
 
-    def _get_all_rook_moves(self, row: int, col: int) -> List[Move]:
-        """Get all possible moves for a rook on a given row and column."""
+        attackers: List[int] = []
+        squares = self.chess_board.squares
 
-        moves: List[Move] = []
+        # A pawn attacks the square from where a pawn of the other colour on the square would capture
+        pawn, knight, king = colour | PAWN, colour | KNIGHT, colour | KING
+        for offsets, attacker in ((BLACK_PAWN_CAPTURES if colour == WHITE else WHITE_PAWN_CAPTURES, pawn),
+                                  (KNIGHT_OFFSETS, knight), (KING_OFFSETS, king)):
+            for offset in offsets:
+                if squares[square + offset] == attacker:
+                    attackers.append(square + offset)
+                    if first_only:
+                        return attackers
 
-        directions = [(-1, 0), (0, -1), (1, 0), (0, 1)]  # Up, Left, Down, Right
+        queen = colour | QUEEN
+        for directions, slider in ((BISHOP_DIRECTIONS, colour | BISHOP), (ROOK_DIRECTIONS, colour | ROOK)):
+            for direction in directions:
+                attacker_square = square + direction
+                code = squares[attacker_square]
+                while code == EMPTY:
+                    attacker_square += direction
+                    code = squares[attacker_square]
 
-        # Check 7 squares in 4 directions for valid rook moves
-        for direction in directions:
-            for i in range(1, 8):
+                if code == slider or code == queen:
+                    attackers.append(attacker_square)
+                    if first_only:
+                        return attackers
 
-                to_row = row + direction[0] * i
-                to_col = col + direction[1] * i
+        return attackers
 
-                if not 0 <= to_row < 8 or not 0 <= to_col < 8:  # Out of board (stop searching)
-                    break
+    def _get_all_possible_moves(self) -> List[Move]:
+        """Generate all currently possible moves without considering checks."""
 
-                if self.chess_board.is_empty_square(to_row, to_col):    # Empty square is valid move (keep searching)
-                    moves.append(Move((row, col), (to_row, to_col), self.chess_board))
-                    continue
+        possible_moves: List[Move] = []
+        squares = self.chess_board.squares
+        own_colour = WHITE if self.turn.is_white() else BLACK
 
-                valid_black_enemy = self.turn.is_white() and self.chess_board[to_row][to_col].is_black()
-                valid_white_enemy = not self.turn.is_white() and self.chess_board[to_row][to_col].is_white()
+        for square in BOARD_SQUARES:
+            code = squares[square]
 
-                if not (valid_black_enemy or valid_white_enemy):  # Friendly piece invalid (stop searching)
-                    break
+            # This condition also ensures that empty squares cannot be moved
+            if not code & own_colour:
+                continue
 
-                # Capturing opposite colour is valid (stop searching)
-                moves.append(Move((row, col), (to_row, to_col), self.chess_board))
-                break
+            possible_moves.extend(self._get_all_piece_moves(square, code))
 
-        return moves
+        return possible_moves
 
-    def _get_all_knight_moves(self, row: int, col: int) -> List[Move]:
-        """Get all possible moves for a knight on a given row and column."""
+    def _get_all_pawn_moves(self, square: int) -> List[Move]:
+        """Get all possible moves for a pawn on a given mailbox square."""
 
         moves: List[Move] = []
+        squares = self.chess_board.squares
+        from_square = SQUARE_ROW_COL[square]
 
-        # Knight can move to 8 squares from a given square
-        knight_moves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+        if self.turn.is_white():
+            forward, enemy_colour, start_row = NORTH, BLACK, 6
+            capture_directions = WHITE_PAWN_CAPTURES
+        else:
+            forward, enemy_colour, start_row = SOUTH, WHITE, 1
+            capture_directions = BLACK_PAWN_CAPTURES
 
-        for move in knight_moves:
+        # Advances
+        if squares[square + forward] == EMPTY:  # 1 square advance
+            self._add_pawn_move(moves, from_square, SQUARE_ROW_COL[square + forward])
+            if from_square[0] == start_row and squares[square + 2 * forward] == EMPTY:  # 2 square advance
+                moves.append(Move(from_square, SQUARE_ROW_COL[square + 2 * forward], self.chess_board))
 
-            to_row = row + move[0]
-            to_col = col + move[1]
+        # Captures (the off board sentinel is neither empty nor an enemy)
+        for direction in capture_directions:
+            to_square = square + direction
+            code = squares[to_square]
 
-            if not 0 <= to_row < 8 or not 0 <= to_col < 8:  # Out of board (skip to next)
-                continue
+            if code & enemy_colour:
+                self._add_pawn_move(moves, from_square, SQUARE_ROW_COL[to_square])
 
-            friendly_white = self.turn.is_white() and self.chess_board[to_row][to_col].is_white()
-            friendly_black = not self.turn.is_white() and self.chess_board[to_row][to_col].is_black()
+            elif code == EMPTY and SQUARE_ROW_COL[to_square] == self.en_passant_to_square:
+                moves.append(Move(from_square, SQUARE_ROW_COL[to_square], self.chess_board, is_en_passant=True))
 
-            # This condition also ensures that knight can move to empty squares
-            if friendly_black or friendly_white:
-                continue
+        return moves
 
-            moves.append(Move((row, col), (to_row, to_col), self.chess_board))
+    def _add_pawn_move(self, moves: List[Move], from_square: Tuple[int, int], to_square: Tuple[int, int]) -> None:
+        """Adds a pawn move, or a move for every promotion piece if the pawn reaches the last row."""
 
-        return moves
+        if to_square[0] == 0:
+            moves.extend(Move(from_square, to_square, self.chess_board, promotion=piece) for piece in WHITE_PROMOTIONS)
+        elif to_square[0] == 7:
+            moves.extend(Move(from_square, to_square, self.chess_board, promotion=piece) for piece in BLACK_PROMOTIONS)
+        else:
+            moves.append(Move(from_square, to_square, self.chess_board))
 
-    def _get_all_bishop_moves(self, row: int, col: int) -> List[Move]:
-        """Get all possible moves for a bishop on a given row and column."""
+    def _get_all_sliding_moves(self, square: int, directions: Tuple[int, ...]) -> List[Move]:
+        """Get all possible moves for a sliding piece on a given mailbox square in the given directions."""
 
         moves: List[Move] = []
+        squares = self.chess_board.squares
+        from_square = SQUARE_ROW_COL[square]
+        enemy_colour = BLACK if self.turn.is_white() else WHITE
 
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]  # Diagonals
-
-        # Check 7 squares in 4 directions for valid bishop moves
         for direction in directions:
-            for i in range(1, 8):
+            to_square = square + direction
+            code = squares[to_square]
 
-                to_row = row + direction[0] * i
-                to_col = col + direction[1] * i
+            while code == EMPTY:    # Empty square is valid move (keep searching)
+                moves.append(Move(from_square, SQUARE_ROW_COL[to_square], self.chess_board))
+                to_square += direction
+                code = squares[to_square]
 
-                if not 0 <= to_row < 8 or not 0 <= to_col < 8:  # Out of board (stop searching)
-                    break
+            # Capturing opposite colour is valid, friendly pieces and the board edge are not (stop searching)
+            if code & enemy_colour:
+                moves.append(Move(from_square, SQUARE_ROW_COL[to_square], self.chess_board))
 
-                if self.chess_board.is_empty_square(to_row, to_col):  # Empty square is valid move (keep searching)
-                    moves.append(Move((row, col), (to_row, to_col), self.chess_board))
-                    continue
-
-                valid_black_enemy = self.turn.is_white() and self.chess_board[to_row][to_col].is_black()
-                valid_white_enemy = not self.turn.is_white() and self.chess_board[to_row][to_col].is_white()
-
-                if not (valid_black_enemy or valid_white_enemy):  # Friendly piece invalid (stop searching)
-                    break
+        return moves
 
-                # Capturing opposite colour is valid (stop searching)
-                moves.append(Move((row, col), (to_row, to_col), self.chess_board))
-                break
+    def _get_all_leaping_moves(self, square: int, offsets: Tuple[int, ...]) -> List[Move]:
+        """Get all possible moves for a knight or king on a given mailbox square."""
 
-        return moves
+        moves: List[Move] = []
+        squares = self.chess_board.squares
+        from_square = SQUARE_ROW_COL[square]
+        enemy_colour = BLACK if self.turn.is_white() else WHITE
 
-    def _get_all_queen_moves(self, row: int, col: int) -> List[Move]:
-        """Get all possible moves for a queen on a given row and column."""
+        for offset in offsets:
+            to_square = square + offset
+            code = squares[to_square]
 
-        queen_diagonal_moves = self._get_all_bishop_moves(row, col)
-        queen_straight_moves = self._get_all_rook_moves(row, col)
+            # Empty squares and enemies are valid, friendly pieces and off board squares are skipped
+            if code == EMPTY or code & enemy_colour:
+                moves.append(Move(from_square, SQUARE_ROW_COL[to_square], self.chess_board))
 
-        return queen_diagonal_moves + queen_straight_moves
+        return moves
 
-    def _get_all_king_moves(self, row: int, col: int) -> List[Move]:
-        """Get all possible moves for a king on a given row and column."""
+    def _get_all_rook_moves(self, square: int) -> List[Move]:
+        """Get all possible moves for a rook on a given mailbox square."""
 
-        moves: List[Move] = []
+        return self._get_all_sliding_moves(square, ROOK_DIRECTIONS)
 
-        # King can move to 8 squares from a given square
-        king_moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    def _get_all_knight_moves(self, square: int) -> List[Move]:
+        """Get all possible moves for a knight on a given mailbox square."""
 
-        for move in king_moves:
+        return self._get_all_leaping_moves(square, KNIGHT_OFFSETS)
 
-            to_row = row + move[0]
-            to_col = col + move[1]
+    def _get_all_bishop_moves(self, square: int) -> List[Move]:
+        """Get all possible moves for a bishop on a given mailbox square."""
 
-            if not 0 <= to_row < 8 or not 0 <= to_col < 8:  # Out of board (skip to next)
-                continue
+        return self._get_all_sliding_moves(square, BISHOP_DIRECTIONS)
 
-            friendly_white = self.turn.is_white() and self.chess_board[to_row][to_col].is_white()
-            friendly_black = not self.turn.is_white() and self.chess_board[to_row][to_col].is_black()
+    def _get_all_queen_moves(self, square: int) -> List[Move]:
+        """Get all possible moves for a queen on a given mailbox square."""
 
-            # This condition also ensures that king can move to empty squares
-            if friendly_black or friendly_white:
-                continue
+        return self._get_all_sliding_moves(square, QUEEN_DIRECTIONS)
 
-            moves.append(Move((row, col), (to_row, to_col), self.chess_board))
+    def _get_all_king_moves(self, square: int) -> List[Move]:
+        """Get all possible moves for a king on a given mailbox square."""
 
-        return moves
+        return self._get_all_leaping_moves(square, KING_OFFSETS)
 
     def _get_king_side_castling_moves(self, row: int, col: int) -> List[Move]:
         """Get king side castling moves."""
@@ -580,21 +743,21 @@ class Game:
 
         return moves
 
-    def _get_all_piece_moves(self, row: int, col: int, piece: Piece):
-        """Get all possible moves for a given piece on a row and col"""
-
-        if piece.is_pawn():
-            return self._get_all_pawn_moves(row, col)
-        if piece.is_rook():
-            return self._get_all_rook_moves(row, col)
-        if piece.is_knight():
-            return self._get_all_knight_moves(row, col)
-        if piece.is_bishop():
-            return self._get_all_bishop_moves(row, col)
-        if piece.is_queen():
-            return self._get_all_queen_moves(row, col)
-        if piece.is_king():
-            return self._get_all_king_moves(row, col)
+    def _get_all_piece_moves(self, square: int, code: int) -> List[Move]:
+        """Get all possible moves for a given piece code on a mailbox square."""
+
+        piece_type = code & TYPE_MASK
+        if piece_type == PAWN:
+            return self._get_all_pawn_moves(square)
+        if piece_type == ROOK:
+            return self._get_all_rook_moves(square)
+        if piece_type == KNIGHT:
+            return self._get_all_knight_moves(square)
+        if piece_type == BISHOP:
+            return self._get_all_bishop_moves(square)
+        if piece_type == QUEEN:
+            return self._get_all_queen_moves(square)
+        return self._get_all_king_moves(square)
 
 
 def main():
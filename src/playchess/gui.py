@@ -0,0 +1,465 @@
+"""
+Drawing of games on a pygame screen.
+
+The engine modules never import pygame, only the driver and this module do, so games can be searched and analysed
+without display libraries. The piece images are loaded the first time pieces are drawn.
+
+draw_game draws a whole frame from scratch, GameRenderer only draws what changed since its last frame. Run this
+module to compare their frame times.
+"""
+
+
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+from playchess._utils import get_font
+from playchess.config import (SQUARE_SIZE, DIMENSIONS, LIGHT_SQUARE_COLOUR, DARK_SQUARE_COLOUR, SELECTED_SQUARE_COLOUR,
+                              SELECTED_SQUARE_ALPHA, MOVABLE_SQUARE_COLOUR, MOVABLE_SQUARE_ALPHA, BOARD_WIDTH, BOARD_HEIGHT,
+                              MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT, MOVE_LOG_PANEL_BACKGROUND_COLOUR,
+                              MOVE_LOG_FONT_COLOUR, MOVE_LOG_FONT_SIZE)
+from playchess.board import BOARD_SQUARES, Board
+from playchess.game import Game
+from playchess.images import load_piece_images
+from playchess.move import Move
+
+
+# Highlights of the board squares
+NO_HIGHLIGHT = 0
+SELECTED_HIGHLIGHT = 1
+MOVABLE_HIGHLIGHT = 2
+
+
+def draw_board_pieces(screen: pygame.surface.Surface, game: Game):
+    """Draws the chess pieces according to the board state."""
+
+    piece_images = load_piece_images()
+    for row, col, piece in game.piece_squares():
+        screen.blit(piece_images[piece.value], pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE,
+                                                           SQUARE_SIZE, SQUARE_SIZE))
+
+
+def draw_board(screen: pygame.surface.Surface):
+    """Draws the board on a pygame screen."""
+
+    square_colours = [pygame.Color(LIGHT_SQUARE_COLOUR), pygame.Color(DARK_SQUARE_COLOUR)]
+
+    for row in range(DIMENSIONS):
+        for col in range(DIMENSIONS):
+            # Light squares occur when row + column is an even number
+            colour_to_draw = square_colours[((row + col) % 2)]
+            pygame.draw.rect(screen, colour_to_draw, pygame.Rect(col * SQUARE_SIZE,
+                                                                 row * SQUARE_SIZE,
+                                                                 SQUARE_SIZE, SQUARE_SIZE))
+
+
+def draw_move_log(screen: pygame.surface.Surface, game: Game):
+    """Draws the game sequence."""
+
+    move_log_rect = pygame.Rect(BOARD_WIDTH, 0, MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT)
+    pygame.draw.rect(screen, pygame.Color(MOVE_LOG_PANEL_BACKGROUND_COLOUR), move_log_rect)
+    font = pygame.font.Font(pygame.font.get_default_font(), MOVE_LOG_FONT_SIZE)
+
+    line_num = 0
+    col_num = 0
+    for move_num, move in enumerate(game.move_log):
+
+        text_obj = font.render("{0}. {1}".format(move_num + 1, move.move_log_name),
+                               True, pygame.Color(MOVE_LOG_FONT_COLOUR))
+
+        if move_num > 0 and move_num % 3 == 0:
+            line_num += 1
+            col_num = 0
+
+        text_loc = move_log_rect.move(col_num * MOVE_LOG_PANEL_WIDTH // 3, line_num * (MOVE_LOG_FONT_SIZE + 5))
+        screen.blit(text_obj, text_loc)
+        col_num += 1
+
+
+def highlight_selected_square(screen: pygame.surface.Surface, game: Game, square: Optional[Tuple[int, int]]):
+    """Highlights selected square."""
+
+    if not square:
+        return
+
+    row, col = square
+    piece = game.chess_board[row][col]
+
+    white_moving_white = piece.is_white() and game.turn.is_white()
+    black_moving_black = piece.is_black() and not game.turn.is_white()
+    if not (white_moving_white or black_moving_black):
+        return
+
+    _new_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
+    _new_surface.set_alpha(SELECTED_SQUARE_ALPHA)
+    _new_surface.fill(pygame.Color(SELECTED_SQUARE_COLOUR))
+    screen.blit(_new_surface, (col * SQUARE_SIZE, row * SQUARE_SIZE))
+
+
+def highlight_valid_moves(screen: pygame.surface.Surface, square: Optional[Tuple[int, int]], moves: List[Move]):
+    """Highlights valid moves of a piece from a given square."""
+
+    if not square:
+        return
+
+    for move in moves:
+        if move.from_square != square:
+            continue
+        row, col = move.to_square
+        _new_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
+        _new_surface.set_alpha(MOVABLE_SQUARE_ALPHA)
+        _new_surface.fill(pygame.Color(MOVABLE_SQUARE_COLOUR))
+        screen.blit(_new_surface, (col * SQUARE_SIZE, row * SQUARE_SIZE))
+
+
+def draw_game(screen: pygame.surface.Surface, game: Game, square: Optional[Tuple[int, int]], val_moves: List[Move]):
+    """Draws the current state of the chess game on a pygame screen."""
+
+    draw_board(screen)
+    highlight_selected_square(screen, game, square)
+    highlight_valid_moves(screen, square, val_moves)
+    draw_board_pieces(screen, game)
+    draw_move_log(screen, game)
+
+
+def _create_overlay(colour: str, alpha: int) -> pygame.surface.Surface:
+    """Creates a translucent square to draw over a board square."""
+
+    overlay = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
+    overlay.set_alpha(alpha)
+    overlay.fill(pygame.Color(colour))
+    return overlay
+
+
+class FrameTimer:
+    """Class represents a record of how long frames took to draw."""
+
+    def __init__(self):
+        self.frames = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.frames += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def average_ms(self) -> float:
+        return self.total_seconds * 1000 / self.frames if self.frames else 0.0
+
+    def __str__(self):
+        return f"{self.frames} frames, {self.average_ms:.3f} ms average, {self.max_seconds * 1000:.3f} ms max"
+
+
+class LoopStats:
+    """
+    Class represents counts of a game loop: its iterations, the frames it drew and the time and CPU time it took.
+
+    Idle time is the time of the iterations that start with a human to move or the game over, the CPU time of the
+    background searches never falls in it.
+    """
+
+    def __init__(self):
+        self.iterations = 0
+        self.frames_drawn = 0
+        self.idle_seconds = 0.0
+        self.idle_cpu_seconds = 0.0
+        self._start = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._idle = False
+        self._iteration_start = self._start
+        self._iteration_start_cpu = self._start_cpu
+
+    def next_iteration(self, idle: bool) -> None:
+        """Counts the iteration that ended and starts timing the next, idle or not."""
+
+        self.stop()
+        self.iterations += 1
+        self._idle = idle
+
+    def stop(self) -> None:
+        """Counts the time of the current iteration, when the loop ends."""
+
+        now, now_cpu = time.perf_counter(), time.process_time()
+        if self._idle:
+            self.idle_seconds += now - self._iteration_start
+            self.idle_cpu_seconds += now_cpu - self._iteration_start_cpu
+        self._idle = False
+        self._iteration_start, self._iteration_start_cpu = now, now_cpu
+
+    @property
+    def idle_cpu_percent(self) -> float:
+        return self.idle_cpu_seconds * 100 / self.idle_seconds if self.idle_seconds else 0.0
+
+    @property
+    def cpu_percent(self) -> float:
+        seconds = time.perf_counter() - self._start
+        return (time.process_time() - self._start_cpu) * 100 / seconds if seconds else 0.0
+
+    def __str__(self):
+        return f"{self.frames_drawn} frames drawn in {self.iterations} loops, {self.cpu_percent:.1f}% CPU, " \
+               f"{self.idle_cpu_percent:.2f}% CPU over {self.idle_seconds:.1f}s idle"
+
+
+class MoveLogWidget:
+    """
+    Class represents the move log panel, drawn with a cached font and text of every move and scrolled by whole lines.
+
+    The text of a move is rendered once, when it is made, and dropped when it is undone. Only the lines that fit the
+    panel are drawn, so drawing takes the same time however long the game is. The panel follows the latest move
+    unless it is scrolled back, scrolling to the end follows it again.
+    """
+
+    MOVES_PER_LINE = 3
+    LINE_HEIGHT = MOVE_LOG_FONT_SIZE + 5
+    VISIBLE_LINES = MOVE_LOG_PANEL_HEIGHT // LINE_HEIGHT - 1     # The bottom line is left for the thinking text
+
+    def __init__(self):
+        self.rect = pygame.Rect(BOARD_WIDTH, 0, MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT)
+        self._moves: List[Move] = []                        # Moves the texts were rendered for
+        self._texts: List[pygame.surface.Surface] = []
+        self._first_line = 0
+        self._follow_end = True
+        self._changed = True
+
+    @property
+    def num_lines(self) -> int:
+        return (len(self._texts) + self.MOVES_PER_LINE - 1) // self.MOVES_PER_LINE
+
+    def invalidate(self) -> None:
+        """Makes the next draw draw the panel even if nothing changed."""
+        self._changed = True
+
+    def scroll(self, lines: int) -> None:
+        """Scrolls the log by a number of lines, down if positive and up if negative."""
+
+        last_first_line = max(self.num_lines - self.VISIBLE_LINES, 0)
+        first_line = min(max(self._first_line + lines, 0), last_first_line)
+        if first_line != self._first_line:
+            self._first_line = first_line
+            self._changed = True
+        self._follow_end = first_line == last_first_line
+
+    def _sync(self, move_log: List[Move]) -> None:
+        """Pops the texts of undone moves and renders the texts of new moves."""
+
+        same_moves = min(len(self._moves), len(move_log))
+        while same_moves and self._moves[same_moves - 1] is not move_log[same_moves - 1]:
+            same_moves -= 1
+
+        if same_moves == len(self._moves) == len(move_log):
+            return
+
+        del self._moves[same_moves:]
+        del self._texts[same_moves:]
+
+        font = get_font(MOVE_LOG_FONT_SIZE)
+        colour = pygame.Color(MOVE_LOG_FONT_COLOUR)
+        for move_num in range(same_moves, len(move_log)):
+            move = move_log[move_num]
+            self._moves.append(move)
+            self._texts.append(font.render("{0}. {1}".format(move_num + 1, move.move_log_name), True, colour))
+
+        self._changed = True
+        if self._follow_end:
+            self._first_line = max(self.num_lines - self.VISIBLE_LINES, 0)
+        else:
+            self._first_line = min(self._first_line, max(self.num_lines - self.VISIBLE_LINES, 0))
+
+    def draw(self, screen: pygame.surface.Surface, game: Game) -> Optional[pygame.Rect]:
+        """Draws the panel if the move log or the scrolling changed, returns the rect drawn on."""
+
+        self._sync(game.move_log)
+        if not self._changed:
+            return None
+
+        pygame.draw.rect(screen, pygame.Color(MOVE_LOG_PANEL_BACKGROUND_COLOUR), self.rect)
+        first_move = self._first_line * self.MOVES_PER_LINE
+        last_move = min(first_move + self.VISIBLE_LINES * self.MOVES_PER_LINE, len(self._texts))
+        for move_num in range(first_move, last_move):
+            line_num, col_num = divmod(move_num - first_move, self.MOVES_PER_LINE)
+            screen.blit(self._texts[move_num], self.rect.move(col_num * MOVE_LOG_PANEL_WIDTH // self.MOVES_PER_LINE,
+                                                              line_num * self.LINE_HEIGHT))
+
+        self._changed = False
+        return self.rect
+
+
+class GameRenderer:
+    """
+    Class represents a renderer of games that only draws what changed since its last frame.
+
+    The board background and the highlight overlays are drawn once. The pieces layer is drawn again only when the
+    pieces on the board change, and only the squares whose piece or highlight changed are copied to the screen. The
+    move log panel is a MoveLogWidget. draw returns the rects of the screen it drew on, to pass to
+    pygame.display.update.
+
+    Anything else drawn over the board or the move log panel is not known to the renderer, invalidate makes the next
+    frame draw everything.
+    """
+
+    def __init__(self):
+        self._background = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT))
+        draw_board(self._background)
+        self._overlays = {SELECTED_HIGHLIGHT: _create_overlay(SELECTED_SQUARE_COLOUR, SELECTED_SQUARE_ALPHA),
+                          MOVABLE_HIGHLIGHT: _create_overlay(MOVABLE_SQUARE_COLOUR, MOVABLE_SQUARE_ALPHA)}
+
+        self._pieces = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT), pygame.SRCALPHA)
+        self._pieces_board: Optional[bytes] = None     # Board squares the pieces layer was drawn for
+
+        self._square_states: List[Optional[Tuple[int, int]]] = [None] * 64    # Piece code and highlight on screen
+        self.move_log = MoveLogWidget()
+
+        self.frame_timer = FrameTimer()
+
+    def invalidate(self) -> None:
+        """Makes the next frame draw the whole board and move log panel."""
+
+        self._square_states = [None] * 64
+        self.move_log.invalidate()
+
+    def _draw_pieces_layer(self, game: Game) -> None:
+        self._pieces.fill((0, 0, 0, 0))
+        piece_images = load_piece_images()
+        for row, col, piece in game.piece_squares():
+            self._pieces.blit(piece_images[piece.value], (col * SQUARE_SIZE, row * SQUARE_SIZE))
+
+    @staticmethod
+    def _get_highlights(game: Game, square: Optional[Tuple[int, int]], val_moves: List[Move]) -> Dict[int, int]:
+        """Gets the highlight of every highlighted square, by its row * 8 + col, as draw_game highlights them."""
+
+        highlights: Dict[int, int] = {}
+        if not square:
+            return highlights
+
+        row, col = square
+        piece = game.chess_board[row][col]
+        if (piece.is_white() and game.turn.is_white()) or (piece.is_black() and not game.turn.is_white()):
+            highlights[row * 8 + col] = SELECTED_HIGHLIGHT
+
+        for move in val_moves:
+            if move.from_square == square:
+                highlights[move.to_row * 8 + move.to_col] = MOVABLE_HIGHLIGHT
+
+        return highlights
+
+    def draw(self, screen: pygame.surface.Surface, game: Game, square: Optional[Tuple[int, int]],
+             val_moves: List[Move]) -> List[pygame.Rect]:
+        """Draws the changes to the chess game since the last frame on a pygame screen, returns the rects drawn on."""
+
+        start = time.perf_counter()
+
+        squares = game.chess_board.squares
+        board = bytes(squares)
+        if board != self._pieces_board:
+            self._draw_pieces_layer(game)
+            self._pieces_board = board
+
+        highlights = self._get_highlights(game, square, val_moves)
+        dirty_rects = []
+        for square_number, mailbox_square in enumerate(BOARD_SQUARES):
+            state = (squares[mailbox_square], highlights.get(square_number, NO_HIGHLIGHT))
+            if state == self._square_states[square_number]:
+                continue
+
+            self._square_states[square_number] = state
+            row, col = divmod(square_number, 8)
+            rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+            screen.blit(self._background, rect, rect)
+            if state[1] != NO_HIGHLIGHT:
+                screen.blit(self._overlays[state[1]], rect)
+            screen.blit(self._pieces, rect, rect)
+            dirty_rects.append(rect)
+
+        move_log_rect = self.move_log.draw(screen, game)
+        if move_log_rect is not None:
+            dirty_rects.append(move_log_rect)
+
+        self.frame_timer.record(time.perf_counter() - start)
+        return dirty_rects
+
+
+def measure_frame_times(frames: int = 600, move_every: int = 15) -> Dict[str, FrameTimer]:
+    """
+    Times drawing frames of a game with draw_game and with a GameRenderer, off screen.
+
+    A move is made every few frames and a square is selected in between, like a game played at MAX_FPS.
+    """
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    timers = {"draw_game": FrameTimer(), "GameRenderer": FrameTimer()}
+    renderer = GameRenderer()
+    for name, timer in timers.items():
+        screen = pygame.Surface((BOARD_WIDTH + MOVE_LOG_PANEL_WIDTH, BOARD_HEIGHT))
+        game = Game(Board())
+        valid_moves = game.get_valid_moves()
+        for frame in range(frames):
+            if frame % move_every == move_every - 1 and valid_moves:
+                game.make_move(valid_moves[frame % len(valid_moves)])
+                valid_moves = game.get_valid_moves()
+            selected_square = valid_moves[0].from_square if valid_moves and frame % move_every > move_every // 2 else None
+
+            if name == "draw_game":
+                start = time.perf_counter()
+                draw_game(screen, game, selected_square, valid_moves)
+                timer.record(time.perf_counter() - start)
+            else:
+                renderer.draw(screen, game, selected_square, valid_moves)
+
+    timers["GameRenderer"] = renderer.frame_timer
+    return timers
+
+
+def measure_move_log_times(game_lengths: Sequence[int] = (10, 100, 400), repeats: int = 50) -> Dict[int, Tuple[float, float]]:
+    """
+    Times drawing the move log after a move with draw_move_log and with a MoveLogWidget, off screen.
+
+    Returns the milliseconds each takes by the number of moves made, games end early if they are over.
+    """
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.Surface((BOARD_WIDTH + MOVE_LOG_PANEL_WIDTH, BOARD_HEIGHT))
+    times = {}
+    for game_length in game_lengths:
+        game = Game(Board())
+        widget = MoveLogWidget()
+        valid_moves = game.get_valid_moves()
+        while game.num_moves_made < game_length - 1 and valid_moves:
+            game.make_move(valid_moves[game.num_moves_made % len(valid_moves)])
+            valid_moves = game.get_valid_moves()
+        widget.draw(screen, game)
+        if not valid_moves:
+            continue
+
+        full_seconds, widget_seconds = 0.0, 0.0
+        for _ in range(repeats):
+            game.make_move(valid_moves[0])
+            start = time.perf_counter()
+            draw_move_log(screen, game)
+            full_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            widget.draw(screen, game)
+            widget_seconds += time.perf_counter() - start
+            game.undo_move()
+            widget.draw(screen, game)
+
+        times[game.num_moves_made + 1] = (full_seconds * 1000 / repeats, widget_seconds * 1000 / repeats)
+
+    return times
+
+
+def main():
+    for name, timer in measure_frame_times().items():
+        print(f"{name}: {timer}")
+
+    for moves_made, (full_ms, widget_ms) in measure_move_log_times().items():
+        print(f"move log after {moves_made} moves: draw_move_log {full_ms:.3f} ms, MoveLogWidget {widget_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 """
-Loads all Images of the chess pieces into a global dictionary.
+Loads the images of the chess pieces, the first time they are needed.
 """
 
 
@@ -11,13 +11,20 @@ from playchess.config import SQUARE_SIZE
 from pygame.surface import Surface
 
 
-CHESS_PIECE_IMAGES: Dict[str, Surface] = {}
-
 IMAGES_DIR_PATH: str = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
-for img_file in os.listdir(IMAGES_DIR_PATH):
-    if not img_file.endswith(".png"):
-        continue
-    piece = img_file.split('.')[0]
-    loaded_image = pygame.image.load(IMAGES_DIR_PATH + os.sep + img_file)
-    CHESS_PIECE_IMAGES[piece] = pygame.transform.scale(loaded_image, (SQUARE_SIZE, SQUARE_SIZE))
+_CHESS_PIECE_IMAGES: Dict[str, Surface] = {}
+
+
+def load_piece_images() -> Dict[str, Surface]:
+    """Gets the images of the chess pieces by their piece values, scaled to a square. They are loaded on the first call."""
+
+    if not _CHESS_PIECE_IMAGES:
+        for img_file in os.listdir(IMAGES_DIR_PATH):
+            if not img_file.endswith(".png"):
+                continue
+            piece = img_file.split('.')[0]
+            loaded_image = pygame.image.load(IMAGES_DIR_PATH + os.sep + img_file)
+            _CHESS_PIECE_IMAGES[piece] = pygame.transform.scale(loaded_image, (SQUARE_SIZE, SQUARE_SIZE))
+
+    return _CHESS_PIECE_IMAGES
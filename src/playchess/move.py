@@ -1,50 +1,120 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
-from playchess.board import Board
+from playchess.board import Board, MAILBOX_WIDTH, SQUARE_NAMES
+from playchess.piece import CODE_PIECES, Piece, TYPE_MASK
 
 
 class Move:
-    """Class to represent a chess move."""
+    """
+    Class to represent a chess move.
+
+    Moves are created by the hundred thousand during search, so only the squares, the pieces and the flags are
+    stored. Everything else, including the notation, is derived on access and equality and hashing use an integer
+    key of the squares and pieces.
+
+    A pawn reaching the last row promotes to the promotion piece, a queen unless another piece is given.
+    """
+
+    __slots__ = ("from_square", "to_square", "piece_moved", "piece_captured", "is_en_passant", "is_castle",
+                 "promotion_piece")
 
     def __init__(self, from_square: Tuple[int, int], to_square: Tuple[int, int], board: Board, *,
-                 is_en_passant: bool = False, is_castle: bool = False):
+                 is_en_passant: bool = False, is_castle: bool = False, promotion: Optional[Piece] = None):
 
         self.from_square = from_square
         self.to_square = to_square
-        self.from_row, self.from_col = self.from_square
-        self.to_row, self.to_col = self.to_square
 
-        # self.chess_board = board.deep_copy()
-        self.chess_board = board
+        squares = board.squares
+        self.piece_moved: Piece = CODE_PIECES[squares[21 + from_square[0] * MAILBOX_WIDTH + from_square[1]]]
 
-        self.piece_moved = self.chess_board[self.from_row][self.from_col]
-        self.piece_captured = self.chess_board[self.to_row][self.to_col]
+        # En-passant captures the pawn next to the moving pawn, not the piece on the (empty) to square
+        self.is_en_passant = is_en_passant
+        if is_en_passant:
+            self.piece_captured: Piece = CODE_PIECES[squares[21 + from_square[0] * MAILBOX_WIDTH + to_square[1]]]
+        else:
+            self.piece_captured = CODE_PIECES[squares[21 + to_square[0] * MAILBOX_WIDTH + to_square[1]]]
+
+        # Castling
+        self.is_castle = is_castle
 
         # Pawn promotion
-        self.is_white_pawn_promotion = self.piece_moved.is_white() and self.piece_moved.is_pawn() and self.to_row == 0
-        self.is_black_pawn_promotion = self.piece_moved.is_black() and self.piece_moved.is_pawn() and self.to_row == 7
-        self.is_pawn_promotion = self.is_white_pawn_promotion or self.is_black_pawn_promotion
+        if self.is_white_pawn_promotion:
+            self.promotion_piece = promotion or Piece.WHITE_QUEEN
+        elif self.is_black_pawn_promotion:
+            self.promotion_piece = promotion or Piece.BLACK_QUEEN
+        else:
+            self.promotion_piece = Piece.NONE
 
-        # En-passant
-        self.is_en_passant = is_en_passant
-        if self.is_en_passant:
-            self.piece_captured = self.chess_board[self.from_row][self.to_col]
+    @property
+    def from_row(self) -> int:
+        return self.from_square[0]
 
-        self.piece_is_captured = True
-        if self.chess_board.is_empty_square(self.to_row, self.to_col):
-            self.piece_is_captured = False
+    @property
+    def from_col(self) -> int:
+        return self.from_square[1]
 
-        # Castling
-        self.is_castle = is_castle
+    @property
+    def to_row(self) -> int:
+        return self.to_square[0]
 
-        self.from_square_name = self.chess_board.get_square_name(self.from_row, self.from_col)
-        self.to_square_name = self.chess_board.get_square_name(self.to_row, self.to_col)
+    @property
+    def to_col(self) -> int:
+        return self.to_square[1]
+
+    # Pawn promotion
+    @property
+    def is_white_pawn_promotion(self) -> bool:
+        return self.piece_moved is Piece.WHITE_PAWN and self.to_square[0] == 0
+
+    @property
+    def is_black_pawn_promotion(self) -> bool:
+        return self.piece_moved is Piece.BLACK_PAWN and self.to_square[0] == 7
+
+    @property
+    def is_pawn_promotion(self) -> bool:
+        return self.is_white_pawn_promotion or self.is_black_pawn_promotion
+
+    @property
+    def piece_is_captured(self) -> bool:
+        """Whether the to square holds a piece, en-passant captures land on an empty square."""
+        return not self.is_en_passant and self.piece_captured is not Piece.NONE
+
+    @property
+    def from_square_name(self) -> str:
+        return SQUARE_NAMES[self.from_square]
+
+    @property
+    def to_square_name(self) -> str:
+        return SQUARE_NAMES[self.to_square]
+
+    @property
+    def key(self) -> int:
+        """Integer key of the squares, the piece moved, the piece on the to square and the promotion piece type."""
+
+        from_row, from_col = self.from_square
+        to_row, to_col = self.to_square
+        captured = self.piece_captured.code if self.piece_is_captured else 0
+        promotion = self.promotion_piece.code & TYPE_MASK
+
+        return from_row << 3 | from_col | (to_row << 3 | to_col) << 6 | self.piece_moved.code << 12 | captured << 17 | \
+            promotion << 22
+
+    @property
+    def promotion_name(self) -> str:
+        """Notation suffix of a promotion, e.g. =Q."""
+
+        if self.promotion_piece is Piece.NONE:
+            return ""
+
+        name: str = self.promotion_piece.value
+        return "=" + name[1]
 
     def __str__(self):
         if not self.piece_is_captured:
-            return self.piece_moved.value + self.from_square_name + self.to_square_name
+            return self.piece_moved.value + self.from_square_name + self.to_square_name + self.promotion_name
 
-        return self.piece_moved.value + self.from_square_name + "x" + self.piece_captured.value + self.to_square_name
+        return self.piece_moved.value + self.from_square_name + "x" + self.piece_captured.value + self.to_square_name + \
+            self.promotion_name
 
     @property
     def name(self):
@@ -57,12 +127,15 @@ class Move:
             return "O-O" if self.to_col == 6 else "O-O-O"
 
         if not self.piece_is_captured:
-            return self.from_square_name + self.to_square_name
+            return self.from_square_name + self.to_square_name + self.promotion_name
 
-        return self.from_square_name + "x" + self.to_square_name
+        return self.from_square_name + "x" + self.to_square_name + self.promotion_name
 
     def __eq__(self, other):
-        return self.name == other.name
+        return isinstance(other, Move) and self.key == other.key
+
+    def __hash__(self):
+        return self.key
 
 
 def main():
@@ -1,44 +1,74 @@
 import random
+import time
 from abc import ABC
-from typing import List, Optional, Union
+from typing import Dict, Generic, List, Optional, Tuple
 
-from playchess.game import Game
-from playchess.move import Move
-from playchess.scorer import CHECKMATE_ABS_SCORE, find_game_score
+from playchess.config import MAX_SEARCH_DEPTH, SEARCH_TIME_LIMIT, MAX_QUIESCENCE_DEPTH, OPENING_BOOK_PATH
+from playchess.move_ordering import MoveOrderer
+from playchess.opening_book import OpeningBook, open_book
+from playchess.piece import EMPTY, PAWN, WHITE
+from playchess.position import MoveT, Position
+from playchess.scorer import CHECKMATE_ABS_SCORE, MATERIAL_SCORES, find_game_score
+from playchess.transposition_table import Bound, TranspositionTable
 
 
-class MoveFinder(ABC):
-    """Class represents a chess move finder."""
+INFINITE_SCORE = CHECKMATE_ABS_SCORE + 1.0
 
-    def find_move(self) -> Union[Move, Optional[Move]]:
+NULL_WINDOW = 0.01          # Narrower than the smallest difference of two scores (0.1)
+
+ASPIRATION_WINDOW = 0.5     # Half width of the first search window around the score of the previous iteration
+
+DELTA_MARGIN = 2.0          # More than a move can change the positional score by, used to skip hopeless captures
+
+
+class MoveFinder(ABC, Generic[MoveT]):
+    """
+    Class represents a chess move finder.
+
+    Move finders search any Position, e.g. a Game or a BitboardPosition, with the moves it generates.
+    """
+
+    def find_move(self) -> Optional[MoveT]:
         """Returns a move that is found."""
 
+    def stop(self) -> None:
+        """Asks a running search, e.g. in another thread, to stop early. Finders that cannot stop ignore it."""
 
-class RandomMoveFinder(MoveFinder):
+
+class RandomMoveFinder(MoveFinder[MoveT]):
     """Class represents a random move finder in chess."""
 
-    def __init__(self, valid_moves: List[Move]):
+    def __init__(self, valid_moves: List[MoveT]):
         self.valid_moves = valid_moves
 
-    def find_move(self) -> Move:
+    def find_move(self) -> MoveT:
         """Returns a random move from a given list of moves."""
 
         return random.choice(self.valid_moves)
 
 
-class MaterialMoveFinder(MoveFinder):
-    """Class represents a purely material based move finder in chess."""
+class MaterialMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents a purely material based move finder in chess.
+
+    Stopping it returns the best of the moves scored so far.
+    """
 
-    def __init__(self, game: Game, valid_moves: List[Move], use_positional_scoring: bool = True):
+    def __init__(self, game: Position[MoveT], valid_moves: List[MoveT], use_positional_scoring: bool = True):
         self.game = game
         self.valid_moves = valid_moves
         self.use_positional_scoring = use_positional_scoring
+        self.stop_requested = False
+
+    def stop(self) -> None:
+        """Stops scoring moves after the current one."""
+        self.stop_requested = True
 
-    def find_move(self) -> Optional[Move]:
+    def find_move(self) -> Optional[MoveT]:
         """Returns a move which gives most material advantage."""
 
         score_to_beat = -CHECKMATE_ABS_SCORE if self.game.turn.is_white() else CHECKMATE_ABS_SCORE
-        best_move: Optional[Move] = None
+        best_move: Optional[MoveT] = None
         random.shuffle(self.valid_moves)
 
         for valid_move in self.valid_moves:
@@ -52,32 +82,54 @@ class MaterialMoveFinder(MoveFinder):
                 best_move = valid_move
 
             self.game.undo_move()
+            if self.stop_requested:
+                break
 
         return best_move
 
 
-class MinMaxMoveFinder(MoveFinder):
-    """Class represents a min max based recursive move finder in chess."""
+class MinMaxMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents a min max based recursive move finder in chess.
 
-    def __init__(self, game: Game, valid_moves: List[Move], depth: int, use_positional_scoring: bool = True):
+    Moves are searched in the order of the move orderer, by default with equal moves shuffled so the same moves
+    are not repeated. A stopped search unwinds at the next node, the game is left as it was and aborted is set, the
+    move found is then not to be trusted.
+    """
+
+    def __init__(self, game: Position[MoveT], valid_moves: List[MoveT], depth: int, use_positional_scoring: bool = True,
+                 move_orderer: Optional[MoveOrderer[MoveT]] = None):
         self.game = game
         self.valid_moves = valid_moves
         self.depth = depth
         self.use_positional_scoring = use_positional_scoring
+        self.move_orderer: MoveOrderer[MoveT] = \
+            move_orderer if move_orderer is not None else MoveOrderer(randomize_ties=True)
+
+        self.aborted = False
+        self.stop_requested = False
 
-    def find_move(self) -> Optional[Move]:
+    def stop(self) -> None:
+        """Aborts the search at the next node."""
+        self.stop_requested = True
+
+    def find_move(self) -> Optional[MoveT]:
         """Returns a move resulting in best min max score."""
 
-        best_move: Optional[Move] = None
+        best_move: Optional[MoveT] = None
 
-        def set_best_move_min_max_recursive(game_: Game, valid_moves_: List[Move], depth_: int, white_to_play: bool):
+        def set_best_move_min_max_recursive(game_: Position[MoveT], valid_moves_: List[MoveT], depth_: int, white_to_play: bool):
 
             nonlocal best_move
 
+            if self.stop_requested:
+                self.aborted = True
+                return 0.0
+
             if depth_ == 0:
                 return find_game_score(game_, self.use_positional_scoring)
 
-            random.shuffle(valid_moves_)    # Same moves are repeated if not shuffled
+            valid_moves_ = self.move_orderer.order_moves(game_, valid_moves_, self.depth - depth_)
 
             # Maximizer
             if white_to_play:
@@ -94,6 +146,8 @@ class MinMaxMoveFinder(MoveFinder):
                             best_move = valid_move
 
                     game_.undo_move()
+                    if self.aborted:
+                        break
 
                 return max_score
 
@@ -113,6 +167,8 @@ class MinMaxMoveFinder(MoveFinder):
                             best_move = valid_move
 
                     game_.undo_move()
+                    if self.aborted:
+                        break
 
                 return min_score
 
@@ -121,77 +177,544 @@ class MinMaxMoveFinder(MoveFinder):
         return best_move
 
 
-class PrunedMinMaxMoveFinder(MoveFinder):
-    """Class represents a min max based recursive move finder in chess with alpha beta pruning."""
+class PrunedMinMaxMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents a min max based recursive move finder in chess with alpha beta pruning.
+
+    Search results are kept in a transposition table, which can be passed in to share it between calls. Positions
+    reached again through a different move order are answered from the table when it was searched deep enough,
+    and otherwise the best move found for them before is searched first. The other moves are searched in the
+    order of the move orderer, which learns from the cutoffs of the search.
+
+    The search is aborted once the deadline (a time.perf_counter() time) passes or more than max_nodes nodes are
+    searched. The game is left as it was and aborted is set, the move found is then not to be trusted.
+    """
 
-    def __init__(self, game: Game, valid_moves: List[Move], depth: int, use_positional_scoring: bool = True):
+    def __init__(self, game: Position[MoveT], valid_moves: List[MoveT], depth: int, use_positional_scoring: bool = True,
+                 transposition_table: Optional[TranspositionTable[MoveT]] = None,
+                 move_orderer: Optional[MoveOrderer[MoveT]] = None, deadline: Optional[float] = None,
+                 max_nodes: Optional[int] = None):
         self.game = game
         self.valid_moves = valid_moves
         self.depth = depth
         self.use_positional_scoring = use_positional_scoring
+        self.transposition_table: TranspositionTable[MoveT] = \
+            transposition_table if transposition_table is not None else TranspositionTable()
+        self.move_orderer: MoveOrderer[MoveT] = \
+            move_orderer if move_orderer is not None else MoveOrderer(randomize_ties=True)
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+
+        self.nodes_searched = 0
+        self.aborted = False
+        self.stop_requested = False
+        self.best_score: Optional[float] = None
+
+    def stop(self) -> None:
+        """Aborts the search at the next node."""
+        self.stop_requested = True
+
+    def _is_out_of_budget(self) -> bool:
+        """Whether the search has run out of nodes or time or was stopped."""
+
+        if self.stop_requested or (self.max_nodes is not None and self.nodes_searched > self.max_nodes):
+            return True
+
+        # Reading the clock costs about as much as searching a node, so it is only read every 256 nodes
+        return self.deadline is not None and self.nodes_searched % 256 == 0 and time.perf_counter() >= self.deadline
 
-    def find_move(self) -> Optional[Move]:
+    def find_move(self) -> Optional[MoveT]:
         """Returns a move resulting in best min max score with alpha beta pruning."""
 
-        best_move: Optional[Move] = None
+        best_move: Optional[MoveT] = None
 
-        def set_best_move_min_max_recursive(game_: Game, valid_moves_: List[Move], depth_: int, white_to_play: bool,
-                                            alpha: float = -CHECKMATE_ABS_SCORE, beta: float = CHECKMATE_ABS_SCORE):
+        def set_best_move_min_max_recursive(game_: Position[MoveT], valid_moves_: List[MoveT], depth_: int,
+                                            white_to_play: bool, alpha: float = -CHECKMATE_ABS_SCORE,
+                                            beta: float = CHECKMATE_ABS_SCORE):
 
             nonlocal best_move
+            self.nodes_searched += 1
+
+            if self._is_out_of_budget():
+                self.aborted = True
+                return 0.0
 
             if depth_ == 0:
                 return find_game_score(game_, self.use_positional_scoring)
 
-            random.shuffle(valid_moves_)        # Same moves are repeated if not shuffled
+            alpha_original, beta_original = alpha, beta
+            position_key = game_.position_key
+            entry = self.transposition_table.probe(position_key)
+
+            if entry is not None and entry.depth >= depth_ and depth_ != self.depth:    # Root has to find a move
+                if entry.bound is Bound.EXACT:
+                    return entry.score
+                if entry.bound is Bound.LOWER:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+                if alpha >= beta:
+                    return entry.score
+
+            ply = self.depth - depth_
+            hash_move = entry.move if entry is not None else None
+            valid_moves_ = self.move_orderer.order_moves(game_, valid_moves_, ply, hash_move)
+
+            node_best_move: Optional[MoveT] = None
 
             # Maximizer
             if white_to_play:
                 max_score = -CHECKMATE_ABS_SCORE
-                for valid_move in valid_moves_:
+                for move_number, valid_move in enumerate(valid_moves_):
 
                     game_.make_move(valid_move)
                     score = set_best_move_min_max_recursive(game_, game_.get_valid_moves(), depth_ - 1, False,
                                                             alpha, beta)
+                    game_.undo_move()
+
+                    if self.aborted:
+                        return 0.0
 
                     if score > max_score:
                         max_score = score
+                        node_best_move = valid_move
                         if depth_ == self.depth:
                             best_move = valid_move
 
-                    game_.undo_move()
-
                     if max_score >= beta:
+                        self.move_orderer.record_cutoff(game_, valid_move, ply, depth_, move_number)
                         break
 
                     alpha = max(alpha, max_score)
 
+                if max_score >= beta:
+                    bound = Bound.LOWER
+                elif max_score <= alpha_original:
+                    bound = Bound.UPPER
+                else:
+                    bound = Bound.EXACT
+                self.transposition_table.store(position_key, depth_, max_score, bound, node_best_move)
+
                 return max_score
 
             # Minimizer
             else:
                 min_score = CHECKMATE_ABS_SCORE
 
-                for valid_move in valid_moves_:
+                for move_number, valid_move in enumerate(valid_moves_):
 
                     game_.make_move(valid_move)
                     score = set_best_move_min_max_recursive(game_, game_.get_valid_moves(), depth_-1, True,
                                                             alpha, beta)
+                    game_.undo_move()
+
+                    if self.aborted:
+                        return 0.0
 
                     if score < min_score:
                         min_score = score
+                        node_best_move = valid_move
                         if depth_ == self.depth:
                             best_move = valid_move
 
-                    game_.undo_move()
-
                     if min_score <= alpha:
+                        self.move_orderer.record_cutoff(game_, valid_move, ply, depth_, move_number)
                         break
 
                     beta = min(beta, min_score)
 
+                if min_score <= alpha:
+                    bound = Bound.UPPER
+                elif min_score >= beta_original:
+                    bound = Bound.LOWER
+                else:
+                    bound = Bound.EXACT
+                self.transposition_table.store(position_key, depth_, min_score, bound, node_best_move)
+
                 return min_score
 
-        set_best_move_min_max_recursive(self.game, self.valid_moves, self.depth, self.game.turn.is_white())
+        score = set_best_move_min_max_recursive(self.game, self.valid_moves, self.depth, self.game.turn.is_white())
+        if not self.aborted:
+            self.best_score = score
+
+        return best_move
+
+
+class IterativeDeepeningMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents an iterative deepening move finder in chess.
+
+    Searches to depth 1, 2, 3 and so on with alpha beta pruning until max_depth is reached or the time limit (in
+    seconds) or the node budget runs out. An iteration that runs out is aborted and the move of the deepest
+    completed iteration is returned. The iterations share a transposition table and a move orderer, so each one
+    searches the best moves of the one before first.
+    """
+
+    def __init__(self, game: Position[MoveT], valid_moves: List[MoveT], max_depth: int = MAX_SEARCH_DEPTH,
+                 time_limit: Optional[float] = SEARCH_TIME_LIMIT, max_nodes: Optional[int] = None,
+                 use_positional_scoring: bool = True, transposition_table: Optional[TranspositionTable[MoveT]] = None,
+                 move_orderer: Optional[MoveOrderer[MoveT]] = None):
+        self.game = game
+        self.valid_moves = valid_moves
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.use_positional_scoring = use_positional_scoring
+        self.transposition_table: TranspositionTable[MoveT] = \
+            transposition_table if transposition_table is not None else TranspositionTable()
+        self.move_orderer: MoveOrderer[MoveT] = \
+            move_orderer if move_orderer is not None else MoveOrderer(randomize_ties=True)
+
+        self.nodes_searched = 0
+        self.depth_reached = 0
+        self.best_score: Optional[float] = None
+        self._finder: Optional[PrunedMinMaxMoveFinder[MoveT]] = None
+        self._stop_requested = False
+
+    def stop(self) -> None:
+        """Aborts the iteration being searched, the move of the deepest completed iteration is returned."""
+
+        self._stop_requested = True
+        if self._finder is not None:
+            self._finder.stop()
+
+    def find_move(self) -> Optional[MoveT]:
+        """Returns the move of the deepest search completed within the budget."""
+
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        best_move: Optional[MoveT] = None
+
+        for depth in range(1, self.max_depth + 1):
+            max_nodes = self.max_nodes - self.nodes_searched if self.max_nodes is not None else None
+            finder = PrunedMinMaxMoveFinder(self.game, self.valid_moves, depth, self.use_positional_scoring,
+                                            self.transposition_table, self.move_orderer, deadline, max_nodes)
+            self._finder = finder
+            if self._stop_requested:
+                break
+
+            move = finder.find_move()
+            self.nodes_searched += finder.nodes_searched
+
+            if finder.aborted:
+                break
+
+            best_move, self.best_score, self.depth_reached = move, finder.best_score, depth
+
+            # Nothing to search or a forced mate was found
+            if move is None or finder.best_score is None or abs(finder.best_score) >= CHECKMATE_ABS_SCORE:
+                break
+
+        # Not even depth 1 was completed, any move is better than none
+        if best_move is None and self.valid_moves:
+            best_move = self.valid_moves[0]
 
         return best_move
+
+
+class NegamaxMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents a negamax based iterative deepening move finder in chess.
+
+    Scores are from the point of view of the side to move, so the maximizer and the minimizer are one code path.
+    The first move of a node is searched with the full window and the others with a null window (principal
+    variation search), only moves that turn out better than the first are searched again with the full window.
+    From depth 2 on each iteration starts with an aspiration window around the score of the one before, which is
+    widened when the score falls outside it.
+
+    The time limit, node budget, transposition table and move orderer work like for the IterativeDeepeningMoveFinder.
+    The principal variation, the moves both sides are expected to play, of the deepest completed iteration is kept
+    in principal_variation and best_score is its score for the side to move.
+
+    With use_quiescence the positions at the full depth are not scored as they are but after a quiescence search,
+    which plays on captures and promotions only (and any move out of check) for up to max_quiescence_depth moves, so
+    a capture is not scored without the recapture. The side to move can stand pat, i.e. stop capturing, if the
+    position is already good enough and captures that cannot bring the score up to alpha are skipped (delta
+    pruning). Quiescence nodes are counted in quiescence_nodes_searched and not in nodes_searched.
+
+    The iterations start at start_depth, the score and principal variation of every completed one is kept in
+    iterations.
+    """
+
+    def __init__(self, game: Position[MoveT], valid_moves: List[MoveT], max_depth: int = MAX_SEARCH_DEPTH,
+                 time_limit: Optional[float] = SEARCH_TIME_LIMIT, max_nodes: Optional[int] = None,
+                 use_positional_scoring: bool = True, transposition_table: Optional[TranspositionTable[MoveT]] = None,
+                 move_orderer: Optional[MoveOrderer[MoveT]] = None, use_quiescence: bool = True,
+                 max_quiescence_depth: int = MAX_QUIESCENCE_DEPTH, start_depth: int = 1):
+        self.game = game
+        self.valid_moves = valid_moves
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.use_positional_scoring = use_positional_scoring
+        self.transposition_table: TranspositionTable[MoveT] = \
+            transposition_table if transposition_table is not None else TranspositionTable()
+        self.move_orderer: MoveOrderer[MoveT] = \
+            move_orderer if move_orderer is not None else MoveOrderer(randomize_ties=True)
+        self.use_quiescence = use_quiescence
+        self.max_quiescence_depth = max_quiescence_depth
+        self.start_depth = start_depth
+
+        self.nodes_searched = 0
+        self.quiescence_nodes_searched = 0
+        self.depth_reached = 0
+        self.aborted = False
+        self.stop_requested = False
+        self.best_score: Optional[float] = None
+        self.principal_variation: List[MoveT] = []
+        self.iterations: Dict[int, Tuple[float, List[MoveT]]] = {}     # Keyed by depth
+        self._deadline: Optional[float] = None
+
+    def find_move(self) -> Optional[MoveT]:
+        """Returns the first move of the principal variation of the deepest search completed within the budget."""
+
+        self._deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+
+        for depth in range(self.start_depth, self.max_depth + 1):
+            principal_variation: List[MoveT] = []
+            score = self._search_root(depth, principal_variation)
+
+            if self.aborted:
+                break
+
+            self.best_score, self.principal_variation, self.depth_reached = score, principal_variation, depth
+            self.iterations[depth] = (score, principal_variation)
+
+            # Nothing to search or a forced mate was found
+            if not principal_variation or abs(score) >= CHECKMATE_ABS_SCORE:
+                break
+
+        if self.principal_variation:
+            return self.principal_variation[0]
+
+        # Not even depth 1 was completed, any move is better than none
+        return self.valid_moves[0] if self.valid_moves else None
+
+    def _search_root(self, depth: int, principal_variation: List[MoveT]) -> float:
+        """Searches the root to a depth, with an aspiration window once there is a score to aim at."""
+
+        if self.best_score is None or depth == 1:
+            return self._search(depth, -INFINITE_SCORE, INFINITE_SCORE, 0, principal_variation)
+
+        window = ASPIRATION_WINDOW
+        while True:
+            alpha, beta = self.best_score - window, self.best_score + window
+            score = self._search(depth, alpha, beta, 0, principal_variation)
+
+            if self.aborted or alpha < score < beta:
+                return score
+
+            window *= 4
+            if window >= CHECKMATE_ABS_SCORE:
+                return self._search(depth, -INFINITE_SCORE, INFINITE_SCORE, 0, principal_variation)
+
+    def stop(self) -> None:
+        """Aborts the iteration being searched, the result of the deepest completed iteration is kept."""
+        self.stop_requested = True
+
+    def _is_out_of_budget(self) -> bool:
+        """Whether the search has run out of nodes or time or was stopped."""
+
+        nodes_searched = self.nodes_searched + self.quiescence_nodes_searched
+        if self.stop_requested or (self.max_nodes is not None and nodes_searched > self.max_nodes):
+            return True
+
+        # Reading the clock costs about as much as searching a node, so it is only read every 256 nodes
+        return self._deadline is not None and nodes_searched % 256 == 0 and time.perf_counter() >= self._deadline
+
+    def _search(self, depth: int, alpha: float, beta: float, ply: int, principal_variation: List[MoveT]) -> float:
+        """
+        Returns the score of the game for the side to move searched to a depth within the alpha beta window and
+        fills in the principal variation if the score is inside the window.
+        """
+
+        game = self.game
+        if depth == 0 and self.use_quiescence:
+            return self._quiescence_search(alpha, beta, ply, self.max_quiescence_depth)
+
+        self.nodes_searched += 1
+
+        if self._is_out_of_budget():
+            self.aborted = True
+            return 0.0
+
+        valid_moves = self.valid_moves if ply == 0 else game.get_valid_moves()
+        if depth == 0 or not valid_moves:
+            score = find_game_score(game, self.use_positional_scoring)
+            return score if game.turn.is_white() else -score
+
+        is_pv_node = beta - alpha > NULL_WINDOW
+        alpha_original = alpha
+        position_key = game.position_key
+        entry = self.transposition_table.probe(position_key)
+
+        # The principal variation is not cut short by the table
+        if entry is not None and entry.depth >= depth and not is_pv_node:
+            if entry.bound is Bound.EXACT:
+                return entry.score
+            if entry.bound is Bound.LOWER and entry.score >= beta:
+                return entry.score
+            if entry.bound is Bound.UPPER and entry.score <= alpha:
+                return entry.score
+
+        hash_move = entry.move if entry is not None else None
+        valid_moves = self.move_orderer.order_moves(game, valid_moves, ply, hash_move)
+
+        best_score = -INFINITE_SCORE
+        best_move: Optional[MoveT] = None
+        child_variation: List[MoveT] = []
+
+        for move_number, move in enumerate(valid_moves):
+            child_variation.clear()
+            game.make_move(move)
+
+            if move_number == 0:
+                score = -self._search(depth - 1, -beta, -alpha, ply + 1, child_variation)
+            else:
+                score = -self._search(depth - 1, -alpha - NULL_WINDOW, -alpha, ply + 1, child_variation)
+                if alpha < score < beta and not self.aborted:
+                    child_variation.clear()
+                    score = -self._search(depth - 1, -beta, -alpha, ply + 1, child_variation)
+
+            game.undo_move()
+
+            if self.aborted:
+                return 0.0
+
+            if score > best_score:
+                best_score, best_move = score, move
+
+                if score > alpha:
+                    alpha = score
+                    principal_variation[:] = [move] + child_variation
+
+                if alpha >= beta:
+                    self.move_orderer.record_cutoff(game, move, ply, depth, move_number)
+                    break
+
+        if best_score <= alpha_original:
+            bound = Bound.UPPER
+        elif best_score >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.transposition_table.store(position_key, depth, best_score, bound, best_move)
+
+        return best_score
+
+    def _quiescence_search(self, alpha: float, beta: float, ply: int, depth: int) -> float:
+        """Returns the score of the game for the side to move once the captures and promotions are played out."""
+
+        game = self.game
+        self.quiescence_nodes_searched += 1
+
+        if self._is_out_of_budget():
+            self.aborted = True
+            return 0.0
+
+        valid_moves = game.get_valid_moves()
+        stand_pat = find_game_score(game, self.use_positional_scoring)
+        if not game.turn.is_white():
+            stand_pat = -stand_pat
+
+        if not valid_moves or depth == 0:
+            return stand_pat
+
+        # In check every move is searched, there is no standing pat
+        in_check = game.is_king_checked()
+        if in_check:
+            best_score = -INFINITE_SCORE
+        else:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best_score = stand_pat
+
+        for move in self.move_orderer.order_moves(game, valid_moves, ply):
+            if not in_check:
+                captured, promotion = game.move_details(move)[3:]
+                if captured == EMPTY and promotion == EMPTY:
+                    continue
+
+                # Delta pruning, the capture would not raise the score to alpha even with a positional gain
+                gain = abs(MATERIAL_SCORES[captured])
+                if promotion != EMPTY:
+                    gain += abs(MATERIAL_SCORES[promotion]) - MATERIAL_SCORES[WHITE | PAWN]
+                if stand_pat + gain + DELTA_MARGIN <= alpha:
+                    continue
+
+            game.make_move(move)
+            score = -self._quiescence_search(-beta, -alpha, ply + 1, depth - 1)
+            game.undo_move()
+
+            if self.aborted:
+                return 0.0
+
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                if alpha >= beta:
+                    break
+
+        return best_score
+
+
+class BookMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents a move finder that plays from an opening book while the position is in it.
+
+    Out of book it searches with the move finder it wraps.
+    """
+
+    def __init__(self, book: OpeningBook, game: Position[MoveT], valid_moves: List[MoveT], move_finder: MoveFinder[MoveT]):
+        self.book = book
+        self.game = game
+        self.valid_moves = valid_moves
+        self.move_finder = move_finder
+
+    def find_move(self) -> Optional[MoveT]:
+        """Returns a book move picked by its weight, or the move the wrapped finder finds."""
+
+        book_move = self.book.choose_move(self.game, self.valid_moves)
+        if book_move is not None:
+            return book_move
+
+        return self.move_finder.find_move()
+
+    def stop(self) -> None:
+        self.move_finder.stop()
+
+
+# Move finders of the bots, by the names bots are chosen with
+AI_MOVE_FINDERS = {"random": RandomMoveFinder,
+                   "material": MaterialMoveFinder,
+                   "minmax": MinMaxMoveFinder,
+                   "minmax_pruned": PrunedMinMaxMoveFinder,
+                   "iterative": IterativeDeepeningMoveFinder,
+                   "negamax": NegamaxMoveFinder}
+
+
+def create_move_finder(ai: str, game: Position[MoveT], valid_moves: List[MoveT], depth: int,
+                       book: Optional[str] = OPENING_BOOK_PATH,
+                       transposition_table: Optional[TranspositionTable[MoveT]] = None) -> MoveFinder[MoveT]:
+    """
+    Creates the move finder of a bot, the depth is the maximum depth of the finders that deepen iteratively.
+
+    With the path of an opening book the bot plays its moves from the book until the game leaves it. Finders that
+    use a transposition table search with the one given, a bot passes the same table for every move of a game.
+    """
+
+    ai_move_finder = AI_MOVE_FINDERS[ai]
+    if ai == "random":
+        move_finder: MoveFinder[MoveT] = ai_move_finder(valid_moves)
+    elif ai == "material":
+        move_finder = ai_move_finder(game, valid_moves)
+    elif ai in ("minmax_pruned", "iterative", "negamax"):
+        move_finder = ai_move_finder(game, valid_moves, depth, transposition_table=transposition_table)
+    else:
+        move_finder = ai_move_finder(game, valid_moves, depth)
+
+    if book:
+        move_finder = BookMoveFinder(open_book(book), game, valid_moves, move_finder)
+
+    return move_finder
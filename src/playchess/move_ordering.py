@@ -0,0 +1,105 @@
+import random
+from typing import Generic, List, Optional
+
+from playchess.piece import EMPTY, TYPE_MASK, BLACK
+from playchess.position import MoveT, Position
+
+
+# Sort keys of the move classes, a class always comes before the ones below it
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+PROMOTION_SCORE = 1 << 27
+KILLER_SCORES = (1 << 26, (1 << 26) - 1)     # First and second killer slot
+
+# History scores are halved once one passes this, so they stay below the killers and old cutoffs fade out
+MAX_HISTORY_SCORE = 1 << 20
+
+MAX_PLY = 64
+
+
+class MoveOrderer(Generic[MoveT]):
+    """
+    Class represents the move ordering of a search.
+
+    Alpha beta pruning cuts off the most when the best move is searched first, so moves are sorted by how likely
+    they are to be good: the hash move of the transposition table, captures by most valuable victim and least
+    valuable attacker (MVV-LVA), promotions, the two killer moves that last caused a cutoff at the same ply and
+    then the other quiet moves by their butterfly history score, i.e. how often the same from and to squares
+    caused cutoffs. Moves of equal score are shuffled if randomize_ties is set so that a bot does not repeat
+    the same game.
+    """
+
+    def __init__(self, randomize_ties: bool = False):
+        self.randomize_ties = randomize_ties
+        self.killers: List[List[Optional[MoveT]]] = [[None, None] for _ in range(MAX_PLY)]
+        self.history: List[List[List[int]]] = [[[0] * 64 for _ in range(64)] for _ in range(2)]  # Colour, from, to
+
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Share of the cutoffs that were caused by the first move searched, the closer to 1 the better."""
+
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def order_moves(self, position: Position[MoveT], moves: List[MoveT], ply: int,
+                    hash_move: Optional[MoveT] = None) -> List[MoveT]:
+        """Returns the moves of a position sorted with the most promising first."""
+
+        if self.randomize_ties:
+            moves = moves[:]
+            random.shuffle(moves)
+
+        killers = self.killers[ply] if ply < MAX_PLY else [None, None]
+        scores: List[int] = []
+        for move in moves:
+            if move == hash_move:
+                scores.append(HASH_MOVE_SCORE)
+                continue
+
+            from_square, to_square, moved, captured, promotion = position.move_details(move)
+            if captured != EMPTY:
+                scores.append(CAPTURE_SCORE + (captured & TYPE_MASK) * 8 - (moved & TYPE_MASK))
+            elif promotion != EMPTY:
+                scores.append(PROMOTION_SCORE + (promotion & TYPE_MASK))
+            elif move == killers[0]:
+                scores.append(KILLER_SCORES[0])
+            elif move == killers[1]:
+                scores.append(KILLER_SCORES[1])
+            else:
+                scores.append(self.history[(moved & BLACK) != 0][from_square][to_square])
+
+        order = sorted(range(len(moves)), key=scores.__getitem__, reverse=True)
+
+        return [moves[index] for index in order]
+
+    def record_cutoff(self, position: Position[MoveT], move: MoveT, ply: int, depth: int, move_number: int) -> None:
+        """Records the move that caused a cutoff, move_number is its place in the order the moves were searched."""
+
+        self.cutoffs += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+
+        from_square, to_square, moved, captured, promotion = position.move_details(move)
+        if captured != EMPTY or promotion != EMPTY:     # Those are ordered well without killers and history
+            return
+
+        if ply < MAX_PLY and self.killers[ply][0] != move:
+            self.killers[ply][1] = self.killers[ply][0]
+            self.killers[ply][0] = move
+
+        history = self.history[(moved & BLACK) != 0]
+        history[from_square][to_square] += depth * depth
+        if history[from_square][to_square] > MAX_HISTORY_SCORE:
+            for colour_history in self.history:
+                for to_scores in colour_history:
+                    to_scores[:] = [score // 2 for score in to_scores]
+
+    def clear(self) -> None:
+        """Forgets the killers, the history and the counters."""
+
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [[[0] * 64 for _ in range(64)] for _ in range(2)]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
@@ -0,0 +1,236 @@
+"""
+Opening books: the moves played from positions of the opening, looked up by the Zobrist key of the position.
+
+A book is a file of fixed size entries sorted by key, laid out like a Polyglot book: a 64 bit key, a 16 bit move,
+a 16 bit weight and 32 unused learning bits, all big endian. The keys are the position_key of this package rather
+than Polyglot's, so books are built from PGN with this module. The file is memory mapped and binary searched, the
+entries are never read into Python objects, so every process that opens a book shares it through the page cache.
+Run this module to build a book or list the book moves of a position:
+
+    python -m playchess.opening_book build games.pgn book.bin [--plies 20] [--min-games 2]
+    python -m playchess.opening_book show book.bin ["<FEN>"]
+"""
+
+
+import argparse
+import mmap
+import os
+import random
+import struct
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from playchess.game import Game
+from playchess.perft import coordinate_name
+from playchess.pgn import PgnGame, START_FEN, parse_san, read_pgn
+from playchess.piece import KING, TYPE_MASK
+from playchess.position import MoveT, Position
+
+
+ENTRY = struct.Struct(">QHHI")      # Key, move, weight and learning bits of a book entry
+KEY = struct.Struct(">Q")
+
+MAX_WEIGHT = 0xFFFF     # Weights of a position are scaled down to fit 16 bits
+
+BOOK_PLIES = 20         # Moves of every game entered into a built book
+
+# Weight a move gets for the side that played it from a game with each result, moves of lost games are left out
+RESULT_WEIGHTS: Dict[str, Tuple[int, int]] = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1), "*": (1, 1)}
+
+
+def encode_move(position: Position[MoveT], move: MoveT) -> int:
+    """
+    Gets the 16 bit book move of a valid move of a position.
+
+    From the lowest bits: the to file and rank, the from file and rank and the promotion piece (knight 1 to queen 4)
+    in 3 bits each, ranks counted from white's side. Castling is written as the king taking its own rook, e.g. e1h1.
+    """
+
+    from_square, to_square, moved, _, promotion = position.move_details(move)
+    from_row, from_col = divmod(from_square, 8)
+    to_row, to_col = divmod(to_square, 8)
+    if moved & TYPE_MASK == KING and abs(to_col - from_col) == 2:
+        to_col = 7 if to_col > from_col else 0
+    promotion_bits = (promotion & TYPE_MASK) - 1 if promotion else 0
+
+    return to_col | (7 - to_row) << 3 | from_col << 6 | (7 - from_row) << 9 | promotion_bits << 12
+
+
+class OpeningBook:
+    """
+    Class represents an opening book file, memory mapped and searched in place.
+
+    Books are opened read only, open_book shares one OpeningBook per path within a process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as book_file:
+            # An empty file cannot be mapped, it is a book without entries
+            self._map: Optional[mmap.mmap] = None
+            if os.fstat(book_file.fileno()).st_size:
+                self._map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.num_entries = len(self._map) // ENTRY.size if self._map is not None else 0
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.num_entries = 0
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_entries
+
+    def _first_entry(self, key: int) -> int:
+        """Binary searches the index of the first entry with a key not below a given key."""
+
+        assert self._map is not None
+        low, high = 0, self.num_entries
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self._map, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def entries(self, key: int) -> List[Tuple[int, int]]:
+        """Gets the book moves and weights of a position key, heaviest first."""
+
+        found: List[Tuple[int, int]] = []
+        if self._map is None:
+            return found
+
+        for index in range(self._first_entry(key), self.num_entries):
+            entry_key, move, weight, _ = ENTRY.unpack_from(self._map, index * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((move, weight))
+
+        return found
+
+    def moves(self, position: Position[MoveT], valid_moves: List[MoveT]) -> List[Tuple[MoveT, int]]:
+        """Gets the valid moves of a position that are in the book with their weights, heaviest first."""
+
+        entries = self.entries(position.position_key)
+        if not entries:
+            return []
+
+        # A key collision could bring in a move that is not valid here, only valid moves are handed out
+        valid_by_code = {encode_move(position, move): move for move in valid_moves}
+        return [(valid_by_code[move], weight) for move, weight in entries if move in valid_by_code and weight]
+
+    def choose_move(self, position: Position[MoveT], valid_moves: List[MoveT],
+                    rng: Optional[random.Random] = None) -> Optional[MoveT]:
+        """Picks a book move of a position at random, weighted by the book weights, None if it is out of book."""
+
+        book_moves = self.moves(position, valid_moves)
+        if not book_moves:
+            return None
+
+        moves = [move for move, _ in book_moves]
+        weights = [weight for _, weight in book_moves]
+        return (rng or random).choices(moves, weights)[0]
+
+
+@lru_cache(maxsize=None)
+def open_book(path: str) -> OpeningBook:
+    """Opens an opening book once per process, later calls with the same path share it."""
+
+    return OpeningBook(path)
+
+
+def _book_weights(games: Iterable[PgnGame], plies: int, min_games: int) -> Dict[int, Dict[int, int]]:
+    """Sums the weights of the moves played from every position in the first plies of the games."""
+
+    weights: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    for pgn_game in games:
+        if pgn_game.result not in RESULT_WEIGHTS:
+            continue
+        white_weight, black_weight = RESULT_WEIGHTS[pgn_game.result]
+
+        try:
+            game = pgn_game.start_game()
+        except ValueError:
+            continue
+        for san in pgn_game.moves[:plies]:
+            try:
+                move = parse_san(game, san)
+            except ValueError:
+                break
+            key, code = game.position_key, encode_move(game, move)
+            weights[key][code] += white_weight if game.turn.is_white() else black_weight
+            counts[key, code] += 1
+            game.make_move(move)
+
+    return {key: {code: weight for code, weight in moves.items() if weight and counts[key, code] >= min_games}
+            for key, moves in weights.items()}
+
+
+def build_book(games: Iterable[PgnGame], path: str, plies: int = BOOK_PLIES, min_games: int = 1) -> int:
+    """
+    Builds an opening book file from games, returns the number of entries written.
+
+    Every move of the first plies of every game is entered with the weight of the game's result for the side that
+    played it. Moves played in fewer than min_games games are left out.
+    """
+
+    entries = []
+    for key, moves in _book_weights(games, plies, min_games).items():
+        if not moves:
+            continue
+        heaviest = max(moves.values())
+        for code, weight in moves.items():
+            if heaviest > MAX_WEIGHT:
+                weight = max(1, weight * MAX_WEIGHT // heaviest)
+            entries.append((key, -weight, code))
+
+    entries.sort()
+    with open(path, "wb") as book_file:
+        for key, negative_weight, code in entries:
+            book_file.write(ENTRY.pack(key, code, -negative_weight, 0))
+
+    return len(entries)
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Builds opening books from PGN and lists their moves.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a book from the games of PGN files")
+    build.add_argument("pgn", nargs="+", help="PGN files of the games")
+    build.add_argument("book", help="book file to write")
+    build.add_argument("--plies", type=int, default=BOOK_PLIES, help="moves of every game entered into the book")
+    build.add_argument("--min-games", type=int, default=1, help="games a move is played in to be entered")
+
+    show = commands.add_parser("show", help="list the book moves of a position")
+    show.add_argument("book", help="book file")
+    show.add_argument("fen", nargs="?", default=START_FEN, help="FEN of the position, the start position by default")
+    options = parser.parse_args(args)
+
+    if options.command == "build":
+        games = (game for pgn_path in options.pgn for game in read_pgn(pgn_path))
+        print(f"{build_book(games, options.book, options.plies, options.min_games)} entries written")
+        return
+
+    game = Game.from_fen(options.fen)
+    with OpeningBook(options.book) as book:
+        book_moves = book.moves(game, game.get_valid_moves())
+        total = sum(weight for _, weight in book_moves)
+        for move, weight in book_moves:
+            print(f"{coordinate_name(game, move)}: {weight} ({weight * 100 / total:.1f}%)")
+        if not book_moves:
+            print("out of book")
+
+
+if __name__ == '__main__':
+    main()
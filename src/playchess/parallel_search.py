@@ -0,0 +1,236 @@
+"""
+Parallel move search over a pool of processes.
+
+Threads do not help a pure Python search because of the GIL, so the search runs in worker processes. A position is
+sent to the workers as the 67 bytes of BitboardPosition.pack and every worker runs a NegamaxMoveFinder on it. Lazy
+SMP workers share a transposition table in shared memory, they attach to it by its name. Run this module to measure
+how the search scales with the number of workers.
+"""
+
+
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from playchess.bitboard import BitboardPosition, move_name
+from playchess.config import PARALLEL_SEARCH_WORKERS, SEARCH_TIME_LIMIT, MAX_SEARCH_DEPTH
+from playchess.game import Game
+from playchess.move_finder import MoveFinder, NegamaxMoveFinder
+from playchess.position import MoveT, Position
+from playchess.piece import TYPE_MASK
+from playchess.transposition_table import SharedTranspositionTable
+
+
+# Parallel search modes
+ROOT_SPLITTING = "root_splitting"   # The root moves are split between the workers
+LAZY_SMP = "lazy_smp"               # Every worker searches all moves through a shared table, every other one a depth ahead
+
+# Score and first move of every completed iteration by depth, and the nodes searched
+WorkerResult = Tuple[Dict[int, Tuple[float, int]], int]
+
+# Moves played from the start position to reach the benchmark positions
+BENCHMARK_POSITIONS: Dict[str, Tuple[str, ...]] = {
+    "start": (),
+    "italian": ("e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "f8c5", "c2c3", "g8f6", "d2d4", "e5d4"),
+    "queens_gambit": ("d2d4", "d7d5", "c2c4", "e7e6", "b1c3", "g8f6", "c1g5", "f8e7", "e2e3", "e8g8"),
+    "sicilian": ("e2e4", "c7c5", "g1f3", "d7d6", "d2d4", "c5d4", "f3d4", "g8f6", "b1c3", "a7a6"),
+}
+
+
+# The shared table a worker process is attached to, by its name
+_worker_tables: Dict[str, SharedTranspositionTable] = {}
+
+
+def _attach_shared_table(name: str) -> SharedTranspositionTable:
+    """Attaches a worker process to a shared table, once, detaching it from the table of an earlier search."""
+
+    if name not in _worker_tables:
+        for old_table in _worker_tables.values():
+            old_table.close()
+        _worker_tables.clear()
+        _worker_tables[name] = SharedTranspositionTable(name=name)
+
+    return _worker_tables[name]
+
+
+def _search_in_worker(state: bytes, root_moves: Optional[List[int]], start_depth: int, max_depth: int,
+                      time_limit: Optional[float], max_nodes: Optional[int], use_positional_scoring: bool,
+                      seed: int, table_name: Optional[str] = None) -> WorkerResult:
+    """
+    Searches a packed position in a worker process, only the given root moves if there are any, with the shared
+    transposition table of a name if there is one.
+    """
+
+    random.seed(seed)
+    position = BitboardPosition.unpack(state)
+    valid_moves = position.get_valid_moves()
+    if root_moves is not None:
+        valid_moves = root_moves
+
+    transposition_table = _attach_shared_table(table_name) if table_name is not None else None
+    finder = NegamaxMoveFinder(position, valid_moves, max_depth, time_limit, max_nodes, use_positional_scoring,
+                               transposition_table=transposition_table, start_depth=start_depth)
+    finder.find_move()
+
+    iterations = {depth: (score, variation[0]) for depth, (score, variation) in finder.iterations.items() if variation}
+    return iterations, finder.nodes_searched + finder.quiescence_nodes_searched
+
+
+def to_bitboard_position(position: Position[MoveT]) -> BitboardPosition:
+    """Gets a bitboard position of a Game or a BitboardPosition to pack for the workers."""
+
+    if isinstance(position, BitboardPosition):
+        return position
+    if isinstance(position, Game):
+        return BitboardPosition.from_game(position)
+
+    raise TypeError(f"Cannot search a {type(position).__name__} in parallel")
+
+
+class ParallelMoveFinder(MoveFinder[MoveT]):
+    """
+    Class represents a move finder that searches with several processes.
+
+    With root splitting the root moves are dealt out to the workers, each searches its share to the same depths with
+    a table of its own and the best move of the deepest depth every worker completed wins. With Lazy SMP every worker
+    searches all the root moves, every other worker starting a depth deeper and each one breaking ties differently.
+    The workers share a transposition table in shared memory, so each one skips or orders first what the others
+    have already searched, and the deepest completed search wins.
+
+    An executor can be passed in to reuse its worker processes between moves, otherwise a pool is started for every
+    search. Likewise a shared table can be passed in to keep it between moves, otherwise Lazy SMP creates one for
+    every search. best_score is from the point of view of the side to move.
+    """
+
+    def __init__(self, game: Position[MoveT], valid_moves: List[MoveT], max_depth: int = MAX_SEARCH_DEPTH,
+                 time_limit: Optional[float] = SEARCH_TIME_LIMIT, max_nodes: Optional[int] = None,
+                 use_positional_scoring: bool = True, workers: int = PARALLEL_SEARCH_WORKERS,
+                 mode: str = ROOT_SPLITTING, executor: Optional[Executor] = None,
+                 transposition_table: Optional[SharedTranspositionTable] = None):
+        if mode not in (ROOT_SPLITTING, LAZY_SMP):
+            raise ValueError(f"Unknown parallel search mode: {mode}")
+
+        self.game = game
+        self.valid_moves = valid_moves
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.use_positional_scoring = use_positional_scoring
+        self.workers = workers
+        self.mode = mode
+        self.executor = executor
+        self.transposition_table = transposition_table
+
+        self.nodes_searched = 0
+        self.depth_reached = 0
+        self.best_score: Optional[float] = None
+
+    def find_move(self) -> Optional[MoveT]:
+        """Returns the best move found by the workers."""
+
+        if not self.valid_moves:
+            return None
+
+        position = to_bitboard_position(self.game)
+        state = position.pack()
+        bitboard_moves = position.get_valid_moves()
+
+        jobs: List[Tuple[Optional[List[int]], int]] = []    # Root moves and start depth of every worker
+        if self.mode == ROOT_SPLITTING:
+            shares = [bitboard_moves[worker::self.workers] for worker in range(self.workers)]
+            jobs = [(share, 1) for share in shares if share]
+        else:
+            jobs = [(None, 1 + worker % 2) for worker in range(self.workers)]
+
+        # Without a node budget for each worker the search would not be repeatable
+        max_nodes = self.max_nodes // len(jobs) if self.max_nodes is not None else None
+
+        transposition_table = self.transposition_table
+        if transposition_table is None and self.mode == LAZY_SMP:
+            transposition_table = SharedTranspositionTable()
+        table_name = transposition_table.name if self.mode == LAZY_SMP and transposition_table is not None else None
+
+        executor = self.executor or ProcessPoolExecutor(self.workers)
+        try:
+            futures = [executor.submit(_search_in_worker, state, root_moves, start_depth, self.max_depth,
+                                       self.time_limit, max_nodes, self.use_positional_scoring, worker, table_name)
+                       for worker, (root_moves, start_depth) in enumerate(jobs)]
+            results = [future.result() for future in futures]
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+            if transposition_table is not None and transposition_table is not self.transposition_table:
+                transposition_table.close()
+
+        self.nodes_searched = sum(nodes for _, nodes in results)
+        completed = [iterations for iterations, _ in results if iterations]
+        if not completed:
+            return self.valid_moves[0]
+
+        if self.mode == ROOT_SPLITTING:
+            # Scores of different depths are not comparable, so the deepest depth all the workers completed is used
+            self.depth_reached = min(max(iterations) for iterations in completed)
+            self.best_score, best_move = max(iterations[self.depth_reached] for iterations in completed)
+        else:
+            self.depth_reached = max(max(iterations) for iterations in completed)
+            self.best_score, best_move = next(iterations[self.depth_reached] for iterations in completed
+                                              if self.depth_reached in iterations)
+
+        return self._to_own_move(position, best_move)
+
+    def _to_own_move(self, position: BitboardPosition, bitboard_move: int) -> MoveT:
+        """Finds the valid move of the searched position that makes the same move as a bitboard move."""
+
+        from_square, to_square, _, _, promotion = position.move_details(bitboard_move)
+        same_squares = [move for move in self.valid_moves if self.game.move_details(move)[:2] == (from_square, to_square)]
+
+        for move in same_squares:
+            if self.game.move_details(move)[4] & TYPE_MASK == promotion & TYPE_MASK:
+                return move
+
+        return same_squares[0]
+
+
+def measure_scaling(worker_counts: Sequence[int] = (1, 2, 4), depth: int = 4, mode: str = ROOT_SPLITTING,
+                    positions: Optional[Dict[str, Tuple[str, ...]]] = None) -> Dict[int, Tuple[float, float, float]]:
+    """
+    Times searches of the benchmark positions to a fixed depth with different numbers of workers.
+
+    Returns the total time, the speedup over the first worker count and the efficiency (speedup per worker,
+    relative to the first worker count) of every worker count.
+    """
+
+    times: Dict[int, float] = {}
+    for workers in worker_counts:
+        with ProcessPoolExecutor(workers) as executor:
+            times[workers] = 0.0
+            for moves in (positions or BENCHMARK_POSITIONS).values():
+                position = BitboardPosition()
+                for name in moves:
+                    position.make_move(next(move for move in position.get_valid_moves() if move_name(move) == name))
+
+                finder = ParallelMoveFinder(position, position.get_valid_moves(), depth, None, workers=workers,
+                                            mode=mode, executor=executor)
+                start = time.perf_counter()
+                finder.find_move()
+                times[workers] += time.perf_counter() - start
+
+    base_workers = worker_counts[0]
+    scaling = {}
+    for workers, seconds in times.items():
+        speedup = times[base_workers] / seconds
+        scaling[workers] = (seconds, speedup, speedup * base_workers / workers)
+
+    return scaling
+
+
+def main():
+    for mode in (ROOT_SPLITTING, LAZY_SMP):
+        print(mode)
+        for workers, (seconds, speedup, efficiency) in measure_scaling(mode=mode).items():
+            print(f"  {workers} workers: {seconds:.2f}s, speedup {speedup:.2f}, efficiency {efficiency:.0%}")
+
+
+if __name__ == '__main__':
+    main()
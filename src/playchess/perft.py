@@ -0,0 +1,160 @@
+"""
+Perft, the count of all the move sequences of a given length from a position, to verify and time move generation.
+
+Run this module to count the standard perft positions and check the counts against the known ones:
+
+    python -m playchess.perft [--engine game|bitboard] [--depth N] [--positions start kiwipete ...] [--json]
+
+It exits with status 1 if a count is wrong.
+"""
+
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from playchess.bitboard import BitboardPosition
+from playchess.board import SQUARE_NAMES
+from playchess.game import Game
+from playchess.piece import TYPE_MASK
+from playchess.position import Position
+
+
+# Standard perft positions: FEN, known node counts from depth 1 and the depth counted to by default
+PERFT_POSITIONS: Dict[str, Tuple[str, Tuple[int, ...], int]] = {
+    "start": ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+              (20, 400, 8902, 197281, 4865609), 4),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 (48, 2039, 97862, 4085603), 3),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+                  (14, 191, 2812, 43238, 674624), 4),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  (6, 264, 9467, 422333), 3),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+                  (44, 1486, 62379, 2103487), 3),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                  (46, 2079, 89890, 3894594), 3),
+}
+
+ENGINES: Tuple[str, ...] = ("game", "bitboard")
+
+
+def create_position(name: str, engine: str = "game") -> Position[Any]:
+    """Sets up a standard perft position for the Game or the BitboardPosition engine."""
+
+    game = Game.from_fen(PERFT_POSITIONS[name][0])
+    if engine == "bitboard":
+        return BitboardPosition.from_game(game)
+
+    return game
+
+
+def perft(position: Position[Any], depth: int) -> int:
+    """Counts the move sequences of a given length from a position, the position is left as it was."""
+
+    if depth == 0:
+        return 1
+
+    valid_moves = position.get_valid_moves()
+    if depth == 1:
+        return len(valid_moves)
+
+    nodes = 0
+    for move in valid_moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.undo_move()
+
+    return nodes
+
+
+def coordinate_name(position: Position[Any], move: Any) -> str:
+    """Gets the coordinate name of a valid move of a position, e.g. e2e4 or e7e8q."""
+
+    from_square, to_square, _, _, promotion = position.move_details(move)
+    name = SQUARE_NAMES[divmod(from_square, 8)] + SQUARE_NAMES[divmod(to_square, 8)]
+    if promotion:
+        name += " pnbrqk"[promotion & TYPE_MASK]
+
+    return name
+
+
+def divide(position: Position[Any], depth: int) -> Dict[str, int]:
+    """Counts the move sequences of a given length from a position by their first move, to narrow down a wrong count."""
+
+    counts = {}
+    for move in position.get_valid_moves():
+        name = coordinate_name(position, move)
+        position.make_move(move)
+        counts[name] = perft(position, depth - 1)
+        position.undo_move()
+
+    return counts
+
+
+def run_suite(names: Sequence[str], engine: str = "game", depth: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Counts the perft positions to their default or a given depth and times them.
+
+    Every result has the position name, depth, nodes counted, expected nodes (None past the known counts), whether
+    they match, the seconds taken and the nodes per second.
+    """
+
+    results = []
+    for name in names:
+        _, expected_counts, default_depth = PERFT_POSITIONS[name]
+        position_depth = depth if depth is not None else default_depth
+        position = create_position(name, engine)
+
+        start = time.perf_counter()
+        nodes = perft(position, position_depth)
+        seconds = time.perf_counter() - start
+
+        expected = expected_counts[position_depth - 1] if 0 < position_depth <= len(expected_counts) else None
+        results.append({"position": name, "engine": engine, "depth": position_depth, "nodes": nodes,
+                        "expected": expected, "ok": expected is None or nodes == expected,
+                        "seconds": round(seconds, 3), "nps": round(nodes / seconds) if seconds else 0})
+
+    return results
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Counts the standard perft positions and checks the counts.")
+    parser.add_argument("--engine", choices=ENGINES, default="game", help="move generator to count with")
+    parser.add_argument("--depth", type=int, help="depth to count all positions to, instead of their default depth")
+    parser.add_argument("--positions", nargs="+", choices=list(PERFT_POSITIONS), default=list(PERFT_POSITIONS),
+                        help="positions to count")
+    parser.add_argument("--divide", action="store_true", help="print the count of every first move")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    options = parser.parse_args(args)
+
+    if options.divide:
+        for name in options.positions:
+            position = create_position(name, options.engine)
+            position_depth = options.depth if options.depth is not None else PERFT_POSITIONS[name][2]
+            counts = divide(position, position_depth)
+            if options.json:
+                print(json.dumps({"position": name, "depth": position_depth, "moves": counts}))
+            else:
+                print(f"{name} depth {position_depth}")
+                for move, nodes in sorted(counts.items()):
+                    print(f"  {move}: {nodes}")
+                print(f"  total: {sum(counts.values())}")
+        return 0
+
+    results = run_suite(options.positions, options.engine, options.depth)
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "ok" if result["ok"] else f"FAILED, expected {result['expected']}"
+            print(f"{result['position']:<10} depth {result['depth']}: {result['nodes']:>9} nodes "
+                  f"in {result['seconds']:.2f}s, {result['nps']} nps, {status}")
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Reading and writing games in PGN, the Portable Game Notation, with moves in SAN (standard algebraic notation).
+
+read_games streams the games of a PGN file one at a time, so an archive of any size is read with the memory of a
+single game. Reading only splits a game into its tags and SAN moves, which keeps reading I/O bound. The moves are
+checked against the rules and resolved to the valid moves of a Game only when PgnGame.to_game is called.
+"""
+
+
+import re
+from copy import deepcopy
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from playchess.board import Board, SQUARE_NAMES
+from playchess.game import Game
+from playchess.move import Move
+from playchess.piece import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, TYPE_MASK
+
+
+# FEN of the standard start position, games starting elsewhere carry it in the SetUp and FEN tags
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Tags every exported game has, in the order they are written
+SEVEN_TAG_ROSTER: Dict[str, str] = {"Event": "?", "Site": "?", "Date": "????.??.??", "Round": "?", "White": "?",
+                                    "Black": "?", "Result": "*"}
+
+MAX_LINE_LENGTH = 80    # Movetext lines are wrapped to fit
+
+# Piece types of the SAN piece letters
+SAN_PIECE_TYPES: Dict[str, int] = {"P": PAWN, "N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN, "K": KING}
+
+_TAG_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+
+# Comments, annotation glyphs, variations without variations inside, moves and the result of the movetext
+_COMMENT_PATTERN = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+")
+_VARIATION_PATTERN = re.compile(r"\([^()]*\)")
+_MOVE_PATTERN = re.compile(r"[A-Za-z][^\s.{}();$]*|0-0(?:-0)?")
+_RESULT_PATTERN = re.compile(r"(1-0|0-1|1/2-1/2|\*)\s*$")
+
+_SAN_PATTERN = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?")
+
+
+class PgnGame:
+    """
+    Class represents a game read from PGN: its tags, its moves in SAN and its result.
+
+    Comments, variations and annotation glyphs are dropped, the moves are the main line only.
+    """
+
+    __slots__ = ("tags", "moves", "result")
+
+    def __init__(self, tags: Dict[str, str], moves: List[str], result: str):
+        self.tags = tags
+        self.moves = moves
+        self.result = result
+
+    def start_game(self) -> Game:
+        """Sets up a game in the start position of the PGN game, from its FEN tag if it has one."""
+
+        fen = self.tags.get("FEN")
+        return Game.from_fen(fen) if fen else Game(Board())
+
+    def to_game(self) -> Game:
+        """
+        Replays the moves into a game, raises ValueError on the first move that is not valid.
+
+        The result of the PGN game is kept as the result of the game, so writing it again keeps e.g. a resignation.
+        """
+
+        game = self.start_game()
+        for ply, san in enumerate(self.moves, 1):
+            try:
+                game.make_move(parse_san(game, san))
+            except ValueError as error:
+                raise ValueError(f"{error} at ply {ply} of {self.tags.get('White', '?')} - "
+                                 f"{self.tags.get('Black', '?')}") from None
+        if self.result != "*":
+            game.result = self.result
+
+        return game
+
+
+def _parse_movetext(tags: Dict[str, str], movetext: str) -> PgnGame:
+    """Picks the main line moves and the result out of the movetext of a game."""
+
+    # Whole text substitutions rather than a token by token scan, most of the time goes into reading the movetext
+    if "{" in movetext or ";" in movetext or "$" in movetext:
+        movetext = _COMMENT_PATTERN.sub(" ", movetext)
+    while "(" in movetext:
+        movetext, variations = _VARIATION_PATTERN.subn(" ", movetext)
+        if not variations:
+            movetext = movetext.replace("(", " ")
+
+    result = _RESULT_PATTERN.search(movetext)
+    return PgnGame(tags, _MOVE_PATTERN.findall(movetext), result.group(1) if result else tags.get("Result", "*"))
+
+
+def _unescape_tag_value(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value) if "\\" in value else value
+
+
+def read_games(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """
+    Reads the games of PGN text one at a time, e.g. from an open file.
+
+    A game ends where the tags of the next game start or the text ends, only the lines of the current game are held.
+    """
+
+    tags: Dict[str, str] = {}
+    movetext: List[str] = []
+    for line in lines:
+        if line.startswith("["):
+            if movetext:
+                yield _parse_movetext(tags, "".join(movetext))
+                tags, movetext = {}, []
+
+            match = _TAG_PATTERN.match(line)
+            if match:
+                tags[match.group(1)] = _unescape_tag_value(match.group(2))
+        elif not line.startswith("%") and (movetext or not line.isspace()):
+            movetext.append(line)
+
+    if tags or movetext:
+        yield _parse_movetext(tags, "".join(movetext))
+
+
+def read_pgn(path: str) -> Iterator[PgnGame]:
+    """Reads the games of a PGN file one at a time."""
+
+    with open(path, encoding="utf-8", errors="replace") as pgn_file:
+        yield from read_games(pgn_file)
+
+
+def parse_san(game: Game, san: str, valid_moves: Optional[List[Move]] = None) -> Move:
+    """Finds the valid move of a game written by a SAN move, e.g. Nbd7, exd5, e8=Q+ or O-O."""
+
+    if valid_moves is None:
+        valid_moves = game.get_valid_moves()
+
+    text = san.rstrip("+#!?")
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        to_col = 6 if len(text) == 3 else 2
+        for move in valid_moves:
+            if move.is_castle and move.to_col == to_col:
+                return move
+        raise ValueError(f"Castling {san} is not valid")
+
+    match = _SAN_PATTERN.fullmatch(text)
+    if match is None:
+        raise ValueError(f"Invalid SAN move {san!r}")
+
+    piece_letter, from_file, from_rank, to_name, promotion_letter = match.groups()
+    piece_type = SAN_PIECE_TYPES[piece_letter or "P"]
+    to_square = (8 - int(to_name[1]), ord(to_name[0]) - ord("a"))
+    from_col = ord(from_file) - ord("a") if from_file else None
+    from_row = 8 - int(from_rank) if from_rank else None
+    promotion_type = SAN_PIECE_TYPES[promotion_letter] if promotion_letter else 0
+
+    candidates = [move for move in valid_moves
+                  if move.to_square == to_square and move.piece_moved.code & TYPE_MASK == piece_type
+                  and (from_col is None or move.from_col == from_col) and (from_row is None or move.from_row == from_row)
+                  and move.promotion_piece.code & TYPE_MASK == promotion_type]
+    if len(candidates) != 1:
+        raise ValueError(f"SAN move {san} is {'ambiguous' if candidates else 'not valid'}")
+
+    return candidates[0]
+
+
+def move_san(game: Game, move: Move, valid_moves: Optional[List[Move]] = None) -> str:
+    """Gets the SAN of a valid move of a game, the game is left as it was."""
+
+    if valid_moves is None:
+        valid_moves = game.get_valid_moves()
+
+    piece = move.piece_moved
+    if move.is_castle:
+        san = "O-O" if move.to_col == 6 else "O-O-O"
+    elif piece.is_pawn():
+        san = SQUARE_NAMES[move.from_square][0] + "x" if move.piece_captured else ""
+        san += SQUARE_NAMES[move.to_square] + move.promotion_name
+    else:
+        san = piece.value[1]
+        rivals = [other.from_square for other in valid_moves
+                  if other.piece_moved is piece and other.to_square == move.to_square and other.from_square != move.from_square]
+        if rivals:
+            from_name = SQUARE_NAMES[move.from_square]
+            if all(col != move.from_col for _, col in rivals):
+                san += from_name[0]
+            elif all(row != move.from_row for row, _ in rivals):
+                san += from_name[1]
+            else:
+                san += from_name
+        san += ("x" if move.piece_captured else "") + SQUARE_NAMES[move.to_square]
+
+    # Looking ahead for mate sets the mate flags for the position after the move, they are put back after
+    check_mate, stale_mate = game.check_mate, game.stale_mate
+    game.make_move(move)
+    if game.is_king_checked():
+        san += "#" if not game.get_valid_moves() else "+"
+    game.undo_move()
+    game.check_mate, game.stale_mate = check_mate, stale_mate
+
+    return san
+
+
+def _start_position(game: Game) -> Game:
+    """Gets a copy of a game taken back to the position before its first move."""
+
+    start = deepcopy(game)
+    for _ in game.move_log:
+        start.undo_move()
+
+    return start
+
+
+def san_moves(game: Game) -> List[str]:
+    """Gets the SAN of every move in the move log of a game."""
+
+    replay = _start_position(game)
+    moves = []
+    for move in game.move_log:
+        moves.append(move_san(replay, move))
+        replay.make_move(move)
+
+    return moves
+
+
+def game_result(game: Game) -> str:
+    """
+    Gets the PGN result of a game from its final position, or the result it was given if the game did not end on the
+    board. The result is * while the game is still being played.
+    """
+
+    # The mate flags are only set for the position valid moves were last generated for, they are put back after
+    check_mate, stale_mate = game.check_mate, game.stale_mate
+    game_over = not game.get_valid_moves()
+    king_checked = game.is_king_checked()
+    game.check_mate, game.stale_mate = check_mate, stale_mate
+
+    if game_over and king_checked:
+        return "0-1" if game.turn.is_white() else "1-0"
+    if game_over:
+        return "1/2-1/2"
+
+    return game.result or "*"
+
+
+def _escape_tag_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_pgn(game: Game, tags: Optional[Dict[str, str]] = None) -> str:
+    """
+    Writes a game as PGN, with the moves of its move log in SAN.
+
+    The seven tag roster is filled in with unknowns where no tag is given, and the result is taken from the game with
+    game_result if it has no Result tag. A game that did not start in the start position gets SetUp and FEN tags.
+    """
+
+    start = _start_position(game)
+    all_tags = {**SEVEN_TAG_ROSTER, "Result": game_result(game), **(tags or {})}
+    start_fen = start.to_fen()
+    if start_fen != START_FEN:
+        all_tags.update({"SetUp": "1", "FEN": start_fen})
+
+    lines = [f'[{name} "{_escape_tag_value(value)}"]' for name, value in all_tags.items()]
+
+    tokens = []
+    for ply, move in enumerate(game.move_log):
+        if start.turn.is_white():
+            tokens.append(f"{start.fullmove_number}.")
+        elif ply == 0:
+            tokens.append(f"{start.fullmove_number}...")
+        tokens.append(move_san(start, move))
+        start.make_move(move)
+    tokens.append(all_tags["Result"])
+
+    movetext = ""
+    for token in tokens:
+        if movetext and len(movetext) + 1 + len(token) > MAX_LINE_LENGTH:
+            lines.append(movetext)
+            movetext = token
+        else:
+            movetext = f"{movetext} {token}" if movetext else token
+    lines.append(movetext)
+
+    return "\n".join(lines[:len(all_tags)] + [""] + lines[len(all_tags):]) + "\n"
+
+
+def write_games(games: Iterable[Game], pgn_file: TextIO) -> None:
+    """Writes games to a PGN file, one after another."""
+
+    for number, game in enumerate(games):
+        if number:
+            pgn_file.write("\n")
+        pgn_file.write(write_pgn(game))
@@ -1,52 +1,92 @@
 from enum import Enum, unique
+from typing import Dict
+
+
+# Integer piece codes, a colour bit combined with a piece type
+EMPTY = 0
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+TYPE_MASK = 7
+WHITE = 8
+BLACK = 16
+COLOUR_MASK = WHITE | BLACK
+OFFBOARD = 32   # Sentinel for the padding squares around the board, carries no colour bits
 
 
 @unique
 class Piece(Enum):
-    """Class to represent a piece in chess."""
+    """
+    Class to represent a piece in chess.
+
+    The value of a piece is its short name (e.g. "wp") used for images and notation, and every piece also carries
+    its integer code so the colour and type predicates are single bit tests.
+    """
+
+    WHITE_ROOK = ("wR", WHITE | ROOK)
+    WHITE_KNIGHT = ("wN", WHITE | KNIGHT)
+    WHITE_BISHOP = ("wB", WHITE | BISHOP)
+    WHITE_QUEEN = ("wQ", WHITE | QUEEN)
+    WHITE_KING = ("wK", WHITE | KING)
+    WHITE_PAWN = ("wp", WHITE | PAWN)
+
+    BLACK_ROOK = ("bR", BLACK | ROOK)
+    BLACK_KNIGHT = ("bN", BLACK | KNIGHT)
+    BLACK_BISHOP = ("bB", BLACK | BISHOP)
+    BLACK_QUEEN = ("bQ", BLACK | QUEEN)
+    BLACK_KING = ("bK", BLACK | KING)
+    BLACK_PAWN = ("bp", BLACK | PAWN)
 
-    WHITE_ROOK = "wR"
-    WHITE_KNIGHT = "wN"
-    WHITE_BISHOP = "wB"
-    WHITE_QUEEN = "wQ"
-    WHITE_KING = "wK"
-    WHITE_PAWN = "wp"
+    NONE = ("None", EMPTY)
 
-    BLACK_ROOK = "bR"
-    BLACK_KNIGHT = "bN"
-    BLACK_BISHOP = "bB"
-    BLACK_QUEEN = "bQ"
-    BLACK_KING = "bK"
-    BLACK_PAWN = "bp"
+    def __new__(cls, value: str, code: int) -> "Piece":
+        piece = object.__new__(cls)
+        piece._value_ = value
+        return piece
 
-    NONE = "None"
+    def __init__(self, value: str, code: int):
+        self.code: int = code
 
     def is_white(self):
-        return "WHITE_" in self.name
+        return (self.code & WHITE) != 0
 
     def is_black(self):
-        return "BLACK_" in self.name
+        return (self.code & BLACK) != 0
 
     def is_rook(self):
-        return "ROOK" in self.name
+        return (self.code & TYPE_MASK) == ROOK
 
     def is_knight(self):
-        return "KNIGHT" in self.name
+        return (self.code & TYPE_MASK) == KNIGHT
 
     def is_bishop(self):
-        return "BISHOP" in self.name
+        return (self.code & TYPE_MASK) == BISHOP
 
     def is_queen(self):
-        return "QUEEN" in self.name
+        return (self.code & TYPE_MASK) == QUEEN
 
     def is_king(self):
-        return "KING" in self.name
+        return (self.code & TYPE_MASK) == KING
 
     def is_pawn(self):
-        return "PAWN" in self.name
+        return (self.code & TYPE_MASK) == PAWN
 
     def is_none(self):
-        return self.value == "None"
+        return self.code == EMPTY
 
     def __bool__(self):
-        return self.value != "None"
+        return self.code != EMPTY
+
+
+PIECE_CODES: Dict[Piece, int] = {piece: piece.code for piece in Piece}
+
+CODE_PIECES: Dict[int, Piece] = {piece.code: piece for piece in Piece}
+
+# FEN letters of the piece codes, upper case for white and lower case for black
+CODE_FEN_LETTERS: Dict[int, str] = {piece.code: piece.value[1].upper() if piece.is_white() else piece.value[1].lower()
+                                    for piece in Piece if piece}
+
+FEN_LETTER_CODES: Dict[str, int] = {letter: code for code, letter in CODE_FEN_LETTERS.items()}
@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Generic, Iterator, List, Tuple, TypeVar
+
+from playchess.piece import Piece
+from playchess.turn import Turn
+
+
+MoveT = TypeVar("MoveT")
+
+
+class Position(ABC, Generic[MoveT]):
+    """
+    Class represents a searchable chess position.
+
+    This is the common interface the move finders and the scorer run on, it is implemented by the list based
+    Game and the BitboardPosition engine. Moves are opaque to the searchers, they are only passed back to the
+    position that generated them.
+    """
+
+    turn: Turn
+    check_mate: bool
+    stale_mate: bool
+    position_key: int   # Zobrist key of the position
+    material_score: int     # Sums of the scorer tables over all pieces, white scores positive
+    positional_score: int
+
+    @abstractmethod
+    def get_valid_moves(self) -> List[MoveT]:
+        """Generates all the valid moves in a position and updates the check mate and stale mate flags."""
+
+    @abstractmethod
+    def make_move(self, move: MoveT) -> None:
+        """Makes a chess move."""
+
+    @abstractmethod
+    def undo_move(self) -> None:
+        """Undo a last made move."""
+
+    @abstractmethod
+    def is_king_checked(self) -> bool:
+        """Checks if the king of the side to move is under check."""
+
+    @abstractmethod
+    def move_details(self, move: MoveT) -> Tuple[int, int, int, int, int]:
+        """
+        Gets the from and to squares (row * 8 + col) of a move of the position and the codes of the piece moved,
+        the piece captured and the piece promoted to, EMPTY if there is none.
+        """
+
+    @abstractmethod
+    def piece_squares(self) -> Iterator[Tuple[int, int, Piece]]:
+        """Yields the row, column and piece of every occupied square."""
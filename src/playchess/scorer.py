@@ -1,5 +1,7 @@
-from playchess.game import Game
-from playchess.piece import Piece
+from typing import Any, List, Tuple
+
+from playchess.piece import Piece, BLACK, KING
+from playchess.position import Position
 
 
 PIECE_SCORES = {Piece.WHITE_KING: 0, Piece.BLACK_KING: 0,
@@ -93,8 +95,27 @@ POSITIONAL_SCORES = {Piece.WHITE_KNIGHT: ((1, 1, 1, 1, 1, 1, 1, 1),
                                         (-8, -8, -8, -8, -8, -8, -8, -8))
                      }
 
+# The tables above flattened for incremental scoring, indexed by piece code and by piece code and square (row * 8 + col)
+MATERIAL_SCORES: List[int] = [0] * ((BLACK | KING) + 1)
+SQUARE_SCORES: List[List[int]] = [[0] * 64 for _ in range((BLACK | KING) + 1)]
+for _piece, _score in PIECE_SCORES.items():
+    MATERIAL_SCORES[_piece.code] = _score
+for _piece, _scores in POSITIONAL_SCORES.items():
+    SQUARE_SCORES[_piece.code] = [score for row in _scores for score in row]
+
+
+def count_scores(game: Position[Any]) -> Tuple[int, int]:
+    """Sums the material and the positional scores of all the pieces of a position from scratch."""
+
+    material_score, positional_score = 0, 0
+    for row_num, col_num, piece_ in game.piece_squares():
+        material_score += MATERIAL_SCORES[piece_.code]
+        positional_score += SQUARE_SCORES[piece_.code][row_num * 8 + col_num]
 
-def find_game_score(game: Game, use_positional_scoring: bool) -> float:
+    return material_score, positional_score
+
+
+def find_game_score(game: Position[Any], use_positional_scoring: bool) -> float:
     """Finds the score of a chess game based on the material."""
 
     if game.turn.is_white() and game.check_mate:
@@ -104,16 +125,8 @@ def find_game_score(game: Game, use_positional_scoring: bool) -> float:
     elif game.stale_mate:
         return STALEMATE_SCORE
 
-    score = 0.0
-    for row_num, row in enumerate(game.chess_board):
-        for col_num, piece_ in enumerate(row):
-            if piece_.is_none():
-                continue
-            positional_score_matrix = POSITIONAL_SCORES.get(piece_, None)
-            positional_score = 0.0
-            if positional_score_matrix and use_positional_scoring:
-                positional_score = positional_score_matrix[row_num][col_num]
-
-            score = score + float(PIECE_SCORES[piece_]) + (positional_score * 0.1)
+    # The positions keep their material and positional scores up to date as moves are made
+    if use_positional_scoring:
+        return game.material_score + game.positional_score * 0.1
 
-    return score
+    return float(game.material_score)
@@ -0,0 +1,282 @@
+"""
+Headless bot against bot matches and round robin tournaments, played in parallel worker processes.
+
+Games are played on a BitboardPosition without a window, pygame or frame pacing. Every pair of bots plays the same
+random openings with both colours, and the result of every game is appended to a JSON lines file as soon as it is
+played, so a long run can be followed or stopped at any point. Run this module to hold a tournament:
+
+    python -m playchess.tournament negamax:3 minmax_pruned:2 [--games 100] [--workers 4] [--output results.jsonl]
+                                   [--book book.bin]
+
+Bots are named by their AI_MOVE_FINDERS entry and depth, e.g. negamax:3 (depth 2 if it is left out). With an
+opening book, the bots play from the book after the random opening, every worker process maps the same book file.
+"""
+
+
+import argparse
+import json
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from playchess.bitboard import BitboardPosition, move_name
+from playchess.config import PARALLEL_SEARCH_WORKERS
+from playchess.move_finder import AI_MOVE_FINDERS, create_move_finder
+from playchess.piece import EMPTY, PAWN, KNIGHT, BISHOP, KING, TYPE_MASK
+from playchess.transposition_table import TranspositionTable
+
+
+DEFAULT_DEPTH = 2           # Depth of a bot named without one
+OPENING_PLIES = 4           # Random moves played before the bots take over, so repeated games differ
+MAX_GAME_PLIES = 400        # Games still going after this many moves are drawn
+FIFTY_MOVE_PLIES = 100      # Moves without a capture or pawn move after which a game is drawn
+
+# A bot: its AI_MOVE_FINDERS name and depth
+Bot = Tuple[str, int]
+
+# Result of a game: 1-0, 0-1 or 1/2-1/2, how it ended, the moves and the seconds each side spent
+GameRecord = Dict[str, Any]
+
+
+def parse_bot(name: str) -> Bot:
+    """Gets the bot of a name like negamax:3."""
+
+    ai, _, depth = name.partition(":")
+    if ai not in AI_MOVE_FINDERS:
+        raise ValueError(f"Unknown bot {ai!r}, choose one of {', '.join(AI_MOVE_FINDERS)}")
+
+    return ai, int(depth) if depth else DEFAULT_DEPTH
+
+
+def bot_name(bot: Bot) -> str:
+    return f"{bot[0]}:{bot[1]}"
+
+
+def _is_insufficient_material(position: BitboardPosition) -> bool:
+    """Whether neither side can mate: only kings, with at most one knight or bishop between them."""
+
+    minor_pieces = 0
+    for _, _, piece in position.piece_squares():
+        piece_type = piece.code & TYPE_MASK
+        if piece_type in (KNIGHT, BISHOP):
+            minor_pieces += 1
+        elif piece_type != KING:
+            return False
+
+    return minor_pieces <= 1
+
+
+def play_game(white: Bot, black: Bot, opening_seed: int, opening_plies: int = OPENING_PLIES,
+              max_plies: int = MAX_GAME_PLIES, book: Optional[str] = None) -> GameRecord:
+    """
+    Plays a game between two bots after a random opening from a seed, the same seed gives the same opening.
+
+    The game is drawn by stalemate, threefold repetition, the fifty move rule, insufficient material or reaching
+    the most moves. Each bot keeps its transposition table for the whole game.
+    """
+
+    position = BitboardPosition()
+    opening = random.Random(opening_seed)
+    bots = {True: white, False: black}
+    transposition_tables: Dict[bool, TranspositionTable[int]] = {True: TranspositionTable(), False: TranspositionTable()}
+    seconds = {True: 0.0, False: 0.0}
+    searched = {True: 0, False: 0}
+    moves: List[str] = []
+    repetitions = Counter([position.position_key])
+    quiet_plies = 0
+
+    result, reason = "1/2-1/2", "max plies"
+    valid_moves = position.get_valid_moves()
+    while valid_moves and len(moves) < max_plies:
+        white_to_move = position.turn.is_white()
+        if len(moves) < opening_plies:
+            move = opening.choice(valid_moves)
+        else:
+            ai, depth = bots[white_to_move]
+            start = time.perf_counter()
+            found_move = create_move_finder(ai, position, valid_moves, depth, book,
+                                            transposition_tables[white_to_move]).find_move()
+            seconds[white_to_move] += time.perf_counter() - start
+            searched[white_to_move] += 1
+            move = found_move if found_move is not None else random.choice(valid_moves)
+
+        _, _, moved, captured, _ = position.move_details(move)
+        quiet_plies = 0 if moved & TYPE_MASK == PAWN or captured != EMPTY else quiet_plies + 1
+        moves.append(move_name(move))
+        position.make_move(move)
+
+        # A checkmate or stalemate ends the game before any draw rule or the most moves can
+        valid_moves = position.get_valid_moves()
+        if not valid_moves:
+            break
+
+        repetitions[position.position_key] += 1
+        if repetitions[position.position_key] >= 3:
+            reason = "repetition"
+            break
+        if quiet_plies >= FIFTY_MOVE_PLIES:
+            reason = "fifty moves"
+            break
+        if captured != EMPTY and _is_insufficient_material(position):
+            reason = "insufficient material"
+            break
+
+    if not valid_moves:
+        if position.check_mate:
+            result, reason = ("0-1" if position.turn.is_white() else "1-0"), "checkmate"
+        else:
+            reason = "stalemate"
+
+    return {"white": bot_name(white), "black": bot_name(black), "result": result, "reason": reason,
+            "plies": len(moves), "white_seconds": seconds[True], "white_moves": searched[True],
+            "black_seconds": seconds[False], "black_moves": searched[False], "moves": " ".join(moves)}
+
+
+def schedule(bots: Sequence[Bot], games_per_pair: int, seed: int = 0) -> Iterator[Tuple[Bot, Bot, int]]:
+    """
+    Yields the white bot, black bot and opening seed of every game of a round robin.
+
+    The games of a pair come in twos that share an opening with the colours swapped, so neither bot is favoured by
+    the openings.
+    """
+
+    for pair_number, (first, second) in enumerate(combinations(bots, 2)):
+        for game_number in range(games_per_pair):
+            opening_seed = seed * 1_000_003 + pair_number * 10_007 + game_number // 2
+            yield (first, second, opening_seed) if game_number % 2 == 0 else (second, first, opening_seed)
+
+
+def elo_difference(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """
+    Estimates the Elo rating difference a score shows, and its 95% error margin.
+
+    A perfect or zero score has no finite estimate, the difference is then infinite.
+    """
+
+    games = wins + draws + losses
+    if not games:
+        return 0.0, math.inf
+
+    score = (wins + draws / 2) / games
+    if score in (0.0, 1.0):
+        return math.copysign(math.inf, score - 0.5), math.inf
+
+    def elo(fraction: float) -> float:
+        return -400 * math.log10(1 / fraction - 1)
+
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    deviation = 1.96 * math.sqrt(variance / games)
+    low, high = max(score - deviation, 1e-6), min(score + deviation, 1 - 1e-6)
+
+    return elo(score), (elo(high) - elo(low)) / 2
+
+
+class Standings:
+    """Class represents the wins, draws, losses and time per move of every bot, updated game by game."""
+
+    def __init__(self, bots: Sequence[Bot]):
+        self.results: Dict[str, List[int]] = {bot_name(bot): [0, 0, 0] for bot in bots}
+        self.seconds: Dict[str, float] = {bot_name(bot): 0.0 for bot in bots}
+        self.moves: Dict[str, int] = {bot_name(bot): 0 for bot in bots}
+        self.games_played = 0
+
+    def add(self, record: GameRecord) -> None:
+        """Counts the result of a game."""
+
+        white, black = record["white"], record["black"]
+        if record["result"] == "1-0":
+            self.results[white][0] += 1
+            self.results[black][2] += 1
+        elif record["result"] == "0-1":
+            self.results[white][2] += 1
+            self.results[black][0] += 1
+        else:
+            self.results[white][1] += 1
+            self.results[black][1] += 1
+
+        for colour in ("white", "black"):
+            self.seconds[record[colour]] += record[f"{colour}_seconds"]
+            self.moves[record[colour]] += record[f"{colour}_moves"]
+        self.games_played += 1
+
+    def table(self) -> List[Dict[str, Any]]:
+        """Gets every bot's wins, draws, losses, score, Elo estimate against the field and average seconds per move."""
+
+        rows = []
+        for name, (wins, draws, losses) in self.results.items():
+            elo, margin = elo_difference(wins, draws, losses)
+            games = wins + draws + losses
+            rows.append({"bot": name, "wins": wins, "draws": draws, "losses": losses,
+                         "score": (wins + draws / 2) / games if games else 0.0, "elo": elo, "elo_margin": margin,
+                         "seconds_per_move": self.seconds[name] / self.moves[name] if self.moves[name] else 0.0})
+
+        return sorted(rows, key=lambda row: row["score"], reverse=True)
+
+    def __str__(self):
+        lines = [f"after {self.games_played} games"]
+        for row in self.table():
+            lines.append(f"  {row['bot']:<18} +{row['wins']} ={row['draws']} -{row['losses']}  "
+                         f"score {row['score']:.3f}  elo {row['elo']:+.0f} +/- {row['elo_margin']:.0f}  "
+                         f"{row['seconds_per_move'] * 1000:.1f} ms/move")
+
+        return "\n".join(lines)
+
+
+def run_tournament(bots: Sequence[Bot], games_per_pair: int, workers: int = PARALLEL_SEARCH_WORKERS,
+                   output: Optional[str] = None, opening_plies: int = OPENING_PLIES, max_plies: int = MAX_GAME_PLIES,
+                   seed: int = 0, report_every: int = 10, book: Optional[str] = None) -> Standings:
+    """
+    Plays a round robin of the bots in worker processes, every pair playing a number of games.
+
+    Every game played is appended to the output JSON lines file right away and the standings are printed every few
+    games, in the order the games finish.
+    """
+
+    standings = Standings(bots)
+    output_file = open(output, "a") if output else None
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(play_game, white, black, opening_seed, opening_plies, max_plies, book)
+                       for white, black, opening_seed in schedule(bots, games_per_pair, seed)]
+
+            for future in as_completed(futures):
+                record = future.result()
+                standings.add(record)
+                if output_file:
+                    output_file.write(json.dumps(record) + "\n")
+                    output_file.flush()
+                if standings.games_played % report_every == 0 or standings.games_played == len(futures):
+                    print(standings, flush=True)
+    finally:
+        if output_file:
+            output_file.close()
+
+    return standings
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Plays a round robin tournament of bots without a window.")
+    parser.add_argument("bots", nargs="+", type=parse_bot, help="bots as name:depth, e.g. negamax:3")
+    parser.add_argument("--games", type=int, default=100, help="games every pair of bots plays")
+    parser.add_argument("--workers", type=int, default=PARALLEL_SEARCH_WORKERS, help="worker processes")
+    parser.add_argument("--output", help="JSON lines file every game is appended to")
+    parser.add_argument("--opening-plies", type=int, default=OPENING_PLIES, help="random moves to start games with")
+    parser.add_argument("--max-plies", type=int, default=MAX_GAME_PLIES, help="moves after which games are drawn")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the openings")
+    parser.add_argument("--report-every", type=int, default=10, help="games between printed standings")
+    parser.add_argument("--book", help="opening book the bots play from after the random opening")
+    options = parser.parse_args(args)
+
+    if len(set(options.bots)) != len(options.bots) or len(options.bots) < 2:
+        parser.error("at least two different bots are needed")
+
+    run_tournament(options.bots, options.games, options.workers, options.output, options.opening_plies,
+                   options.max_plies, options.seed, options.report_every, options.book)
+
+
+if __name__ == '__main__':
+    main()
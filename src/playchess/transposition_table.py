@@ -0,0 +1,221 @@
+import os
+import struct
+from enum import Enum, auto
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Generic, List, Optional
+
+from playchess.config import TRANSPOSITION_TABLE_SIZE_MB
+from playchess.position import MoveT
+
+
+# Memory of one stored entry, used to turn a memory budget into a size. Measured with tracemalloc over negamax
+# searches: about 220 bytes for a Game entry with its Move and 160 for a BitboardPosition entry, plus the 8 byte
+# slot that holds it. The budget is approximate, the key, score and move objects vary in size.
+ENTRY_SIZE_BYTES = 230
+
+
+class Bound(Enum):
+    """Class represents what a stored search score says about the true score of a position."""
+
+    EXACT = auto()
+    LOWER = auto()  # The search failed high, the true score is at least the stored score
+    UPPER = auto()  # The search failed low, the true score is at most the stored score
+
+
+class TranspositionEntry(Generic[MoveT]):
+    """Class represents the stored search result of a position."""
+
+    __slots__ = ("key", "depth", "score", "bound", "move")
+
+    def __init__(self, key: int, depth: int, score: float, bound: Bound, move: Optional[MoveT]):
+        self.key = key
+        self.depth = depth
+        self.score = score
+        self.bound = bound
+        self.move = move
+
+
+class TranspositionTable(Generic[MoveT]):
+    """
+    Class represents a fixed size transposition table keyed by position key.
+
+    Each bucket has two slots. The first keeps the deepest search of a position hashing to the bucket and the
+    second always takes the latest entry that could not go in the first, so shallow recent results are kept
+    without evicting expensive deep ones.
+
+    The table holds about size_mb megabytes once full. Entries stay valid from move to move, a bot keeps one table
+    for a whole game so each search starts from what the searches of the moves before found.
+    """
+
+    def __init__(self, size_mb: float = TRANSPOSITION_TABLE_SIZE_MB):
+        self.num_buckets = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_SIZE_BYTES))
+        self._slots: List[Optional[TranspositionEntry[MoveT]]] = [None] * (2 * self.num_buckets)
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0     # Misses where the bucket was holding other positions
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._slots if entry is not None)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of probes that found their position."""
+
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def probe(self, key: int) -> Optional[TranspositionEntry[MoveT]]:
+        """Returns the stored entry of a position if there is one."""
+
+        index = 2 * (key % self.num_buckets)
+        depth_preferred, always_replace = self._slots[index], self._slots[index + 1]
+
+        if depth_preferred is not None and depth_preferred.key == key:
+            self.hits += 1
+            return depth_preferred
+        if always_replace is not None and always_replace.key == key:
+            self.hits += 1
+            return always_replace
+
+        self.misses += 1
+        if depth_preferred is not None or always_replace is not None:
+            self.collisions += 1
+
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: Bound, move: Optional[MoveT]) -> None:
+        """Stores the search result of a position."""
+
+        index = 2 * (key % self.num_buckets)
+        depth_preferred = self._slots[index]
+        entry = TranspositionEntry(key, depth, score, bound, move)
+
+        if depth_preferred is None or depth_preferred.key == key or depth >= depth_preferred.depth:
+            self._slots[index] = entry
+        else:
+            self._slots[index + 1] = entry
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters."""
+
+        self._slots = [None] * (2 * self.num_buckets)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+
+# A shared entry is the key XORed with the other two words, the packed depth, bound and move, and the score bits
+_SHARED_ENTRY = struct.Struct("<3Q")
+_SCORE = struct.Struct("<d")
+_SCORE_BITS = struct.Struct("<Q")
+_BOUNDS = list(Bound)
+_USED_BIT = 1 << 63
+
+# Only on POSIX is shared memory tracked by the resource tracker of a process, which unlinks it when the process exits
+_TRACKS_SHARED_MEMORY = os.name == "posix"
+
+
+class SharedTranspositionTable(TranspositionTable[int]):
+    """
+    Class represents a transposition table of integer moves, e.g. of a BitboardPosition, in shared memory.
+
+    Searches in several processes share their results through it. The process that creates the table owns the
+    memory and frees it on close, the other processes attach to it by its name. Entries are written without locks,
+    the key is stored XORed with the rest of the entry, so an entry torn by two processes writing at once no longer
+    matches its key and reads as a miss. The replacement scheme is that of TranspositionTable, the counters are
+    those of the process.
+    """
+
+    def __init__(self, size_mb: float = TRANSPOSITION_TABLE_SIZE_MB, name: Optional[str] = None):
+        self.is_owner = name is None
+        if name is None:
+            num_buckets = max(1, int(size_mb * 1024 * 1024) // (2 * _SHARED_ENTRY.size))
+            self._memory = shared_memory.SharedMemory(create=True, size=2 * num_buckets * _SHARED_ENTRY.size)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            # Attaching tracks the memory as if it were created here, so a pool worker exiting would unlink it while
+            # the owner still uses it. Only the owner frees it.
+            if _TRACKS_SHARED_MEMORY:
+                resource_tracker.unregister(self._memory._name, "shared_memory")    # type: ignore[attr-defined]
+        assert self._memory.buf is not None
+        self._buffer: memoryview = self._memory.buf
+        if self.is_owner:
+            self._buffer[:] = bytes(self._memory.size)
+
+        self.name: str = self._memory.name
+        self.num_buckets = self._memory.size // (2 * _SHARED_ENTRY.size)
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def close(self) -> None:
+        """Detaches from the table, the owner frees its memory as well."""
+
+        self._memory.close()
+        if self.is_owner:
+            # A table attached in a process that shares this tracker has untracked the memory, unlink untracks it
+            if _TRACKS_SHARED_MEMORY:
+                resource_tracker.register(self._memory._name, "shared_memory")  # type: ignore[attr-defined]
+            self._memory.unlink()
+
+    def __enter__(self) -> "SharedTranspositionTable":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _read(self, slot: int) -> Optional[TranspositionEntry[int]]:
+        """Gets the entry in a slot, None if the slot is empty or torn."""
+
+        checked_key, data, score_bits = _SHARED_ENTRY.unpack_from(self._buffer, slot * _SHARED_ENTRY.size)
+        if not data & _USED_BIT:
+            return None
+
+        move = data & 0xFFFFFFFF
+        return TranspositionEntry(checked_key ^ data ^ score_bits, data >> 32 & 0xFFFF,
+                                  _SCORE.unpack(_SCORE_BITS.pack(score_bits))[0], _BOUNDS[data >> 48 & 3],
+                                  move - 1 if move else None)
+
+    def __len__(self) -> int:
+        return sum(1 for slot in range(2 * self.num_buckets) if self._read(slot) is not None)
+
+    def probe(self, key: int) -> Optional[TranspositionEntry[int]]:
+        """Returns the stored entry of a position if there is one."""
+
+        index = 2 * (key % self.num_buckets)
+        depth_preferred, always_replace = self._read(index), self._read(index + 1)
+
+        if depth_preferred is not None and depth_preferred.key == key:
+            self.hits += 1
+            return depth_preferred
+        if always_replace is not None and always_replace.key == key:
+            self.hits += 1
+            return always_replace
+
+        self.misses += 1
+        if depth_preferred is not None or always_replace is not None:
+            self.collisions += 1
+
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: Bound, move: Optional[int]) -> None:
+        """Stores the search result of a position."""
+
+        index = 2 * (key % self.num_buckets)
+        depth_preferred = self._read(index)
+        slot = index if depth_preferred is None or depth_preferred.key == key or depth >= depth_preferred.depth \
+            else index + 1
+
+        data = _USED_BIT | _BOUNDS.index(bound) << 48 | depth << 32 | (move + 1 if move is not None else 0)
+        score_bits = _SCORE_BITS.unpack(_SCORE.pack(score))[0]
+        _SHARED_ENTRY.pack_into(self._buffer, slot * _SHARED_ENTRY.size, key ^ data ^ score_bits, data, score_bits)
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters."""
+
+        self._buffer[:] = bytes(self._memory.size)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
@@ -0,0 +1,41 @@
+"""
+Zobrist keys to hash chess positions.
+
+A position key is the XOR of a key for every piece on its square, the side to move, the castling rights and the
+en-passant file. The keys come from a fixed seed, so the same position has the same key in every process and run.
+"""
+
+
+import random
+from typing import List
+
+from playchess._castling_rights import CastlingRights
+from playchess.piece import BLACK, EMPTY, KING
+
+
+_random = random.Random(0x5A0B215)
+
+# Indexed by piece code and square (row * 8 + col), the keys of an empty square are zero
+PIECE_SQUARE_KEYS: List[List[int]] = [[_random.getrandbits(64) for _ in range(64)] for _ in range((BLACK | KING) + 1)]
+PIECE_SQUARE_KEYS[EMPTY] = [0] * 64
+
+# XORed in when black is to move
+BLACK_TO_MOVE_KEY: int = _random.getrandbits(64)
+
+# Indexed by the castling rights bits: white king side 1, white queen side 2, black king side 4, black queen side 8
+_castling_right_keys = [_random.getrandbits(64) for _ in range(4)]
+CASTLING_KEYS: List[int] = [0] * 16
+for _rights in range(16):
+    for _bit in range(4):
+        if _rights >> _bit & 1:
+            CASTLING_KEYS[_rights] ^= _castling_right_keys[_bit]
+
+# Indexed by the file (column) of the en-passant square
+EN_PASSANT_KEYS: List[int] = [_random.getrandbits(64) for _ in range(8)]
+
+
+def castling_rights_bits(castling_rights: CastlingRights) -> int:
+    """Gets the castling rights bits used to index CASTLING_KEYS."""
+
+    return (castling_rights.white_king_side | castling_rights.white_queen_side << 1 |
+            castling_rights.black_king_side << 2 | castling_rights.black_queen_side << 3)
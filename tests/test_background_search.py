@@ -0,0 +1,144 @@
+import threading
+import time
+
+from playchess.background_search import BackgroundSearch
+from playchess.board import Board
+from playchess.game import Game
+from playchess.move_finder import MaterialMoveFinder, MinMaxMoveFinder, MoveFinder, create_move_finder
+from playchess.perft import coordinate_name
+
+
+def play(game, names):
+    for name in names:
+        game.make_move(next(move for move in game.get_valid_moves() if coordinate_name(game, move) == name))
+    return game
+
+
+class _WaitingMoveFinder(MoveFinder):
+    """Finds the first move once it is released or stopped."""
+
+    def __init__(self, valid_moves):
+        self.valid_moves = valid_moves
+        self.release = threading.Event()
+
+    def find_move(self):
+        self.release.wait(5)
+        return self.valid_moves[0]
+
+    def stop(self):
+        self.release.set()
+
+
+def start_search(game, create=lambda game, valid_moves: create_move_finder("random", game, valid_moves, 1, None)):
+    done = threading.Event()
+    search = BackgroundSearch(game, create, on_done=done.set)
+    return search, done
+
+
+def test_result_is_given_for_the_searched_position():
+    game = play(Game(Board()), ["e2e4"])
+    search, done = start_search(game)
+
+    assert done.wait(5) and search.is_done()
+    assert not search.is_stale(game)
+    assert search.result(game, game.get_valid_moves()) in game.get_valid_moves()
+
+
+def test_search_is_stale_after_undo():
+    game = play(Game(Board()), ["e2e4", "e7e5"])
+    search, done = start_search(game)
+    game.undo_move()
+
+    assert done.wait(5)
+    assert search.is_stale(game)
+    assert search.result(game, game.get_valid_moves()) is None
+
+    play(game, ["e7e5"])    # Back in the same position, after the search has been cancelled by the undo
+    assert not search.is_stale(game)
+
+
+def test_search_is_stale_after_reset():
+    game = play(Game(Board()), ["e2e4"])
+    search, done = start_search(game)
+    new_game = play(Game(Board()), ["e2e4"])
+
+    assert done.wait(5)
+    assert search.is_stale(new_game)
+    assert search.result(new_game, new_game.get_valid_moves()) is None
+
+
+def test_same_position_by_another_move_order_is_not_stale():
+    game = play(Game(Board()), ["g1f3", "g8f6", "b1c3"])
+    search, done = start_search(game)
+    for _ in range(3):
+        game.undo_move()
+    play(game, ["b1c3", "g8f6", "g1f3"])
+
+    assert done.wait(5)
+    assert not search.is_stale(game)
+    assert search.result(game, game.get_valid_moves()) in game.get_valid_moves()
+
+
+def test_no_result_while_searching():
+    game = Game(Board())
+    finders = []
+
+    def create(search_game, valid_moves):
+        finders.append(_WaitingMoveFinder(valid_moves))
+        return finders[0]
+
+    search, done = start_search(game, create)
+
+    assert not search.is_done()
+    assert search.result(game, game.get_valid_moves()) is None
+
+    finders[0].release.set()
+    assert done.wait(5)
+    assert search.result(game, game.get_valid_moves()) == game.get_valid_moves()[0]
+
+
+def test_searches_on_a_copy_of_the_game():
+    game = Game(Board())
+    search, done = start_search(game, lambda search_game, valid_moves: _WaitingMoveFinder(valid_moves))
+    play(game, ["e2e4"])
+    search.cancel()
+
+    assert done.wait(5)
+    assert search.is_stale(game)
+
+
+def test_cancel_stops_a_minmax_search_quickly():
+    game = Game(Board())
+    finders = []
+
+    def create(search_game, valid_moves):
+        finders.append(MinMaxMoveFinder(search_game, valid_moves, depth=5))
+        return finders[0]
+
+    search, done = start_search(game, create)
+    time.sleep(0.05)
+    start = time.perf_counter()
+    search.cancel()
+
+    assert done.wait(2)
+    assert time.perf_counter() - start < 1.0
+    assert finders[0].aborted
+
+
+def test_stopped_minmax_leaves_the_game_as_it_was():
+    game = play(Game(Board()), ["e2e4"])
+    fen, key = game.to_fen(), game.position_key
+    finder = MinMaxMoveFinder(game, game.get_valid_moves(), depth=3)
+    finder.stop()
+    finder.find_move()
+
+    assert finder.aborted
+    assert (game.to_fen(), game.position_key) == (fen, key)
+
+
+def test_stopped_material_finder_scores_no_more_moves():
+    game = Game(Board())
+    finder = MaterialMoveFinder(game, game.get_valid_moves())
+    finder.stop()
+
+    assert finder.find_move() == finder.valid_moves[0]      # Only the first of the shuffled moves was scored
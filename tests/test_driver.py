@@ -0,0 +1,189 @@
+import sys
+
+import pytest
+
+import playchess
+from playchess.config import SQUARE_SIZE
+
+
+def test_play_without_pygame_asks_for_the_gui_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pygame", None)    # import pygame raises ImportError
+    monkeypatch.delitem(sys.modules, "playchess.driver", raising=False)
+
+    with pytest.raises(ImportError, match=r"pip install playchess\[gui\]"):
+        playchess.play()
+
+
+def test_engine_imports_without_pygame(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pygame", None)
+    for name in ("playchess.game", "playchess.bitboard", "playchess.move_finder", "playchess.pgn",
+                 "playchess.tournament", "playchess.opening_book"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    from playchess.tournament import play_game
+
+    assert play_game(("random", 1), ("random", 1), 61, opening_plies=49, max_plies=49)["reason"] == "checkmate"
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    """The driver module on the dummy video driver, with its display closed after the test."""
+
+    pygame = pytest.importorskip("pygame")
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    from playchess import driver
+
+    yield driver
+    pygame.display.quit()
+
+
+def click(pygame, name):
+    row, col = 8 - int(name[1]), ord(name[0]) - ord("a")
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                              pos=(col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2))
+
+
+def key(pygame, key_):
+    return pygame.event.Event(pygame.KEYDOWN, key=key_)
+
+
+class ScriptedEvents:
+    """
+    Feeds the game loop a batch of events an iteration, then waits for real events, a finished search posting its event.
+
+    The loop is sent pygame.QUIT when the script ends waiting, so a test never hangs.
+    """
+
+    def __init__(self, pygame, monkeypatch, batches):
+        self._pygame = pygame
+        self._batches = list(batches)
+        self._wait = pygame.event.wait
+        self._get = pygame.event.get
+        self._pending = None     # The rest of the batch a wait returned the first event of
+        self._clicks = []        # Mouse positions of the clicks fed, for pygame.mouse.get_pos
+        monkeypatch.setattr(pygame.event, "wait", self.wait)
+        monkeypatch.setattr(pygame.event, "get", self.get)
+        monkeypatch.setattr(pygame.mouse, "get_pos", lambda: self._clicks.pop(0))
+
+    def wait(self):
+        if self._batches:
+            event, *self._pending = self._next_batch() or [self._pygame.event.Event(self._pygame.NOEVENT)]
+            return event
+        event = self._wait(5000)
+        return event if event.type != self._pygame.NOEVENT else self._pygame.event.Event(self._pygame.QUIT)
+
+    def get(self):
+        if self._pending is not None:
+            events, self._pending = self._pending, None
+            return events
+        return self._next_batch() if self._batches else self._get()
+
+    def _next_batch(self):
+        batch = self._batches.pop(0)
+        self._clicks.extend(event.pos for event in batch if event.type == self._pygame.MOUSEBUTTONDOWN)
+        return batch
+
+
+@pytest.fixture
+def recorded(driver, monkeypatch):
+    """Move logs the renderer drew and the loop stats of the game loop."""
+
+    record = {"move_logs": [], "loop_stats": []}
+
+    class RecordedRenderer(driver.GameRenderer):
+        def draw(self, screen, game, square, valid_moves):
+            dirty_rects = super().draw(screen, game, square, valid_moves)
+            if dirty_rects:
+                record["move_logs"].append([move.from_square_name + move.to_square_name for move in game.move_log])
+            return dirty_rects
+
+    class RecordedLoopStats(driver.LoopStats):
+        def __init__(self):
+            super().__init__()
+            record["loop_stats"].append(self)
+
+    monkeypatch.setattr(driver, "GameRenderer", RecordedRenderer)
+    monkeypatch.setattr(driver, "LoopStats", RecordedLoopStats)
+    return record
+
+
+@pytest.mark.parametrize("event_driven", [True, False])
+def test_humans_move_undo_and_quit(driver, recorded, monkeypatch, capsys, event_driven):
+    monkeypatch.setattr(driver, "SHOW_FRAME_TIMES", True)
+    pygame = driver.pygame
+    ScriptedEvents(pygame, monkeypatch, [[click(pygame, "e2")], [click(pygame, "e4")],
+                                         [click(pygame, "e7"), click(pygame, "e5")], [key(pygame, pygame.K_u)],
+                                         [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=1)], [key(pygame, pygame.K_q)]])
+
+    with pytest.raises(SystemExit):
+        driver.play("human", "human", event_driven=event_driven, book=None)
+
+    assert recorded["move_logs"][0] == []
+    assert ["e2e4", "e7e5"] in recorded["move_logs"]
+    assert recorded["move_logs"][-1] == ["e2e4"]     # Undone
+
+    stats, = recorded["loop_stats"]
+    assert stats.iterations == 6
+    assert stats.frames_drawn == len(recorded["move_logs"])
+    assert stats.idle_seconds > 0    # Humans were to move the whole game
+    assert "Game loop: " in capsys.readouterr().out
+
+
+def test_bot_answers_through_the_search_done_event(driver, monkeypatch):
+    pygame = driver.pygame
+    ScriptedEvents(pygame, monkeypatch, [[click(pygame, "e2")], [click(pygame, "e4")]])
+    search_done = []
+    post_search_done = driver._post_search_done
+    monkeypatch.setattr(driver, "_post_search_done", lambda: (search_done.append(True), post_search_done()))
+
+    class QuitAfterTheBot(driver.GameRenderer):
+        def draw(self, screen, game, square, valid_moves):
+            if len(game.move_log) == 2:
+                pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return super().draw(screen, game, square, valid_moves)
+
+    monkeypatch.setattr(driver, "GameRenderer", QuitAfterTheBot)
+
+    with pytest.raises(SystemExit):
+        driver.play("human", "bot", ai="random", event_driven=True, book=None)
+
+    assert search_done == [True]
+
+
+def test_reset_clears_the_game(driver, recorded, monkeypatch):
+    pygame = driver.pygame
+    ScriptedEvents(pygame, monkeypatch, [[], [click(pygame, "e2"), click(pygame, "e4")], [key(pygame, pygame.K_r)],
+                                         [pygame.event.Event(pygame.WINDOWEXPOSED)], [pygame.event.Event(pygame.QUIT)]])
+
+    with pytest.raises(SystemExit):
+        driver.play("human", "human", event_driven=True, book=None)
+
+    assert recorded["move_logs"] == [[], ["e2e4"], [], []]
+
+
+def test_first_frame_is_drawn_before_waiting(driver, recorded, monkeypatch):
+    pygame = driver.pygame
+    events = ScriptedEvents(pygame, monkeypatch, [[], [pygame.event.Event(pygame.QUIT)]])
+    frames_at_wait = []
+
+    def wait():
+        frames_at_wait.append(len(recorded["move_logs"]))
+        return events.wait()
+
+    monkeypatch.setattr(pygame.event, "wait", wait)
+
+    with pytest.raises(SystemExit):
+        driver.play("human", "human", event_driven=True, book=None)
+
+    assert frames_at_wait == [1]
+
+
+def test_search_done_after_the_window_closed_is_dropped(driver):
+    pygame = driver.pygame
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    pygame.display.quit()
+
+    with pytest.raises(pygame.error):
+        pygame.event.post(pygame.event.Event(driver.SEARCH_DONE_EVENT))
+    driver._post_search_done()
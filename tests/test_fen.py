@@ -0,0 +1,70 @@
+import pytest
+
+from playchess.board import Board
+from playchess.game import Game
+from playchess.perft import PERFT_POSITIONS
+
+from tests.test_position_key import random_walk
+
+
+PLIES = 80
+
+
+@pytest.mark.parametrize("name", PERFT_POSITIONS)
+def test_fen_round_trip(name):
+    fen = PERFT_POSITIONS[name][0]
+
+    assert Game.from_fen(fen).to_fen() == fen
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fen_round_trip_during_games(seed):
+    game = Game.from_fen(PERFT_POSITIONS["start"][0])
+
+    for _ in random_walk(game, PLIES, seed):
+        copy = Game.from_fen(game.to_fen())
+        assert copy.to_fen() == game.to_fen()
+        assert copy.position_key == game.position_key
+        assert (copy.material_score, copy.positional_score) == (game.material_score, game.positional_score)
+        assert len(copy.get_valid_moves()) == len(game.get_valid_moves())
+
+
+def test_move_counters_default():
+    assert Game.from_fen("4k3/8/8/8/8/8/8/4K3 b - -").to_fen() == "4k3/8/8/8/8/8/8/4K3 b - - 0 1"
+
+
+@pytest.mark.parametrize("placement", [
+    "4k3/8/8/8/8/8/8/8",                    # no white king
+    "4k3/8/8/8/8/8/8/3KK3",                 # two white kings
+    "4k2k/8/8/8/8/8/8/4K3",                 # two black kings
+    "4k3/8/8/8/8/8/8/4K2",                  # short rank
+    "4k3/8/8/8/8/8/8/4K4",                  # long rank
+    "4k3/8/8/8/8/8/4K3",                    # seven ranks
+    "4k3/8/8/8/8/8/8/4X3",                  # unknown piece
+])
+def test_board_rejects_invalid_placements(placement):
+    with pytest.raises(ValueError):
+        Board.from_fen(placement)
+
+
+@pytest.mark.parametrize("fen", [
+    "r3k2r/8/8/8/8/8/8/R3K3 w KQkq - 0 1",      # no rook on h1
+    "r3k2r/8/8/8/8/8/8/4K2R w KQkq - 0 1",      # no rook on a1
+    "4k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",      # no rook on a8
+    "r3k2r/8/8/8/8/8/8/R4K1R w KQkq - 0 1",     # king not on e1
+    "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1 2",   # seven fields
+    "r3k2r/8/8/8/8/8/8/R3K2R x KQkq - 0 1",     # side to move
+    "r3k2r/8/8/8/8/8/8/R3K2R w KX - 0 1",       # castling letter
+    "r3k2r/8/8/8/8/8/8/R3K2R w KQkq e4 0 1",    # en-passant rank
+    "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - x 1",     # halfmove clock
+])
+def test_game_rejects_invalid_fens(fen):
+    with pytest.raises(ValueError):
+        Game.from_fen(fen)
+
+
+def test_castling_rights_of_present_rooks_are_kept():
+    game = Game.from_fen("4k2r/8/8/8/8/8/8/R3K3 w Qk - 0 1")
+
+    assert game.to_fen() == "4k2r/8/8/8/8/8/8/R3K3 w Qk - 0 1"
+    assert {move.to_square_name for move in game.get_valid_moves() if move.is_castle} == {"c1"}
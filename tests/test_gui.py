@@ -0,0 +1,302 @@
+import os
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from playchess import gui  # noqa: E402
+from playchess.board import Board  # noqa: E402
+from playchess.config import BOARD_HEIGHT, BOARD_WIDTH, MOVE_LOG_PANEL_WIDTH, SQUARE_SIZE  # noqa: E402
+from playchess.game import Game  # noqa: E402
+from playchess.gui import GameRenderer, LoopStats, MoveLogWidget, draw_game  # noqa: E402
+
+
+@pytest.fixture(scope="module", autouse=True)
+def dummy_display():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    yield
+
+
+@pytest.fixture
+def screen():
+    return pygame.Surface((BOARD_WIDTH + MOVE_LOG_PANEL_WIDTH, BOARD_HEIGHT))
+
+
+def play(game, names):
+    for name in names:
+        game.make_move(next(move for move in game.get_valid_moves() if move.from_square_name + move.to_square_name == name))
+    return game
+
+
+def square_rect(name):
+    row, col = 8 - int(name[1]), ord(name[0]) - ord("a")
+    return pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+
+
+def board_pixels(screen):
+    return pygame.image.tostring(screen.subsurface(pygame.Rect(0, 0, BOARD_WIDTH, BOARD_HEIGHT)), "RGB")
+
+
+def test_first_frame_draws_everything(screen):
+    renderer = GameRenderer()
+    game = Game(Board())
+
+    assert len(renderer.draw(screen, game, None, game.get_valid_moves())) == 64 + 1    # The squares and the log
+
+
+def test_nothing_changed_draws_nothing(screen):
+    renderer = GameRenderer()
+    game = Game(Board())
+    renderer.draw(screen, game, None, game.get_valid_moves())
+
+    assert renderer.draw(screen, game, None, game.get_valid_moves()) == []
+
+
+def test_move_draws_its_squares_and_the_move_log(screen):
+    renderer = GameRenderer()
+    game = Game(Board())
+    renderer.draw(screen, game, None, game.get_valid_moves())
+
+    play(game, ["e2e4"])
+    dirty_rects = renderer.draw(screen, game, None, game.get_valid_moves())
+
+    assert sorted(map(tuple, dirty_rects)) == \
+        sorted(map(tuple, [square_rect("e2"), square_rect("e4"), renderer.move_log.rect]))
+
+
+def test_castling_draws_the_king_and_rook_squares(screen):
+    renderer = GameRenderer()
+    game = play(Game(Board()), ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6"])
+    renderer.draw(screen, game, None, game.get_valid_moves())
+
+    play(game, ["e1g1"])
+    dirty_rects = renderer.draw(screen, game, None, game.get_valid_moves())
+
+    assert {tuple(rect) for rect in dirty_rects} == {tuple(square_rect(name)) for name in ("e1", "f1", "g1", "h1")} | \
+        {tuple(renderer.move_log.rect)}
+
+
+def test_selection_draws_the_highlighted_squares_only(screen):
+    renderer = GameRenderer()
+    game = Game(Board())
+    valid_moves = game.get_valid_moves()
+    renderer.draw(screen, game, None, valid_moves)
+
+    selected = renderer.draw(screen, game, (6, 4), valid_moves)     # e2
+    deselected = renderer.draw(screen, game, None, valid_moves)
+
+    expected = {tuple(square_rect(name)) for name in ("e2", "e3", "e4")}
+    assert {tuple(rect) for rect in selected} == expected
+    assert {tuple(rect) for rect in deselected} == expected
+
+
+def test_invalidate_draws_everything_again(screen):
+    renderer = GameRenderer()
+    game = Game(Board())
+    renderer.draw(screen, game, None, game.get_valid_moves())
+    renderer.invalidate()
+
+    assert len(renderer.draw(screen, game, None, game.get_valid_moves())) == 64 + 1
+
+
+def test_frames_look_like_full_redraws(screen):
+    renderer = GameRenderer()
+    full_screen = pygame.Surface(screen.get_size())
+    game = Game(Board())
+
+    for names, selected in ((["e2e4"], (1, 3)), (["d7d5"], None), (["e4d5"], (7, 3)), (["d8d5", "b1c3"], (3, 3))):
+        play(game, names)
+        valid_moves = game.get_valid_moves()
+        renderer.draw(screen, game, selected, valid_moves)
+        draw_game(full_screen, game, selected, valid_moves)
+
+        assert board_pixels(screen) == board_pixels(full_screen)
+
+
+KNIGHT_SHUFFLE = ["g1f3", "g8f6", "f3g1", "f6g8"]
+
+
+def test_move_texts_are_rendered_once(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), ["e2e4", "e7e5"])
+    widget.draw(screen, game)
+    texts = list(widget._texts)
+
+    play(game, ["g1f3"])
+    widget.draw(screen, game)
+
+    assert len(widget._texts) == 3
+    assert all(cached is text for cached, text in zip(widget._texts, texts))
+
+
+def test_undo_drops_the_texts_of_undone_moves(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), ["e2e4", "e7e5", "g1f3"])
+    widget.draw(screen, game)
+    texts = list(widget._texts)
+
+    game.undo_move()
+    assert widget.draw(screen, game) == widget.rect
+    assert widget._texts == texts[:2]
+    assert widget._moves == game.move_log
+
+    play(game, ["f1c4"])
+    widget.draw(screen, game)
+    assert widget._texts[:2] == texts[:2]
+    assert widget._texts[2] is not texts[2]
+    assert widget._moves == game.move_log
+
+
+def test_undone_and_replayed_move_is_rendered_again(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), ["e2e4", "e7e5"])
+    widget.draw(screen, game)
+    first_text = widget._texts[1]
+
+    game.undo_move()
+    play(game, ["e7e5"])     # An equal move, but another object
+    widget.draw(screen, game)
+
+    assert widget._texts[1] is not first_text
+    assert widget._moves == game.move_log
+
+
+def test_reset_drops_every_text(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), ["e2e4", "e7e5"])
+    widget.draw(screen, game)
+
+    assert widget.draw(screen, Game(Board())) == widget.rect
+    assert widget._texts == [] and widget.num_lines == 0
+
+
+def test_unchanged_log_is_not_drawn(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), ["e2e4"])
+
+    assert widget.draw(screen, game) == widget.rect
+    assert widget.draw(screen, game) is None
+
+    widget.invalidate()
+    assert widget.draw(screen, game) == widget.rect
+
+
+def test_scrolling_a_short_log_stays_at_the_top(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), ["e2e4", "e7e5"])
+    widget.draw(screen, game)
+
+    for lines in (-1000, -1, 1, 1000):
+        widget.scroll(lines)
+        assert widget._first_line == 0
+    assert widget.draw(screen, game) is None
+
+
+def test_scrolling_past_either_end_is_clamped(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), KNIGHT_SHUFFLE * 25)
+    widget.draw(screen, game)
+    last_first_line = widget.num_lines - MoveLogWidget.VISIBLE_LINES
+    assert last_first_line > 0
+    assert widget._first_line == last_first_line     # The log follows the latest move
+
+    widget.scroll(-1000)
+    assert widget._first_line == 0
+    assert widget.draw(screen, game) == widget.rect
+    widget.scroll(-1)
+    assert widget._first_line == 0
+    assert widget.draw(screen, game) is None
+
+    widget.scroll(1000)
+    assert widget._first_line == last_first_line
+    widget.scroll(1)
+    assert widget._first_line == last_first_line
+
+
+def test_scrolled_back_log_stops_following_the_latest_move(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), KNIGHT_SHUFFLE * 25)
+    widget.draw(screen, game)
+
+    widget.scroll(-3)
+    first_line = widget._first_line
+    play(game, KNIGHT_SHUFFLE * 3)
+    widget.draw(screen, game)
+    assert widget._first_line == first_line
+
+    widget.scroll(1000)
+    play(game, KNIGHT_SHUFFLE * 3)
+    widget.draw(screen, game)
+    assert widget._first_line == widget.num_lines - MoveLogWidget.VISIBLE_LINES
+
+
+def test_undo_keeps_a_scrolled_log_within_the_end(screen):
+    widget = MoveLogWidget()
+    game = play(Game(Board()), KNIGHT_SHUFFLE * 25)
+    widget.draw(screen, game)
+    widget.scroll(-1)
+
+    for _ in range(len(KNIGHT_SHUFFLE) * 25):
+        game.undo_move()
+    widget.draw(screen, game)
+
+    assert widget._first_line == 0
+
+
+class FakeClock:
+    """Wall and CPU clocks moved by hand."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def perf_counter(self):
+        return self.seconds
+
+    def process_time(self):
+        return self.cpu_seconds
+
+    def advance(self, seconds, cpu_seconds=0.0):
+        self.seconds += seconds
+        self.cpu_seconds += cpu_seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(gui, "time", fake_clock)
+    return fake_clock
+
+
+def test_loop_stats_count_iterations_and_idle_time(clock):
+    stats = LoopStats()
+
+    clock.advance(1.0, 1.0)
+    stats.next_iteration(idle=True)
+    clock.advance(3.0, 0.5)
+    stats.next_iteration(idle=False)    # A bot searched through this one
+    clock.advance(2.0, 2.0)
+    stats.next_iteration(idle=True)
+    clock.advance(1.0, 0.1)
+    stats.stop()
+    clock.advance(5.0, 5.0)
+    stats.stop()    # Stopped again, the time since the loop ended is not idle
+
+    assert stats.iterations == 3
+    assert stats.idle_seconds == pytest.approx(4.0)
+    assert stats.idle_cpu_seconds == pytest.approx(0.6)
+    assert stats.idle_cpu_percent == pytest.approx(15.0)
+    assert stats.cpu_percent == pytest.approx(8.6 * 100 / 12.0)
+
+
+def test_loop_stats_text(clock):
+    stats = LoopStats()
+    assert stats.idle_cpu_percent == stats.cpu_percent == 0.0
+
+    stats.next_iteration(idle=True)
+    clock.advance(2.0, 0.02)
+    stats.next_iteration(idle=True)
+    stats.frames_drawn += 1
+
+    assert str(stats) == "1 frames drawn in 2 loops, 1.0% CPU, 1.00% CPU over 2.0s idle"
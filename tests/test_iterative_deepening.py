@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from playchess.move_finder import IterativeDeepeningMoveFinder
+from playchess.move_ordering import MoveOrderer
+from playchess.perft import ENGINES, coordinate_name, create_position
+
+
+def iterative(position, max_depth, time_limit=None, max_nodes=None, seed=0):
+    random.seed(seed)
+    finder = IterativeDeepeningMoveFinder(position, position.get_valid_moves(), max_depth, time_limit, max_nodes)
+    return finder, finder.find_move()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("max_nodes", [50, 500, 3000])
+def test_node_budget_is_repeatable(engine, max_nodes):
+    runs = [iterative(create_position("kiwipete", engine), 10, max_nodes=max_nodes) for _ in range(2)]
+    (first, first_move), (second, second_move) = runs
+
+    assert coordinate_name(first.game, first_move) == coordinate_name(second.game, second_move)
+    assert (first.depth_reached, first.best_score, first.nodes_searched) == \
+        (second.depth_reached, second.best_score, second.nodes_searched)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("max_depth", [1, 2, 3])
+def test_depth_reached_stays_within_max_depth(engine, max_depth):
+    finder, move = iterative(create_position("position4", engine), max_depth)
+
+    assert finder.depth_reached == max_depth
+    assert move in finder.valid_moves
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("max_nodes", [0, 1, 60])
+def test_tiny_node_budget_still_returns_a_valid_move(engine, max_nodes):
+    finder, move = iterative(create_position("kiwipete", engine), 10, max_nodes=max_nodes)
+
+    assert move is not None
+    assert move in finder.valid_moves
+    assert finder.depth_reached <= 1
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_no_time_still_returns_a_valid_move(engine):
+    finder, move = iterative(create_position("kiwipete", engine), 10, time_limit=0.0)
+
+    assert move in finder.valid_moves
+    assert finder.depth_reached < 10
+    assert finder.nodes_searched <= 256 * (finder.depth_reached + 1)     # The clock is read every 256 nodes
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_aborted_iteration_keeps_the_last_completed_one(engine):
+    position = create_position("kiwipete", engine)
+    finder, move = iterative(position, 10, max_nodes=5000)
+    assert 1 <= finder.depth_reached < 10
+
+    full = IterativeDeepeningMoveFinder(position, position.get_valid_moves(), finder.depth_reached, None,
+                                        move_orderer=MoveOrderer())
+    full.find_move()
+
+    assert finder.best_score == pytest.approx(full.best_score)
+    assert move in finder.valid_moves
+
+
+def test_stopped_before_searching_returns_a_valid_move():
+    position = create_position("start", "bitboard")
+    finder = IterativeDeepeningMoveFinder(position, position.get_valid_moves(), 10, None)
+    finder.stop()
+
+    assert finder.find_move() in finder.valid_moves
+    assert finder.depth_reached == 0
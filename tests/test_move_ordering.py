@@ -0,0 +1,72 @@
+from playchess.game import Game
+from playchess.move_ordering import MoveOrderer
+
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def move_names(moves):
+    return [move.from_square_name + move.to_square_name for move in moves]
+
+
+def find_move(game, name):
+    return next(move for move in game.get_valid_moves() if move.from_square_name + move.to_square_name == name)
+
+
+def test_hash_move_comes_first():
+    game = Game.from_fen(KIWIPETE)
+    hash_move = find_move(game, "a2a3")
+
+    ordered = MoveOrderer().order_moves(game, game.get_valid_moves(), 0, hash_move)
+
+    assert ordered[0] == hash_move
+
+
+def test_captures_come_first_by_most_valuable_victim_then_least_valuable_attacker():
+    game = Game.from_fen(KIWIPETE)
+    valid_moves = game.get_valid_moves()
+    captures = [move for move in valid_moves if move.piece_is_captured]
+
+    ordered = MoveOrderer().order_moves(game, valid_moves, 0)
+
+    assert set(move_names(ordered[:len(captures)])) == set(move_names(captures))
+    # Queen takes pawn (f3h3) comes after pawn takes pawn (g2h3), bishop takes bishop (e2a6) before both
+    names = move_names(ordered)
+    assert names.index("e2a6") < names.index("g2h3") < names.index("f3h3")
+
+
+def test_promotions_come_before_quiet_moves():
+    game = Game.from_fen("8/P6k/8/8/8/8/8/K7 w - - 0 1")
+
+    ordered = MoveOrderer().order_moves(game, game.get_valid_moves(), 0)
+
+    assert [move.promotion_name for move in ordered[:4]] == ["=Q", "=R", "=B", "=N"]
+
+
+def test_killer_and_history_moves_come_before_other_quiet_moves():
+    game = Game.from_fen(KIWIPETE)
+    orderer: MoveOrderer = MoveOrderer()
+    killer = find_move(game, "a2a4")
+    orderer.record_cutoff(game, killer, 1, 3, 5)
+
+    ordered = orderer.order_moves(game, game.get_valid_moves(), 1)
+    captures = sum(1 for move in ordered if move.piece_is_captured)
+    assert ordered[captures] == killer
+
+    # At another ply the killer does not count, its history still puts it before the other quiet moves
+    ordered = orderer.order_moves(game, game.get_valid_moves(), 2)
+    assert ordered[captures] == killer
+
+    assert orderer.cutoffs == 1
+    assert orderer.first_move_cutoff_rate == 0.0
+
+
+def test_clear_forgets_killers_and_history():
+    game = Game.from_fen(KIWIPETE)
+    orderer: MoveOrderer = MoveOrderer()
+    orderer.record_cutoff(game, find_move(game, "a2a4"), 1, 3, 0)
+    orderer.clear()
+
+    assert orderer.killers[1] == [None, None]
+    assert orderer.cutoffs == 0
+    assert all(score == 0 for colour in orderer.history for to_scores in colour for score in to_scores)
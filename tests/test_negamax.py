@@ -0,0 +1,107 @@
+import pytest
+
+from playchess import move_finder
+from playchess.bitboard import BitboardPosition
+from playchess.game import Game
+from playchess.move_finder import NegamaxMoveFinder, PrunedMinMaxMoveFinder
+from playchess.move_ordering import MoveOrderer
+from playchess.perft import ENGINES, PERFT_POSITIONS, coordinate_name, create_position
+from playchess.scorer import CHECKMATE_ABS_SCORE
+
+
+def negamax(position, depth, **kwargs):
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), depth, None, use_quiescence=False,
+                               move_orderer=MoveOrderer(), **kwargs)
+    return finder, finder.find_move()
+
+
+def pruned_score(position, depth):
+    """Score of a position for the side to move by a plain alpha beta search."""
+
+    finder = PrunedMinMaxMoveFinder(position, position.get_valid_moves(), depth, move_orderer=MoveOrderer())
+    finder.find_move()
+    return finder.best_score if position.turn.is_white() else -finder.best_score
+
+
+@pytest.mark.parametrize("engine, depth", [("game", 2), ("bitboard", 3)])
+@pytest.mark.parametrize("name", PERFT_POSITIONS)
+def test_negamax_agrees_with_alpha_beta(name, engine, depth):
+    position = create_position(name, engine)
+    finder, move = negamax(position, depth)
+
+    assert finder.best_score == pytest.approx(pruned_score(position, depth))
+
+    # Ties may be broken differently, the move has to be worth the best score
+    position.make_move(move)
+    assert -pruned_score(position, depth - 1) == pytest.approx(finder.best_score)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("fen, mate", [
+    ("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1", "a1a8"),
+    ("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 0 1", "f3f7"),
+    ("r5k1/8/8/8/8/8/5PPP/6K1 b - - 0 1", "a8a1"),
+])
+def test_mate_in_one(engine, fen, mate):
+    game = Game.from_fen(fen)
+    position = game if engine == "game" else BitboardPosition.from_game(game)
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 4, None)
+
+    assert coordinate_name(position, finder.find_move()) == mate
+    assert finder.best_score == CHECKMATE_ABS_SCORE
+    assert finder.depth_reached == 1    # Mate ends the deepening
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position4", "position5"])
+def test_principal_variation_is_legal(name, engine):
+    position = create_position(name, engine)
+    key = position.position_key
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 4, None)
+    move = finder.find_move()
+
+    assert finder.principal_variation[0] == move
+    assert len(finder.principal_variation) >= 1
+
+    for pv_move in finder.principal_variation:
+        assert pv_move in position.get_valid_moves()
+        position.make_move(pv_move)
+    for _ in finder.principal_variation:
+        position.undo_move()
+    assert position.position_key == key
+
+
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position3", "position6"])
+def test_aspiration_re_search_gets_the_full_window_score(name, monkeypatch):
+    full_window, _ = negamax(create_position(name, "bitboard"), 4)
+
+    root_windows = []
+    monkeypatch.setattr(move_finder, "ASPIRATION_WINDOW", 0.05)     # Every change of score falls outside
+    finder = NegamaxMoveFinder(create_position(name, "bitboard"), [], 4, None, use_quiescence=False,
+                               move_orderer=MoveOrderer())
+    finder.valid_moves = finder.game.get_valid_moves()
+    search = finder._search
+
+    def recording_search(depth, alpha, beta, ply, principal_variation):
+        if ply == 0:
+            root_windows.append((depth, alpha, beta))
+        return search(depth, alpha, beta, ply, principal_variation)
+
+    monkeypatch.setattr(finder, "_search", recording_search)
+    finder.find_move()
+
+    assert len(root_windows) > 4    # At least one iteration failed high or low and was searched again
+    assert finder.best_score == pytest.approx(full_window.best_score)
+    assert finder.principal_variation[0] in finder.game.get_valid_moves()
+
+
+def test_aborted_iteration_keeps_the_last_completed_one():
+    position = create_position("kiwipete", "bitboard")
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 8, None, max_nodes=20000)
+    move = finder.find_move()
+
+    assert finder.aborted
+    assert finder.depth_reached in finder.iterations
+    assert max(finder.iterations) == finder.depth_reached < 8
+    assert (finder.best_score, finder.principal_variation) == finder.iterations[finder.depth_reached]
+    assert move == finder.principal_variation[0]
@@ -0,0 +1,168 @@
+import io
+import random
+from collections import Counter
+
+import pytest
+
+from playchess.bitboard import BitboardPosition
+from playchess.board import Board
+from playchess.game import Game
+from playchess.move_finder import BookMoveFinder, MoveFinder
+from playchess.opening_book import ENTRY, OpeningBook, build_book, encode_move, main
+from playchess.perft import PERFT_POSITIONS, coordinate_name
+from playchess.pgn import parse_san, read_games
+
+
+GAMES_PGN = """[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. O-O Nf6 1-0
+
+[Result "0-1"]
+
+1. e4 c5 0-1
+
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 1-0
+"""
+
+
+def book_names(book, position):
+    return [(coordinate_name(position, move), weight) for move, weight in book.moves(position, position.get_valid_moves())]
+
+
+def play(sans):
+    game = Game(Board())
+    for san in sans:
+        game.make_move(parse_san(game, san))
+    return game
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = str(tmp_path / "book.bin")
+    build_book(read_games(io.StringIO(GAMES_PGN)), path)
+    return path
+
+
+def test_book_weights_moves_by_results(book_path):
+    with OpeningBook(book_path) as book:
+        assert book_names(book, play([])) == [("e2e4", 4), ("d2d4", 1)]
+        assert book_names(book, play(["e4"])) == [("c7c5", 2)]     # e5 was only played in lost games
+        assert book_names(book, play(["e4", "e5"])) == [("g1f3", 4)]
+        assert book_names(book, play(["e4", "e5", "Nf3"])) == []
+        assert book_names(book, play(["d4", "d5"])) == []
+
+
+def test_build_book_writes_sorted_entries(tmp_path):
+    path = str(tmp_path / "book.bin")
+    written = build_book(read_games(io.StringIO(GAMES_PGN)), path)
+
+    with open(path, "rb") as book_file:
+        data = book_file.read()
+    keys = [ENTRY.unpack_from(data, offset)[0] for offset in range(0, len(data), ENTRY.size)]
+
+    with OpeningBook(path) as book:
+        assert written == len(keys) == len(book)
+    assert keys == sorted(keys)
+
+
+def test_book_plies_and_min_games(tmp_path):
+    path = str(tmp_path / "book.bin")
+    build_book(read_games(io.StringIO(GAMES_PGN)), path, plies=3, min_games=2)
+
+    with OpeningBook(path) as book:
+        assert book_names(book, play([])) == [("e2e4", 4)]
+        assert book_names(book, play(["e4", "e5"])) == [("g1f3", 4)]
+        assert book_names(book, play(["e4", "e5", "Nf3"])) == []
+
+
+def test_castling_is_in_the_book(book_path):
+    game = play(["e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5"])
+
+    with OpeningBook(book_path) as book:
+        (move, weight), = book.moves(game, game.get_valid_moves())
+
+    assert move.is_castle and weight == 2
+
+
+@pytest.mark.parametrize("name, move_name, code", [
+    ("kiwipete", "e1g1", 4 << 6 | 7),                                   # Castling is written as e1h1
+    ("kiwipete", "e1c1", 4 << 6 | 0),                                   # and e1a1
+    ("start", "g1f3", 6 << 6 | 5 | 2 << 3),
+    ("position5", "d7c8q", 3 << 6 | 6 << 9 | 2 | 7 << 3 | 4 << 12),
+    ("position5", "d7c8n", 3 << 6 | 6 << 9 | 2 | 7 << 3 | 1 << 12),
+])
+def test_encode_move(name, move_name, code):
+    game = Game.from_fen(PERFT_POSITIONS[name][0])
+    move = next(move for move in game.get_valid_moves() if coordinate_name(game, move) == move_name)
+    position = BitboardPosition.from_game(game)
+    bitboard_move = next(move for move in position.get_valid_moves() if coordinate_name(position, move) == move_name)
+
+    assert encode_move(game, move) == encode_move(position, bitboard_move) == code
+
+
+def test_engines_get_the_same_book_moves(book_path):
+    game = play(["e4", "e5"])
+
+    with OpeningBook(book_path) as book:
+        assert book_names(book, BitboardPosition.from_game(game)) == book_names(book, game)
+        assert book_names(book, BitboardPosition()) == book_names(book, Game(Board()))
+
+
+def test_choose_move_by_weight(book_path):
+    game = Game(Board())
+    rng = random.Random(0)
+
+    with OpeningBook(book_path) as book:
+        chosen = Counter(coordinate_name(game, book.choose_move(game, game.get_valid_moves(), rng)) for _ in range(700))
+        out_of_book = book.choose_move(play(["a3"]), play(["a3"]).get_valid_moves(), rng)
+
+    assert set(chosen) == {"e2e4", "d2d4"}
+    assert 500 < chosen["e2e4"] < 700
+    assert out_of_book is None
+
+
+def test_empty_book(tmp_path):
+    path = str(tmp_path / "book.bin")
+    assert build_book([], path) == 0
+
+    game = Game(Board())
+    with OpeningBook(path) as book:
+        assert len(book) == 0
+        assert book.moves(game, game.get_valid_moves()) == []
+        assert book.choose_move(game, game.get_valid_moves()) is None
+
+
+class _FirstMoveFinder(MoveFinder):
+    def __init__(self, valid_moves):
+        self.valid_moves = valid_moves
+
+    def find_move(self):
+        return self.valid_moves[0]
+
+
+def test_book_move_finder_searches_out_of_book(book_path):
+    with OpeningBook(book_path) as book:
+        game = play(["e4", "e5", "Nf3"])
+        valid_moves = game.get_valid_moves()
+        assert BookMoveFinder(book, game, valid_moves, _FirstMoveFinder(valid_moves)).find_move() == valid_moves[0]
+
+        game = play(["e4"])
+        valid_moves = game.get_valid_moves()
+        move = BookMoveFinder(book, game, valid_moves, _FirstMoveFinder(valid_moves)).find_move()
+        assert coordinate_name(game, move) == "c7c5"
+
+
+def test_main_builds_and_shows_a_book(tmp_path, capsys):
+    pgn_path, book_path = tmp_path / "games.pgn", str(tmp_path / "book.bin")
+    pgn_path.write_text(GAMES_PGN)
+
+    main(["build", str(pgn_path), book_path])
+    main(["show", book_path])
+
+    assert capsys.readouterr().out.splitlines()[1:] == ["e2e4: 4 (80.0%)", "d2d4: 1 (20.0%)"]
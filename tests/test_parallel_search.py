@@ -0,0 +1,140 @@
+import os
+import random
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from playchess import parallel_search
+from playchess.bitboard import BitboardPosition
+from playchess.game import Game
+from playchess.move_finder import NegamaxMoveFinder
+from playchess.parallel_search import (LAZY_SMP, ROOT_SPLITTING, ParallelMoveFinder, _attach_shared_table,
+                                       to_bitboard_position)
+from playchess.perft import ENGINES, PERFT_POSITIONS, coordinate_name, create_position
+from playchess.transposition_table import SharedTranspositionTable
+
+
+MAX_NODES = 3000
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(2) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize("mode", [ROOT_SPLITTING, LAZY_SMP])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_both_modes_find_a_valid_move_within_the_node_budget(executor, engine, mode):
+    position = create_position("kiwipete", engine)
+    valid_moves = position.get_valid_moves()
+    finder = ParallelMoveFinder(position, valid_moves, 6, None, MAX_NODES, workers=2, mode=mode, executor=executor)
+
+    assert finder.find_move() in valid_moves
+    assert 0 < finder.nodes_searched <= MAX_NODES + 2    # Each worker stops at the first node over its half
+    assert finder.depth_reached >= 1
+
+
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position4"])
+def test_root_splitting_with_one_worker_agrees_with_negamax(executor, name):
+    position = create_position(name, "bitboard")
+    finder = ParallelMoveFinder(position, position.get_valid_moves(), 3, None, workers=1, mode=ROOT_SPLITTING,
+                                executor=executor)
+    move = finder.find_move()
+
+    random.seed(0)      # The seed of the first worker, for the same tie breaks
+    negamax = NegamaxMoveFinder(position, position.get_valid_moves(), 3, None)
+
+    assert coordinate_name(position, move) == coordinate_name(position, negamax.find_move())
+    assert (finder.best_score, finder.depth_reached) == (negamax.best_score, negamax.depth_reached)
+
+
+@pytest.mark.parametrize("promotion", "qrbn")
+def test_bitboard_moves_map_back_to_game_promotions(promotion):
+    game = Game.from_fen(PERFT_POSITIONS["position5"][0])
+    position = BitboardPosition.from_game(game)
+    bitboard_move = next(move for move in position.get_valid_moves()
+                         if coordinate_name(position, move) == "d7c8" + promotion)
+    finder = ParallelMoveFinder(game, game.get_valid_moves())
+
+    assert coordinate_name(game, finder._to_own_move(position, bitboard_move)) == "d7c8" + promotion
+
+
+def test_a_given_shared_table_is_filled_and_kept(executor):
+    position = create_position("start", "bitboard")
+    with SharedTranspositionTable(1) as table:
+        ParallelMoveFinder(position, position.get_valid_moves(), 3, None, workers=2, mode=LAZY_SMP, executor=executor,
+                           transposition_table=table).find_move()
+
+        assert len(table) > 0
+        assert table.probe(position.position_key) is not None
+
+
+# Workers started before the table is created have resource trackers of their own, which must not free it
+OUTLIVE_WORKERS_SCRIPT = """
+from concurrent.futures import ProcessPoolExecutor
+from playchess.bitboard import BitboardPosition
+from playchess.parallel_search import LAZY_SMP, ParallelMoveFinder
+from playchess.transposition_table import SharedTranspositionTable
+
+position = BitboardPosition()
+with ProcessPoolExecutor(2) as pool:
+    pool.submit(int).result()
+    table = SharedTranspositionTable(1)
+    ParallelMoveFinder(position, position.get_valid_moves(), 2, None, workers=2, mode=LAZY_SMP, executor=pool,
+                       transposition_table=table).find_move()
+
+with table:
+    print(ParallelMoveFinder(position, position.get_valid_moves(), 2, None, workers=2, mode=LAZY_SMP,
+                             transposition_table=table).find_move() in position.get_valid_moves())
+"""
+
+
+def test_a_given_shared_table_outlives_the_workers():
+    completed = subprocess.run([sys.executable, "-c", OUTLIVE_WORKERS_SCRIPT], capture_output=True, text=True,
+                               env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}, timeout=120)
+
+    assert (completed.returncode, completed.stdout.strip()) == (0, "True"), completed.stderr
+    assert "leaked" not in completed.stderr
+
+
+def test_a_table_of_its_own_is_closed_after_the_search(executor, monkeypatch):
+    tables = []
+
+    class RecordedTable(SharedTranspositionTable):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            tables.append(self)
+
+    monkeypatch.setattr(parallel_search, "SharedTranspositionTable", RecordedTable)
+    position = create_position("start", "bitboard")
+    ParallelMoveFinder(position, position.get_valid_moves(), 2, None, workers=2, mode=LAZY_SMP,
+                       executor=executor).find_move()
+
+    assert len(tables) == 1
+    assert tables[0]._memory.buf is None
+
+
+def test_worker_attaches_to_one_table_at_a_time():
+    with SharedTranspositionTable(1) as first, SharedTranspositionTable(1) as second:
+        attached = _attach_shared_table(first.name)
+        assert _attach_shared_table(first.name) is attached
+
+        assert _attach_shared_table(second.name) is not attached
+        assert attached._memory.buf is None     # Detached from the table of the earlier search
+        parallel_search._worker_tables.pop(second.name).close()
+
+
+def test_no_move_without_valid_moves():
+    position = BitboardPosition.from_game(Game.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"))
+
+    assert ParallelMoveFinder(position, position.get_valid_moves()).find_move() is None
+
+
+def test_unknown_mode_and_position():
+    with pytest.raises(ValueError):
+        ParallelMoveFinder(BitboardPosition(), [], mode="gpu")
+    with pytest.raises(TypeError):
+        to_bitboard_position(object())
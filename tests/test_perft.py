@@ -0,0 +1,44 @@
+import pytest
+
+from playchess.perft import ENGINES, PERFT_POSITIONS, create_position, divide, perft
+
+
+DEPTH = 3
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", PERFT_POSITIONS)
+def test_perft_matches_reference_counts(name, engine):
+    _, expected_counts, _ = PERFT_POSITIONS[name]
+    position = create_position(name, engine)
+
+    assert [perft(position, depth) for depth in range(1, DEPTH + 1)] == list(expected_counts[:DEPTH])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_perft_leaves_position_unchanged(engine):
+    position = create_position("kiwipete", engine)
+    key, material_score, positional_score = position.position_key, position.material_score, position.positional_score
+
+    perft(position, 2)
+
+    assert (position.position_key, position.material_score, position.positional_score) == \
+        (key, material_score, positional_score)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_divide_adds_up_to_perft(engine):
+    counts = divide(create_position("position5", engine), 2)
+
+    assert len(counts) == PERFT_POSITIONS["position5"][1][0]
+    assert sum(counts.values()) == PERFT_POSITIONS["position5"][1][1]
+    assert {"d7c8q", "d7c8r", "d7c8b", "d7c8n"} <= set(counts)    # under promotions
+
+
+def test_en_passant_after_an_earlier_en_passant_capture():
+    position = create_position("start", "game")
+    for name in ("e2e4", "a7a6", "e4e5", "d7d5", "e5d6", "a6a5", "h2h4", "a5a4", "b2b4"):
+        position.make_move(next(move for move in position.get_valid_moves()
+                                if move.from_square_name + move.to_square_name == name))
+
+    assert any(move.is_en_passant for move in position.get_valid_moves())
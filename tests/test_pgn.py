@@ -0,0 +1,128 @@
+import io
+
+import pytest
+
+from playchess.board import Board
+from playchess.game import Game
+from playchess.pgn import game_result, move_san, parse_san, read_games, san_moves, write_games, write_pgn
+from playchess.perft import PERFT_POSITIONS
+
+from tests.test_position_key import random_walk
+
+
+SCHOLARS_MATE_PGN = """[Event "Casual game"]
+[Site "?"]
+[Date "????.??.??"]
+[Round "?"]
+[White "Anderssen"]
+[Black "Kieseritzky"]
+[Result "1-0"]
+
+1. e4 {the king's pawn} e5 2. Bc4 (2. Nf3 Nc6) Nc6 3. Qh5 $2 Nf6?? 4. Qxf7# 1-0
+"""
+
+
+def play(game, sans):
+    for san in sans:
+        game.make_move(parse_san(game, san))
+    return game
+
+
+@pytest.mark.parametrize("name", PERFT_POSITIONS)
+def test_san_round_trip(name):
+    game = Game.from_fen(PERFT_POSITIONS[name][0])
+    valid_moves = game.get_valid_moves()
+
+    assert [parse_san(game, move_san(game, move)) for move in valid_moves] == valid_moves
+
+
+@pytest.mark.parametrize("fen, san", [
+    (PERFT_POSITIONS["kiwipete"][0], "O-O"),
+    (PERFT_POSITIONS["kiwipete"][0], "O-O-O"),
+    (PERFT_POSITIONS["kiwipete"][0], "Bxa6"),
+    (PERFT_POSITIONS["kiwipete"][0], "dxe6"),
+    (PERFT_POSITIONS["position5"][0], "dxc8=N"),
+    (PERFT_POSITIONS["position5"][0], "Kxf2"),
+    ("4k3/8/8/8/8/8/4K3/R6R w - - 0 1", "Rad1"),
+    ("4k3/8/8/8/8/8/4K3/R6R w - - 0 1", "Rhd1"),
+    ("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1", "R1a3"),
+    ("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1", "R5a3"),
+])
+def test_san_of_special_moves(fen, san):
+    game = Game.from_fen(fen)
+
+    assert move_san(game, parse_san(game, san)) == san
+
+
+@pytest.mark.parametrize("san", ["Ra3", "Rd2", "Ke3", "e4", "Qd1", "O-O", "X9"])
+def test_parse_san_rejects_ambiguous_and_invalid_moves(san):
+    game = Game.from_fen("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1")
+
+    with pytest.raises(ValueError):
+        parse_san(game, san)
+
+
+def test_check_and_mate_suffixes():
+    game = play(Game(Board()), ["f3", "e5", "g4"])
+    mate = parse_san(game, "Qh4")
+
+    assert move_san(game, mate) == "Qh4#"
+    assert not game.check_mate
+
+
+def test_result_is_read_from_the_final_position():
+    game = play(Game(Board()), ["f3", "e5", "g4", "Qh4#"])
+
+    assert game_result(game) == "0-1"
+    assert '[Result "0-1"]' in write_pgn(game)
+    assert write_pgn(game).endswith("2. g4 Qh4# 0-1\n")
+
+    game.undo_move()
+    assert game_result(game) == "*"
+
+
+def test_stalemate_result():
+    game = Game.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+
+    assert game_result(game) == "1/2-1/2"
+    assert not game.stale_mate
+
+
+def test_read_games():
+    games = list(read_games(io.StringIO(SCHOLARS_MATE_PGN + "\n" + SCHOLARS_MATE_PGN.replace("1-0", "*"))))
+
+    assert [pgn_game.moves for pgn_game in games] == [["e4", "e5", "Bc4", "Nc6", "Qh5", "Nf6??", "Qxf7#"]] * 2
+    assert [pgn_game.result for pgn_game in games] == ["1-0", "*"]
+    assert games[0].tags["White"] == "Anderssen"
+
+
+def test_pgn_round_trip():
+    pgn_game = next(read_games(io.StringIO(SCHOLARS_MATE_PGN)))
+    game = pgn_game.to_game()
+
+    assert game_result(game) == "1-0"
+    assert write_pgn(game, {name: value for name, value in pgn_game.tags.items() if name != "Result"}) == \
+        "\n".join(SCHOLARS_MATE_PGN.splitlines()[:8]) + "\n1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0\n"
+
+
+def test_result_off_the_board_is_kept():
+    pgn_game = next(read_games(io.StringIO('[Result "1/2-1/2"]\n\n1. e4 e5 2. Nf3 1/2-1/2\n')))
+    game = pgn_game.to_game()
+
+    assert game_result(game) == "1/2-1/2"
+    assert next(read_games(io.StringIO(write_pgn(game)))).result == "1/2-1/2"
+
+
+def test_games_from_a_position_round_trip():
+    game = Game.from_fen(PERFT_POSITIONS["position4"][0])
+    for _ in random_walk(game, 40, seed=3):
+        pass
+
+    pgn_file = io.StringIO()
+    write_games([game, game], pgn_file)
+    pgn_games = list(read_games(io.StringIO(pgn_file.getvalue())))
+
+    assert len(pgn_games) == 2
+    assert pgn_games[0].tags["FEN"] == PERFT_POSITIONS["position4"][0]
+    assert pgn_games[0].moves == san_moves(game)
+    assert pgn_games[0].to_game().to_fen() == game.to_fen()
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from playchess.bitboard import BitboardPosition
+from playchess.game import Game
+from playchess.perft import ENGINES, create_position
+
+
+PLIES = 60
+
+
+def random_walk(position, plies, seed):
+    """Plays random moves from a position, yields after every move."""
+
+    rng = random.Random(seed)
+    for _ in range(plies):
+        valid_moves = position.get_valid_moves()
+        if not valid_moves:
+            return
+        position.make_move(rng.choice(valid_moves))
+        yield
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position3", "position4", "position5"])
+def test_incremental_key_matches_recomputed_key(name, engine):
+    position = create_position(name, engine)
+    start_key = position.position_key
+    keys = [start_key]
+
+    for _ in random_walk(position, PLIES, seed=len(name)):
+        assert position.position_key == position._compute_position_key()
+        keys.append(position.position_key)
+
+    while len(keys) > 1:
+        position.undo_move()
+        keys.pop()
+        assert position.position_key == keys[-1] == position._compute_position_key()
+
+
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position4"])
+def test_engines_have_the_same_keys(name):
+    game = create_position(name, "game")
+    assert isinstance(game, Game)
+
+    for _ in random_walk(game, PLIES, seed=7):
+        assert BitboardPosition.from_game(game).position_key == game.position_key
+
+
+def test_same_position_by_different_move_orders_has_the_same_key():
+    def key_after(names):
+        game = Game.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        for name in names:
+            game.make_move(next(move for move in game.get_valid_moves()
+                                if move.from_square_name + move.to_square_name == name))
+        return game.position_key
+
+    assert key_after(["g1f3", "g8f6", "b1c3"]) == key_after(["b1c3", "g8f6", "g1f3"])
+    assert key_after(["g1f3", "g8f6"]) != key_after(["b1c3", "g8f6"])
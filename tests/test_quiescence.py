@@ -0,0 +1,95 @@
+import pytest
+
+from playchess.bitboard import BitboardPosition
+from playchess.game import Game
+from playchess.move_finder import INFINITE_SCORE, NegamaxMoveFinder
+from playchess.perft import ENGINES, coordinate_name, create_position
+from playchess.scorer import CHECKMATE_ABS_SCORE, find_game_score
+
+
+def create(fen, engine):
+    game = Game.from_fen(fen)
+    return game if engine == "game" else BitboardPosition.from_game(game)
+
+
+def quiescence(position, **kwargs):
+    """Quiescence score of a position for the side to move and the finder that searched it."""
+
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 1, None, **kwargs)
+    return finder._quiescence_search(-INFINITE_SCORE, INFINITE_SCORE, 0, finder.max_quiescence_depth), finder
+
+
+def stand_pat(position):
+    score = find_game_score(position, True)
+    return score if position.turn.is_white() else -score
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_defended_pawn_at_the_horizon_is_not_grabbed(engine):
+    position = create("4k3/8/3p4/4p3/8/8/8/4QK2 w - - 0 1", engine)     # Qxe5+ dxe5 loses the queen
+
+    greedy = NegamaxMoveFinder(position, position.get_valid_moves(), 1, None, use_quiescence=False)
+    assert coordinate_name(position, greedy.find_move()) == "e1e5"
+
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 1, None)
+    assert coordinate_name(position, finder.find_move()) != "e1e5"
+    assert finder.quiescence_nodes_searched > 0
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_undefended_piece_is_taken(engine):
+    position = create("4k3/8/8/4r3/8/8/8/4QK2 w - - 0 1", engine)
+
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 1, None)
+    assert coordinate_name(position, finder.find_move()) == "e1e5"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_quiet_position_stands_pat(engine):
+    position = create_position("start", engine)
+    score, finder = quiescence(position)
+
+    assert score == stand_pat(position)
+    assert finder.quiescence_nodes_searched == 1
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_in_check_the_evasions_are_searched(engine):
+    position = create("7k/8/8/8/8/Q7/2n5/4K3 w - - 0 1", engine)    # The knight forks the king and the queen
+    score, finder = quiescence(position)
+
+    assert stand_pat(position) > 5
+    assert score < 0    # Every king move loses the queen
+    assert finder.quiescence_nodes_searched > len(position.get_valid_moves())
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_checkmate_at_a_quiescence_node_scores_as_mate(engine):
+    mated, _ = quiescence(create("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1", engine))
+    assert mated == -CHECKMATE_ABS_SCORE
+
+    # Qxf7 is a capture, so at depth 0 the quiescence search finds the mate behind it
+    position = create("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 0 1", engine)
+    score, _ = quiescence(position)
+    assert score == CHECKMATE_ABS_SCORE
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_quiescence_depth_caps_the_captures(engine):
+    position = create_position("kiwipete", engine)
+    _, capped = quiescence(position, max_quiescence_depth=1)
+    _, deep = quiescence(position)
+
+    assert capped.quiescence_nodes_searched <= 1 + len([move for move in position.get_valid_moves()
+                                                        if position.move_details(move)[3]])
+    assert deep.quiescence_nodes_searched > capped.quiescence_nodes_searched
+
+
+def test_delta_pruning_skips_hopeless_captures():
+    # White is a queen down, taking the pawn cannot get the score near alpha
+    position = create("3qk3/8/8/8/8/8/p7/R3K3 w - - 0 1", "bitboard")
+    finder = NegamaxMoveFinder(position, position.get_valid_moves(), 1, None)
+    score = finder._quiescence_search(0.0, INFINITE_SCORE, 0, finder.max_quiescence_depth)
+
+    assert score == stand_pat(position)
+    assert finder.quiescence_nodes_searched == 1
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from playchess.bitboard import BitboardPosition
+from playchess.game import Game
+from playchess.perft import ENGINES, PERFT_POSITIONS, create_position
+from playchess.scorer import CHECKMATE_ABS_SCORE, count_scores, find_game_score
+
+
+PLIES = 60
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position3", "position4", "position5"])
+def test_incremental_scores_match_recounted_scores(name, engine):
+    position = create_position(name, engine)
+    scores = [(position.material_score, position.positional_score)]
+    assert scores[0] == count_scores(position)
+
+    rng = random.Random(len(name))
+    for _ in range(PLIES):
+        valid_moves = position.get_valid_moves()
+        if not valid_moves:
+            break
+        position.make_move(rng.choice(valid_moves))
+        scores.append((position.material_score, position.positional_score))
+        assert scores[-1] == count_scores(position)
+
+    while len(scores) > 1:
+        position.undo_move()
+        scores.pop()
+        assert (position.material_score, position.positional_score) == scores[-1] == count_scores(position)
+
+
+def test_promotion_scores_the_promotion_piece():
+    position = create_position("position5", "game")
+    material_before = position.material_score
+
+    gains = {}
+    for move in position.get_valid_moves():
+        if move.from_square_name + move.to_square_name == "d7c8":
+            position.make_move(move)
+            assert position.material_score == count_scores(position)[0]
+            gains[move.promotion_name] = position.material_score - material_before
+            position.undo_move()
+
+    assert position.material_score == material_before
+    assert gains["=Q"] > gains["=R"] > gains["=B"] >= gains["=N"] > 0
+
+
+# Games that end in a check mate for each side and in a stale mate
+FINAL_FENS = ("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3",
+              "r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4",
+              "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+
+
+def sample_positions(engine, count=100):
+    """Positions of random games from the perft positions and the final positions, with their mate flags set."""
+
+    fens = list(FINAL_FENS)
+    rng = random.Random(10)
+    while len(fens) < count:
+        game = Game.from_fen(PERFT_POSITIONS[rng.choice(list(PERFT_POSITIONS))][0])
+        for _ in range(rng.randrange(40)):
+            valid_moves = game.get_valid_moves()
+            if not valid_moves:
+                break
+            game.make_move(rng.choice(valid_moves))
+        fens.append(game.to_fen())
+
+    positions = [Game.from_fen(fen) for fen in fens]
+    if engine == "bitboard":
+        positions = [BitboardPosition.from_game(game) for game in positions]
+    for position in positions:
+        position.get_valid_moves()
+
+    return positions
+
+
+@pytest.mark.parametrize("use_positional_scoring", [True, False])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_batch_scores_match_game_scores(engine, use_positional_scoring):
+    pytest.importorskip("numpy")
+    from playchess.batch_scorer import find_batch_scores, pack_positions
+
+    positions = sample_positions(engine)
+    boards, white_to_move, check_mates, stale_mates = pack_positions(positions)
+    scores = find_batch_scores(boards, use_positional_scoring, white_to_move, check_mates, stale_mates)
+
+    assert boards.shape == (100, 64)
+    assert check_mates.sum() >= 2 and stale_mates.sum() >= 1
+    assert list(scores) == pytest.approx([find_game_score(position, use_positional_scoring) for position in positions])
+    assert set(scores[check_mates]) == {-CHECKMATE_ABS_SCORE, CHECKMATE_ABS_SCORE}
+
+
+def test_packed_boards_match_packed_positions():
+    pytest.importorskip("numpy")
+    from playchess.batch_scorer import pack_boards, pack_positions
+
+    games = sample_positions("game", 20)
+    boards, _, _, _ = pack_positions(games)
+
+    assert (pack_boards(game.chess_board for game in games) == boards).all()
+    assert pack_boards([]).shape == (0, 64)
+
+
+def test_batch_check_mates_need_the_side_to_move():
+    np = pytest.importorskip("numpy")
+    from playchess.batch_scorer import find_batch_scores, pack_positions
+
+    boards, _, check_mates, stale_mates = pack_positions(sample_positions("game", 5))
+
+    with pytest.raises(ValueError):
+        find_batch_scores(boards, check_mates=check_mates)
+    assert find_batch_scores(boards, stale_mates=stale_mates)[2] == 0.0
+    assert len(find_batch_scores(np.zeros((0, 64), dtype=np.int8))) == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from playchess.tournament import bot_name, parse_bot, play_game, schedule
+
+
+RANDOM_BOT = ("random", 1)
+
+
+@pytest.mark.parametrize("seed, result, reason, plies", [
+    (61, "1-0", "checkmate", 49),
+    (12, "1/2-1/2", "stalemate", 297),
+])
+def test_game_ending_on_the_last_ply_is_decided_on_the_board(seed, result, reason, plies):
+    # Every move is a random opening move, so the seed alone decides the game
+    record = play_game(RANDOM_BOT, RANDOM_BOT, seed, opening_plies=plies, max_plies=plies)
+
+    assert (record["result"], record["reason"], record["plies"]) == (result, reason, plies)
+
+
+def test_game_stopped_at_the_most_plies_is_drawn():
+    record = play_game(RANDOM_BOT, RANDOM_BOT, 61, opening_plies=48, max_plies=48)
+
+    assert (record["result"], record["reason"], record["plies"]) == ("1/2-1/2", "max plies", 48)
+
+
+def test_same_seed_plays_the_same_opening():
+    first = play_game(RANDOM_BOT, ("negamax", 1), 5, opening_plies=6, max_plies=10)
+    second = play_game(RANDOM_BOT, ("negamax", 1), 5, opening_plies=6, max_plies=10)
+
+    assert first["moves"].split()[:6] == second["moves"].split()[:6]
+
+
+def test_schedule_swaps_colours_over_the_same_opening():
+    bots = [parse_bot("negamax:3"), parse_bot("minmax_pruned")]
+    games = list(schedule(bots, 4))
+
+    assert [(bot_name(white), bot_name(black)) for white, black, _ in games] == \
+        [("negamax:3", "minmax_pruned:2"), ("minmax_pruned:2", "negamax:3")] * 2
+    assert games[0][2] == games[1][2] != games[2][2] == games[3][2]
+
+
+def test_parse_bot_rejects_unknown_bots():
+    with pytest.raises(ValueError):
+        parse_bot("deep_blue:12")
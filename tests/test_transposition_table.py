@@ -0,0 +1,96 @@
+import pytest
+
+from playchess.bitboard import BitboardPosition
+from playchess.move_finder import create_move_finder
+from playchess.transposition_table import Bound, SharedTranspositionTable, TranspositionTable
+
+
+@pytest.fixture(params=["local", "shared"])
+def table(request):
+    if request.param == "local":
+        yield TranspositionTable(size_mb=0.01)
+    else:
+        with SharedTranspositionTable(size_mb=0.01) as shared_table:
+            yield shared_table
+
+
+def test_probe_finds_stored_entry(table):
+    table.store(12345, 3, -1.5, Bound.LOWER, 42)
+
+    entry = table.probe(12345)
+    assert (entry.key, entry.depth, entry.score, entry.bound, entry.move) == (12345, 3, -1.5, Bound.LOWER, 42)
+    assert table.probe(54321) is None
+    assert (table.hits, table.misses, table.hit_rate) == (1, 1, 0.5)
+
+
+def test_entry_without_move(table):
+    table.store(7, 0, 2.25, Bound.EXACT, None)
+
+    assert table.probe(7).move is None
+
+
+def test_deeper_entry_is_kept_and_shallow_entry_goes_to_second_slot(table):
+    key, other_key = 5, 5 + table.num_buckets     # Same bucket
+    table.store(key, 4, 1.0, Bound.EXACT, 1)
+    table.store(other_key, 2, 2.0, Bound.EXACT, 2)
+
+    assert table.probe(key).depth == 4
+    assert table.probe(other_key).depth == 2
+
+    # The second slot always takes the latest shallow entry
+    third_key = 5 + 2 * table.num_buckets
+    table.store(third_key, 1, 3.0, Bound.UPPER, 3)
+    assert table.probe(other_key) is None
+    assert table.probe(third_key).move == 3
+    assert table.probe(key).move == 1
+
+    # A deeper search of the same position replaces it
+    table.store(key, 6, 0.5, Bound.EXACT, 9)
+    assert table.probe(key).depth == 6
+    assert len(table) == 2
+
+
+def test_clear_removes_entries_and_counters(table):
+    table.store(1, 1, 0.0, Bound.EXACT, 1)
+    table.probe(1)
+    table.clear()
+
+    assert len(table) == 0
+    assert table.hits == 0
+    assert table.probe(1) is None
+
+
+def test_size_follows_memory_budget():
+    assert TranspositionTable(size_mb=1).num_buckets < TranspositionTable(size_mb=2).num_buckets
+
+
+def test_shared_table_is_seen_by_attached_table():
+    with SharedTranspositionTable(size_mb=0.01) as owner:
+        owner.store(99, 5, 1.25, Bound.UPPER, 1234)
+        attached = SharedTranspositionTable(name=owner.name)
+
+        assert attached.probe(99).move == 1234
+        attached.store(100, 1, -3.0, Bound.LOWER, 7)
+        assert owner.probe(100).score == -3.0
+        attached.close()
+
+
+def test_torn_shared_entry_reads_as_miss():
+    with SharedTranspositionTable(size_mb=0.01) as table:
+        table.store(99, 5, 1.25, Bound.UPPER, 1234)
+        slot = 2 * (99 % table.num_buckets)
+        table._buffer[slot * 24 + 8] ^= 1   # A word written by another process in between
+
+        assert table.probe(99) is None
+
+
+@pytest.mark.parametrize("ai", ["minmax_pruned", "iterative", "negamax"])
+def test_bot_searches_with_its_table(ai):
+    position = BitboardPosition()
+    table: TranspositionTable[int] = TranspositionTable(size_mb=1)
+
+    finder = create_move_finder(ai, position, position.get_valid_moves(), 2, book=None, transposition_table=table)
+    finder.find_move()
+
+    assert len(table) > 0
+    assert table.probe(position.position_key) is not None